@@ -0,0 +1,113 @@
+'''
+    Compara o custo, por nota, de converter uma página da listagem nos modelos:
+
+    - `response.json()` + `Modelo(**d)`: como as listagens faziam até então;
+    - `response.json()` + `Modelo.model_construct(**d)`: construção sem validação;
+    - `RespostaApi[Pagina].model_validate_json(bytes)`: validação direta dos bytes, usada hoje pelas listagens;
+    - o mesmo, com a projeção `campos=['id', 'status', 'valor_total']`.
+
+    Uso: `python -m benchmarks.listagem [quantidade de notas]`
+'''
+
+# ======================================================================================================================
+import json
+import sys
+import timeit
+
+from pysisnoapi      import NotaFiscal, RespostaApi
+from pysisnoapi      import nfe as _nfe, nfse as _nfse
+from pysisnoapi.nfe  import PaginaNotas
+from pysisnoapi.nfse import NotaFiscalServico, PaginaNotasServico
+
+# ======================================================================================================================
+EMPRESA = {
+    'cnpj'             : '05397048000107',
+    'nome_fantasia'    : 'Empresa do Fulano',
+    'razao_social'     : 'Fulanos Inc.',
+    'endereco'         : {
+        'codigo_pais'        : '1058',
+        'descricao_pais'     : 'BRASIL',
+        'uf'                 : 'DF',
+        'codigo_municipio'   : '5300108',
+        'descricao_municipio': 'Brasilia',
+        'cep'                : '70343-520',
+        'bairro'             : 'ASA SUL',
+        'logradouro'         : 'ENDERECO DA EMPRESA',
+        'numero'             : '7',
+    },
+    'regime_tributario': '1',
+    'ambiente'         : '2',
+}
+
+def nfe(i: int) -> dict:
+    return {
+        'id'              : i,
+        'empresa'         : EMPRESA,
+        'tipo'            : 'NF-e',
+        'serie'           : '1',
+        'numero_nota'     : str(i),
+        'chave_acesso'    : '53230500665143000112550010000000777777777777',
+        'valor_total'     : '4.00',
+        'status'          : 'Autorizada',
+        'data_emissao'    : '2023-06-02T17:25:57',
+        'data_autorizacao': '2023-06-02T21:29:40',
+        'modelo'          : '55',
+        'ambiente'        : '2',
+    }
+
+def nfse(i: int) -> dict:
+    return {
+        'id'                 : i,
+        'empresa'            : EMPRESA,
+        'uuid'               : f'nfse-{i}',
+        'status'             : 'aprovado',
+        'numero_nota'        : str(i),
+        'valor_total'        : '150.00',
+        'data_emissao'       : '02/06/2023 17:25:57',
+        'uf_prestacao'       : {'codigo_ibge': '53', 'sigla': 'DF', 'descricao': 'Distrito Federal'},
+        'municipio_prestacao': {'codigo_ibge': '5300108', 'descricao': 'Brasília'},
+    }
+
+# ======================================================================================================================
+def medir(nome: str, funcao, quantidade: int, repeticoes: int = 5) -> float:
+    tempo    = min(timeit.repeat(funcao, number=1, repeat=repeticoes))
+    por_item = tempo / quantidade * 1e6
+    print(f'{nome:<64} {por_item:8.2f} µs/nota')
+    return por_item
+
+def main(quantidade: int = 1_000):
+    for pagina, modelo, gerar, modulo in ((PaginaNotas, NotaFiscal, nfe, _nfe), (PaginaNotasServico, NotaFiscalServico, nfse, _nfse)):
+        _, projetada = modulo._modelos(campos=['id', 'status', 'valor_total'])
+
+        corpo = json.dumps({
+            'status': 'Sucesso',
+            'dados' : {'total': quantidade, 'itens_por_pagina': quantidade, 'pagina_atual': 1, 'itens': [gerar(i) for i in range(quantidade)]},
+        }).encode()
+
+        def validando():
+            dados = json.loads(corpo)['dados']
+            itens = dados.pop('itens')
+            return pagina(**dados, itens=[modelo(**d) for d in itens])
+
+        def construindo():
+            dados = json.loads(corpo)['dados']
+            itens = dados.pop('itens')
+            return pagina.model_construct(**dados, itens=[modelo.model_construct(**d) for d in itens])
+
+        def bytes_():
+            return RespostaApi[pagina].model_validate_json(corpo).dados
+
+        def projetando():
+            return RespostaApi[projetada].model_validate_json(corpo).dados
+
+        anterior = medir(f'json.loads + {modelo.__name__}(**d)', validando, quantidade)
+        medir(f'json.loads + {modelo.__name__}.model_construct(**d)', construindo, quantidade)
+        atual    = medir(f'RespostaApi[{pagina.__name__}].model_validate_json', bytes_, quantidade)
+        print(f'{"":<64} {anterior / atual:8.1f}x')
+        medir(f'RespostaApi[{pagina.__name__}].model_validate_json (3 campos)', projetando, quantidade)
+        print()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000)
+
+# ======================================================================================================================
@@ -10,10 +10,14 @@
 
 # ======================================================================================================================
 # Imports:
-from typing            import Optional
+import functools
+import httpx
+import unicodedata
+
+from typing            import Any, Generic, Iterable, Optional, Type, TypeVar
 from typing_extensions import Annotated
 from datetime          import datetime
-from pydantic          import BaseModel, Field, model_validator
+from pydantic          import BaseModel, ConfigDict, Field, PrivateAttr, create_model, model_validator
 from enum              import StrEnum
 
 # ======================================================================================================================
@@ -220,17 +224,49 @@ UNIDADES = {
     'vidro' : 'VIDRO'
 }
 
+UNIDADES_FEDERATIVAS = {
+    'AC': 'Acre',
+    'AL': 'Alagoas',
+    'AM': 'Amazonas',
+    'AP': 'Amapá',
+    'BA': 'Bahia',
+    'CE': 'Ceará',
+    'DF': 'Distrito Federal',
+    'ES': 'Espírito Santo',
+    'GO': 'Goiás',
+    'MA': 'Maranhão',
+    'MG': 'Minas Gerais',
+    'MS': 'Mato Grosso do Sul',
+    'MT': 'Mato Grosso',
+    'PA': 'Pará',
+    'PB': 'Paraíba',
+    'PE': 'Pernambuco',
+    'PI': 'Piauí',
+    'PR': 'Paraná',
+    'RJ': 'Rio de Janeiro',
+    'RN': 'Rio Grande do Norte',
+    'RO': 'Rondônia',
+    'RR': 'Roraima',
+    'RS': 'Rio Grande do Sul',
+    'SC': 'Santa Catarina',
+    'SE': 'Sergipe',
+    'SP': 'São Paulo',
+    'TO': 'Tocantins',
+}
+
 # ======================================================================================================================
-AmbientesEnum                      = StrEnum('Ambientes', list(AMBIENTES.keys()), )
-FormasPagamentoEnum                = StrEnum('Formas de Pagamento', list(FORMAS_PAGAMENTO.keys()), )
-MeiosPagamentoEnum                 = StrEnum('Meios de Pagamento', list(MEIOS_PAGAMENTO.keys()), )
-MotivoDesoneracaoEnum              = StrEnum('Motivos de Desoneração', list(MOTIVOS_DESONERACAO.keys()), )
-SituacoesTributariasICMSEnum       = StrEnum('Situações Tributárias ICMS', list(SITUACOES_TRIBUTARIAS_ICMS.keys()), )
-SituacoesTributariasIPIEnum        = StrEnum('Situações Tributárias IPI', list(SITUACOES_TRIBUTARIAS_IPI.keys()), )
-SituacoesTributariasPISCONFINSEnum = StrEnum('Situações Tributárias PIS CONFINS', list(SITUACOES_TRIBUTARIAS_PIS_COFINS.keys()), )
-ConsumidorFinalEnum                = StrEnum('Tipo de Consumidor Final', list(TIPOS_CONSUMIDOR_FINAL.keys()), )
-ContribuintesEnum                  = StrEnum('Tipos de Contribuintes', list(TIPOS_CONTRIBUINTES.keys()), )
-UnidadesEnum                       = StrEnum('Unidades', UNIDADES)
+# O `qualname` é o nome da variável, e não o nome exibido, para que o `pickle` encontre a classe (ex.: ao enviar modelos
+# para outros processos em `importacao`):
+AmbientesEnum                      = StrEnum('Ambientes', list(AMBIENTES.keys()), module=__name__, qualname='AmbientesEnum')
+FormasPagamentoEnum                = StrEnum('Formas de Pagamento', list(FORMAS_PAGAMENTO.keys()), module=__name__, qualname='FormasPagamentoEnum')
+MeiosPagamentoEnum                 = StrEnum('Meios de Pagamento', list(MEIOS_PAGAMENTO.keys()), module=__name__, qualname='MeiosPagamentoEnum')
+MotivoDesoneracaoEnum              = StrEnum('Motivos de Desoneração', list(MOTIVOS_DESONERACAO.keys()), module=__name__, qualname='MotivoDesoneracaoEnum')
+SituacoesTributariasICMSEnum       = StrEnum('Situações Tributárias ICMS', list(SITUACOES_TRIBUTARIAS_ICMS.keys()), module=__name__, qualname='SituacoesTributariasICMSEnum')
+SituacoesTributariasIPIEnum        = StrEnum('Situações Tributárias IPI', list(SITUACOES_TRIBUTARIAS_IPI.keys()), module=__name__, qualname='SituacoesTributariasIPIEnum')
+SituacoesTributariasPISCONFINSEnum = StrEnum('Situações Tributárias PIS CONFINS', list(SITUACOES_TRIBUTARIAS_PIS_COFINS.keys()), module=__name__, qualname='SituacoesTributariasPISCONFINSEnum')
+ConsumidorFinalEnum                = StrEnum('Tipo de Consumidor Final', list(TIPOS_CONSUMIDOR_FINAL.keys()), module=__name__, qualname='ConsumidorFinalEnum')
+ContribuintesEnum                  = StrEnum('Tipos de Contribuintes', list(TIPOS_CONTRIBUINTES.keys()), module=__name__, qualname='ContribuintesEnum')
+UnidadesEnum                       = StrEnum('Unidades', UNIDADES, module=__name__, qualname='UnidadesEnum')
 
 # ======================================================================================================================
 # Classes:
@@ -318,6 +354,68 @@ class Cofins(BaseModel):
     aliquota_st         : Optional[Annotated[str, Field()]] = None
     aliquota_retencao   : Optional[Annotated[str, Field()]] = None
 
+class Credenciais(BaseModel):
+    '''Classe `Credenciais`
+
+    Agrupa os tokens do emissor e, opcionalmente, os tokens da empresa.
+    Os tokens são validados uma única vez, na criação do objeto, e os cabeçalhos HTTP de autenticação ficam
+    pré-calculados para serem reutilizados em todas as requisições.
+
+    Os objetos são imutáveis, portanto, para outra empresa crie novas credenciais.
+    '''
+    model_config = ConfigDict(frozen=True)
+
+    token_emissor       : str = Field()
+    token_secret_emissor: str = Field()
+
+    token_empresa       : Optional[Annotated[str, Field()]] = None
+    token_secret_empresa: Optional[Annotated[str, Field()]] = None
+
+    _headers_emissor: httpx.Headers = PrivateAttr()
+    _headers_empresa: httpx.Headers = PrivateAttr(default=None)
+    _headers_emissao: dict          = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context):
+        validate_tokens(self.token_emissor, self.token_secret_emissor)
+
+        self._headers_emissor = httpx.Headers({
+            'token-emissor'       : self.token_emissor,
+            'token-secret-emissor': self.token_secret_emissor,
+        })
+
+        if self.token_empresa is not None or self.token_secret_empresa is not None:
+            validate_tokens(self.token_empresa, self.token_secret_empresa)
+
+            self._headers_empresa = httpx.Headers({
+                'token-emissor'       : self.token_emissor,
+                'token-secret-emissor': self.token_secret_emissor,
+                'token-empresa'       : self.token_empresa,
+                'token-secret-empresa': self.token_secret_empresa,
+            })
+
+    @property
+    def headers_emissor(self) -> httpx.Headers:
+        '''Cabeçalhos contendo apenas os tokens do emissor (não devem ser alterados).'''
+        return self._headers_emissor
+
+    @property
+    def headers_empresa(self) -> httpx.Headers:
+        '''Cabeçalhos contendo os tokens do emissor e da empresa (não devem ser alterados).'''
+        if self._headers_empresa is None:
+            raise Exception('Necessário informar os tokens da empresa para essa operação')
+        return self._headers_empresa
+
+    def headers_emissao(self, tipo_emissao: str) -> httpx.Headers:
+        '''Cabeçalhos da empresa acrescidos do tipo de emissão, calculados uma única vez para cada tipo.'''
+        headers = self._headers_emissao.get(tipo_emissao)
+
+        if headers is None:
+            headers = self.headers_empresa.copy()
+            headers['tipo-emissao'] = tipo_emissao
+            self._headers_emissao[tipo_emissao] = headers
+
+        return headers
+
 class DeclaracaoImportacaoAdicao(BaseModel):
     numero_sequencial: Optional[Annotated[str, Field()]] = None
     numero           : Optional[Annotated[str, Field()]] = None
@@ -492,6 +590,18 @@ class NotaFiscal(BaseModel):
     def __repr__(self):
         return f'NFe {self.id}'
 
+# Alias que nunca aparece nas respostas: o campo correspondente não é lido (ver `NotaFiscalLeve`).
+CAMPO_NAO_LIDO = '__pysisnoapi_campo_nao_lido__'
+
+class NotaFiscalLeve(NotaFiscal):
+    '''`NotaFiscal` das listagens em modo leve (`leve=True`).
+
+    Os campos `xml` e `json_objeto_nfe`, que podem ter dezenas de KB cada, são ignorados durante a leitura da resposta
+    (nunca são convertidos em `str`) e ficam sempre `None`. Os demais campos são idênticos aos da `NotaFiscal`.
+    '''
+    xml            : Optional[str] = Field(default=None, validation_alias=CAMPO_NAO_LIDO)
+    json_objeto_nfe: Optional[str] = Field(default=None, validation_alias=CAMPO_NAO_LIDO)
+
 class Observacao(BaseModel):
     campo: Optional[Annotated[str, Field()]] = None
     texto: Optional[Annotated[str, Field()]] = None
@@ -575,6 +685,18 @@ class Pis(BaseModel):
     aliquota_st        : Optional[Annotated[str, Field()]] = None
     aliquota_retencao  : Optional[Annotated[str, Field()]] = None
 
+T = TypeVar('T')
+
+class RespostaApi(BaseModel, Generic[T]):
+    '''Envelope das respostas da API: `{"status": ..., "descricao": ..., "dados": ...}`.
+
+    Permite validar o corpo da resposta diretamente dos bytes (`RespostaApi[PaginaNotas].model_validate_json(...)`),
+    sem decodificar o JSON para dicionários Python antes, o que reduz o custo das listagens grandes.
+    '''
+    status   : Optional[Annotated[str, Field()]] = None
+    descricao: Optional[Annotated[str, Field()]] = None
+    dados    : Optional[Annotated[T, Field()]]   = None
+
 class RetencaoIcmsTransporte(BaseModel):
     valor_servico                                           : Optional[Annotated[str, Field()]] = None
     valor_icms_retido                                       : Optional[Annotated[str, Field()]] = None
@@ -610,4 +732,40 @@ def validate_tokens(token:str, token_secret:str):
 
     return True
 
+def normalizar_texto(texto: Optional[str]) -> str:
+    '''Remove acentos e diferenças entre maiúsculas e minúsculas, ex.: "Ação" -> "acao".
+
+    Utilizado nas buscas locais, já que a busca da API (`textoBusca`) diferencia acentos e maiúsculas.
+    '''
+    if not texto:
+        return ''
+
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+def projetar(modelo: Type[BaseModel], campos: Iterable[str]) -> Type[BaseModel]:
+    '''Retorna uma subclasse de `modelo` que lê apenas os `campos` informados.
+
+    Os demais campos são ignorados durante a leitura da resposta (como em `NotaFiscalLeve`) e ficam sempre `None`. A
+    subclasse é criada uma única vez para cada combinação de modelo e campos.
+    ```
+    NotaResumida = projetar(NotaFiscal, ['id', 'status', 'valor_total'])
+    ```
+
+    Raises:
+        ValueError: Caso algum campo não exista no modelo.
+    '''
+    return _projecao(modelo, frozenset(campos))
+
+@functools.cache
+def _projecao(modelo: Type[BaseModel], campos: frozenset) -> Type[BaseModel]:
+    desconhecidos = campos - modelo.model_fields.keys()
+    if desconhecidos:
+        raise ValueError(f'Campos inexistentes em "{modelo.__name__}": {", ".join(sorted(desconhecidos))}')
+
+    ignorados = {nome: (Any, Field(default=None, validation_alias=CAMPO_NAO_LIDO)) for nome in modelo.model_fields if nome not in campos}
+    return create_model(f'{modelo.__name__}Projetada', __base__=modelo, __module__=modelo.__module__, **ignorados)
+
 # ======================================================================================================================
+# Sessão HTTP compartilhada:
+from .sessao import SessaoEmpresa, SisnoClient, get_client, set_client
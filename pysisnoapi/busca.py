@@ -0,0 +1,208 @@
+'''
+    Módulo com um índice de busca local das notas fiscais.
+
+    A busca da API (`textoBusca` em `nfse.buscar_notas`) diferencia acentos e maiúsculas. O `IndiceBusca` indexa as
+    notas recebidas nas listagens e responde localmente, ignorando acentos e maiúsculas e aceitando prefixos:
+    ```
+    from pysisnoapi.busca import IndiceBusca
+
+    indice = IndiceBusca()
+    await indice.indexar(nfse.iterar_notas(credenciais))
+
+    indice.buscar('joao sil')   # "João Silva", "JOÃO SILVEIRA", ...
+    ```
+'''
+
+# ======================================================================================================================
+import bisect
+import json
+import re
+
+from typing import AsyncIterable, Dict, Hashable, Iterable, List, Optional, Set, Union
+
+from . import (
+    NotaFiscal,
+
+    normalizar_texto,
+)
+from .concorrencia import iterar
+from .nfse         import NotaFiscalServico
+
+# ======================================================================================================================
+_PALAVRA = re.compile(r'\w+')
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    '''Divide o texto em palavras normalizadas (sem acentos e em minúsculas).'''
+    return _PALAVRA.findall(normalizar_texto(texto))
+
+def _chave(nota: Union[NotaFiscal, NotaFiscalServico]) -> Hashable:
+    if isinstance(nota, NotaFiscalServico):
+        return ('nfse', nota.uuid or nota.id)
+    return ('nfe', nota.id)
+
+def _discriminacao(nota: NotaFiscalServico) -> Optional[str]:
+    '''A discriminação do serviço só está disponível no objeto de emissão (`json_objeto_nfse`).'''
+    if not nota.json_objeto_nfse:
+        return None
+
+    try:
+        return json.loads(nota.json_objeto_nfse)['servico']['discriminacao']
+    except (ValueError, TypeError, KeyError):
+        return None
+
+def _textos(nota: Union[NotaFiscal, NotaFiscalServico]) -> List[str]:
+    documento = nota.cpf_cnpj_destinatario
+    textos    = [nota.nome_destinatario, documento, nota.numero_nota]
+
+    if documento:
+        textos.append(re.sub(r'\D', '', documento))     # Permite buscar o CPF/CNPJ com ou sem pontuação
+
+    if isinstance(nota, NotaFiscalServico):
+        textos.append(nota.numer_nota)
+        textos.append(_discriminacao(nota))
+
+    return textos
+
+# ======================================================================================================================
+class IndiceBusca:
+    '''Índice invertido das notas fiscais, em memória.
+
+    Indexa `nome_destinatario`, `cpf_cnpj_destinatario`, `numero_nota` e, nas NFSe, a discriminação do serviço. Cada
+    palavra da consulta é tratada como prefixo e uma nota é retornada somente se todas as palavras forem encontradas.
+    '''
+
+    def __init__(self, notas: Iterable[Union[NotaFiscal, NotaFiscalServico]] = ()):
+        self._notas    : Dict[Hashable, Union[NotaFiscal, NotaFiscalServico]] = {}
+        self._ordem    : Dict[Hashable, int]                                  = {}
+        self._palavras : Dict[Hashable, Set[str]]                             = {}
+        self._postings : Dict[str, Set[Hashable]]                             = {}
+        self._ordenadas: Optional[List[str]]                                  = None  # Construída na primeira busca
+        self._sequencia = 0
+
+        self.adicionar(notas)
+
+    def __len__(self) -> int:
+        return len(self._notas)
+
+    def __contains__(self, nota) -> bool:
+        return _chave(nota) in self._notas
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def adicionar(self, notas: Iterable[Union[NotaFiscal, NotaFiscalServico]]) -> int:
+        '''Indexa as notas, substituindo as versões anteriores das notas já indexadas. Retorna a quantidade indexada.'''
+        quantidade = 0
+        novas      = []
+
+        for nota in notas:
+            chave    = _chave(nota)
+            palavras = {p for t in _textos(nota) for p in tokenizar(t)}
+
+            self.remover(chave)
+            self._notas[chave]    = nota
+            self._ordem[chave]    = self._sequencia
+            self._palavras[chave] = palavras
+            self._sequencia      += 1
+
+            for palavra in palavras:
+                if palavra not in self._postings:
+                    self._postings[palavra] = set()
+                    novas.append(palavra)
+                self._postings[palavra].add(chave)
+
+            quantidade += 1
+
+        self._incluir_ordenadas(novas)
+        return quantidade
+
+    async def indexar(self, notas: Union[Iterable, AsyncIterable]) -> int:
+        '''Indexa as notas de uma listagem (ex.: `nfse.iterar_notas`). Retorna a quantidade indexada.'''
+        quantidade = 0
+        async for nota in iterar(notas):
+            quantidade += self.adicionar([nota])
+        return quantidade
+
+    def remover(self, chave: Hashable):
+        '''Remove a nota com a chave informada (`('nfe', id)` ou `('nfse', uuid)`), caso esteja indexada.'''
+        if chave not in self._notas:
+            return
+
+        for palavra in self._palavras.pop(chave):
+            chaves = self._postings[palavra]
+            chaves.discard(chave)
+            if not chaves:
+                del self._postings[palavra]
+                self._remover_ordenada(palavra)
+
+        del self._notas[chave]
+        del self._ordem[chave]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _incluir_ordenadas(self, novas: List[str]):
+        '''Mantém a lista ordenada de palavras atualizada, sem reordená-la por completo a cada palavra nova.'''
+        if self._ordenadas is None:
+            return
+
+        # Uma palavra pode ter sido removida (ou incluída de novo) por outra versão da mesma nota no mesmo lote:
+        novas = [p for p in dict.fromkeys(novas) if p in self._postings]
+
+        # Poucas palavras são inseridas no lugar, um lote grande é ordenado de uma vez (o Timsort aproveita a parte já
+        # ordenada da lista):
+        if len(novas) <= 32:
+            for palavra in novas:
+                bisect.insort(self._ordenadas, palavra)
+        else:
+            self._ordenadas.extend(novas)
+            self._ordenadas.sort()
+
+    def _remover_ordenada(self, palavra: str):
+        if self._ordenadas is None:
+            return
+
+        indice = bisect.bisect_left(self._ordenadas, palavra)
+        if indice < len(self._ordenadas) and self._ordenadas[indice] == palavra:
+            del self._ordenadas[indice]
+
+    def _prefixo(self, prefixo: str) -> Set[Hashable]:
+        if self._ordenadas is None:
+            self._ordenadas = sorted(self._postings)
+
+        ordenadas = self._ordenadas
+        chaves    = set()
+        indice    = bisect.bisect_left(ordenadas, prefixo)
+
+        # Percorre apenas as palavras com o prefixo, sem copiar o restante da lista:
+        while indice < len(ordenadas) and ordenadas[indice].startswith(prefixo):
+            chaves |= self._postings[ordenadas[indice]]
+            indice += 1
+
+        return chaves
+
+    def buscar(self, consulta: str, limite: int = None) -> List[Union[NotaFiscal, NotaFiscalServico]]:
+        '''Retorna as notas que contêm todas as palavras da consulta (como prefixo), na ordem em que foram indexadas.
+
+        Args:
+            consulta (str): Texto livre, ex.: "joao 123.456".
+            limite (int, optional): Quantidade máxima de notas retornadas.
+
+        Returns:
+            List[NotaFiscal | NotaFiscalServico]: Notas encontradas.
+        '''
+        palavras = tokenizar(consulta)
+        if not palavras:
+            return []
+
+        # As palavras mais longas costumam ser mais seletivas, então são intersectadas primeiro:
+        encontradas = None
+        for palavra in sorted(set(palavras), key=len, reverse=True):
+            chaves      = self._prefixo(palavra)
+            encontradas = chaves if encontradas is None else encontradas & chaves
+            if not encontradas:
+                return []
+
+        ordenadas = sorted(encontradas, key=self._ordem.__getitem__)
+        if limite is not None:
+            ordenadas = ordenadas[:limite]
+
+        return [self._notas[c] for c in ordenadas]
+
+# ======================================================================================================================
@@ -0,0 +1,150 @@
+'''
+    Módulo com o cache, em memória e opcionalmente em disco, de tabelas que quase nunca mudam (ex.: CFOPs).
+
+    ```
+    from pysisnoapi import misc
+
+    cfops = misc.cache_cfops(credenciais, ttl=24 * 60 * 60, caminho='cfops.json')
+    lista = await cfops.obter()     # Só faz a requisição quando o cache está vazio ou expirado
+    ```
+'''
+
+# ======================================================================================================================
+import asyncio
+import json
+import os
+import time
+
+from pathlib import Path
+from typing  import Any, Awaitable, Callable, Generic, Optional, TypeVar, Union
+
+T = TypeVar('T')
+
+# ======================================================================================================================
+class CacheTTL(Generic[T]):
+    '''Guarda o resultado de `carregar` por `ttl` segundos.
+
+    Chamadas simultâneas com o cache expirado compartilham uma única atualização em andamento (single-flight). Caso a
+    atualização falhe e exista um valor anterior, o valor anterior continua sendo retornado. Após uma falha, nenhuma
+    nova tentativa é feita por `espera_apos_falha` segundos: nesse intervalo `obter` retorna o valor anterior (ou
+    levanta novamente o último erro, caso não exista valor), evitando uma requisição à API a cada chamada enquanto ela
+    está fora do ar.
+
+    Quando `caminho` é informado, cada atualização é gravada em disco e o arquivo é lido na criação do cache, de modo
+    que um novo processo não precisa fazer a requisição enquanto o arquivo não expirar.
+
+    Args:
+        carregar (Callable): Corrotina que busca o valor atualizado.
+        ttl (float): Tempo, em segundos, que o valor é considerado válido.
+        caminho (str | Path, optional): Arquivo JSON onde o valor é persistido.
+        serializar (Callable, optional): Converte o valor em algo serializável em JSON.
+        desserializar (Callable, optional): Reconstrói o valor a partir do JSON.
+        espera_apos_falha (float): Tempo, em segundos, sem novas tentativas após uma atualização com erro.
+    '''
+
+    def __init__(self,
+                 carregar: Callable[[], Awaitable[T]],
+                 ttl: float,
+                 caminho: Optional[Union[str, Path]] = None,
+                 serializar: Callable[[T], Any] = lambda v: v,
+                 desserializar: Callable[[Any], T] = lambda v: v,
+                 espera_apos_falha: float = 60):
+        self.carregar          = carregar
+        self.ttl               = ttl
+        self.caminho           = Path(caminho) if caminho else None
+        self.serializar        = serializar
+        self.desserializar     = desserializar
+        self.espera_apos_falha = espera_apos_falha
+
+        self._valor        : Optional[T]            = None
+        self._atualizado_em: Optional[float]        = None
+        self._tarefa       : Optional[asyncio.Task] = None
+        self._falha_em     : Optional[float]        = None  # `time.monotonic()` da última atualização com erro
+        self._erro         : Optional[Exception]    = None
+
+        self._ler_disco()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @property
+    def valido(self) -> bool:
+        '''Indica se existe um valor e ele ainda não expirou.'''
+        return self._atualizado_em is not None and time.time() - self._atualizado_em < self.ttl
+
+    @property
+    def valor(self) -> Optional[T]:
+        '''Valor atual, sem verificar a validade nem atualizar.'''
+        return self._valor
+
+    @property
+    def atualizado_em(self) -> Optional[float]:
+        '''Momento (timestamp) da última atualização.'''
+        return self._atualizado_em
+
+    @property
+    def em_espera(self) -> bool:
+        '''Indica se a última atualização falhou há menos de `espera_apos_falha` segundos.'''
+        return self._falha_em is not None and time.monotonic() - self._falha_em < self.espera_apos_falha
+
+    def invalidar(self):
+        '''Força a atualização na próxima chamada de `obter` (mesmo após uma falha), sem descartar o valor atual.'''
+        self._atualizado_em = None
+        self._falha_em      = None
+
+    async def obter(self, forcar: bool = False) -> T:
+        '''Retorna o valor em cache, atualizando-o caso esteja expirado (ou caso `forcar` seja verdadeiro).'''
+        if self.valido and not forcar:
+            return self._valor
+
+        if self.em_espera and not forcar:
+            if self._atualizado_em is None and self._valor is None:
+                raise self._erro
+            return self._valor
+
+        loop = asyncio.get_running_loop()
+        if self._tarefa is None or self._tarefa.done() or self._tarefa.get_loop() is not loop:
+            self._tarefa = loop.create_task(self._atualizar())
+
+        # `shield` impede que o cancelamento de um dos chamadores cancele a atualização compartilhada:
+        return await asyncio.shield(self._tarefa)
+
+    async def _atualizar(self) -> T:
+        try:
+            valor = await self.carregar()
+        except Exception as e:
+            self._falha_em = time.monotonic()
+            self._erro     = e
+            if self._atualizado_em is None and self._valor is None:
+                raise
+            return self._valor
+
+        self._valor         = valor
+        self._atualizado_em = time.time()
+        self._falha_em      = None
+        self._erro          = None
+        self._gravar_disco()
+
+        return valor
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _ler_disco(self):
+        if self.caminho is None or not self.caminho.exists():
+            return
+
+        try:
+            conteudo = json.loads(self.caminho.read_text(encoding='utf-8'))
+            self._valor         = self.desserializar(conteudo['dados'])
+            self._atualizado_em = conteudo['atualizado_em']
+        except (ValueError, KeyError, TypeError):
+            # Arquivo corrompido ou de outra versão: é descartado na próxima atualização.
+            self._valor         = None
+            self._atualizado_em = None
+
+    def _gravar_disco(self):
+        if self.caminho is None:
+            return
+
+        temporario = self.caminho.with_name(self.caminho.name + '.tmp')
+        temporario.write_text(json.dumps({'atualizado_em': self._atualizado_em, 'dados': self.serializar(self._valor)}), encoding='utf-8')
+        os.replace(temporario, self.caminho)
+
+# ======================================================================================================================
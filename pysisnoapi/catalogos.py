@@ -0,0 +1,365 @@
+'''
+    Módulo com catálogos locais das tabelas auxiliares da API (municípios e IBPTs).
+
+    Os catálogos são carregados uma única vez (opcionalmente a partir do disco) e respondem às consultas em memória,
+    sem requisições, o que é essencial em importações que consultam as mesmas tabelas a cada linha:
+    ```
+    from pysisnoapi.catalogos import CatalogoMunicipios
+
+    catalogo  = await CatalogoMunicipios.carregar(credenciais, caminho='municipios.json')
+    municipio = catalogo.buscar('DF', 'brasilia')
+    ```
+'''
+
+# ======================================================================================================================
+import asyncio
+import re
+import warnings
+
+from datetime import datetime, timedelta
+from pathlib  import Path
+from typing   import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from . import (
+    UNIDADES_FEDERATIVAS,
+
+    Credenciais,
+    Ibpt,
+    Municipio,
+
+    normalizar_texto,
+)
+from .cache        import CacheTTL
+from .concorrencia import executar_em_lote
+from .datas        import converter_data
+from .misc         import _get_ibpts, _get_municipios
+from .sessao       import SisnoClient
+
+# ======================================================================================================================
+TTL_MUNICIPIOS = 30 * 24 * 60 * 60
+TTL_IBPT       = 24 * 60 * 60   # Utilizado apenas quando o IBPT não informa `vigencia_fim`
+
+# ======================================================================================================================
+class CatalogoMunicipios:
+    '''Catálogo, em memória, dos municípios de todas as UFs.
+
+    Mantém índices (dicionários) por `codigo_ibge` e por `(uf, descricao)`, com a descrição sem acentos e sem diferença
+    entre maiúsculas e minúsculas, de modo que cada consulta é O(1).
+
+    Args:
+        municipios (Dict[str, List[Municipio]]): Municípios de cada UF (sigla).
+    '''
+
+    def __init__(self, municipios: Dict[str, Iterable[Municipio]]):
+        self._por_uf    : Dict[str, List[Municipio]]       = {}
+        self._por_codigo: Dict[int, Tuple[str, Municipio]] = {}
+        self._por_nome  : Dict[Tuple[str, str], Municipio] = {}
+
+        for uf, lista in municipios.items():
+            uf               = uf.upper()
+            self._por_uf[uf] = list(lista)
+
+            for municipio in self._por_uf[uf]:
+                if municipio.codigo_ibge is not None:
+                    self._por_codigo[municipio.codigo_ibge] = (uf, municipio)
+                self._por_nome[(uf, normalizar_texto(municipio.descricao).strip())] = municipio
+
+    def __len__(self) -> int:
+        return len(self._por_codigo)
+
+    def __contains__(self, codigo_ibge) -> bool:
+        return self.por_codigo(codigo_ibge) is not None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @classmethod
+    async def carregar(cls,
+                       credenciais: Credenciais,
+                       ufs: Iterable[str] = UNIDADES_FEDERATIVAS,
+                       caminho: Optional[Union[str, Path]] = None,
+                       ttl: float = TTL_MUNICIPIOS,
+                       max_concorrencia: int = 27,
+                       client: Optional[SisnoClient] = None) -> 'CatalogoMunicipios':
+        '''Carrega os municípios de todas as UFs simultaneamente.
+
+        Args:
+            credenciais (Credenciais): Tokens do emissor.
+            ufs (Iterable[str]): Siglas das UFs a serem carregadas (por padrão, todas).
+            caminho (str | Path, optional): Arquivo onde o catálogo é persistido. Enquanto o arquivo não expirar o
+                catálogo é lido dele, sem nenhuma requisição.
+            ttl (float): Tempo, em segundos, que o arquivo é considerado válido.
+            max_concorrencia (int): Quantidade máxima de UFs consultadas ao mesmo tempo.
+            client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Caso a atualização falhe, os municípios do arquivo (mesmo expirado) são utilizados com um `RuntimeWarning`, desde
+        que o arquivo possua todas as UFs solicitadas.
+
+        Raises:
+            Exception: Caso não seja possível obter os municípios de alguma UF.
+
+        Returns:
+            CatalogoMunicipios: Catálogo carregado.
+        '''
+        ufs = [uf.upper() for uf in ufs]
+
+        async def buscar(uf: str) -> List[Municipio]:
+            municipios = await _get_municipios(credenciais, uf, client=client)
+            if municipios is None:
+                raise Exception(f'Não foi possível obter os municípios de "{uf}"')
+            return municipios
+
+        async def carregar_todas() -> Dict[str, List[Municipio]]:
+            municipios = {}
+            async for resultado in executar_em_lote(buscar, ufs, max_concorrencia=max_concorrencia):
+                if resultado.erro:
+                    raise resultado.erro
+                municipios[ufs[resultado.indice]] = resultado.resultado
+            return municipios
+
+        cache = CacheTTL(carregar_todas,
+                         ttl           = ttl,
+                         caminho       = caminho,
+                         serializar    = lambda dados: {uf: [m.model_dump() for m in lista] for uf, lista in dados.items()},
+                         desserializar = lambda dados: {uf: [Municipio(**m) for m in lista] for uf, lista in dados.items()})
+
+        # Um arquivo gravado com outras UFs não serve para esta consulta:
+        if cache.valido and set(cache.valor) != set(ufs):
+            cache.invalidar()
+
+        municipios = await cache.obter()
+        if cache.valido:
+            return cls(municipios)
+
+        # A atualização falhou e o cache retornou o conteúdo anterior do arquivo, que pode ser de outras UFs:
+        faltando = [uf for uf in ufs if uf not in municipios]
+        if faltando:
+            raise Exception(f'Não foi possível obter os municípios de "{", ".join(faltando)}"')
+
+        warnings.warn('Não foi possível atualizar os municípios, utilizando o catálogo anterior do arquivo', RuntimeWarning)
+        return cls({uf: municipios[uf] for uf in ufs})
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def por_codigo(self, codigo_ibge: Union[int, str, None]) -> Optional[Municipio]:
+        '''Retorna o município com o código IBGE informado.'''
+        item = self._por_codigo.get(self._codigo(codigo_ibge))
+        return item[1] if item else None
+
+    def uf(self, codigo_ibge: Union[int, str, None]) -> Optional[str]:
+        '''Retorna a sigla da UF do município com o código IBGE informado.'''
+        item = self._por_codigo.get(self._codigo(codigo_ibge))
+        return item[0] if item else None
+
+    def buscar(self, uf: str, descricao: str) -> Optional[Municipio]:
+        '''Retorna o município pela UF e pela descrição, ignorando acentos e maiúsculas (ex.: `('df', 'BRASÍLIA')`).'''
+        if not uf or not descricao:
+            return None
+        return self._por_nome.get((uf.upper(), normalizar_texto(descricao).strip()))
+
+    def municipios(self, uf: str) -> List[Municipio]:
+        '''Retorna todos os municípios de uma UF.'''
+        return list(self._por_uf.get(uf.upper(), []))
+
+    @staticmethod
+    def _codigo(codigo_ibge: Union[int, str, None]) -> Optional[int]:
+        try:
+            return int(codigo_ibge)
+        except (TypeError, ValueError):
+            return None
+
+# ======================================================================================================================
+def _palavras(texto: Optional[str]) -> List[str]:
+    return re.findall(r'\w+', normalizar_texto(texto))
+
+class _Trie:
+    '''Árvore de prefixos: cada nó guarda as chaves das palavras que passam por ele.'''
+
+    def __init__(self):
+        self._raiz: dict = {}
+
+    def inserir(self, palavra: str, chave):
+        no = self._raiz
+        for letra in palavra:
+            no = no.setdefault(letra, {})
+            no.setdefault(None, set()).add(chave)   # `None` nunca é uma letra, então guarda as chaves do nó
+
+    def remover(self, palavras: Iterable[str], chave):
+        '''Remove a chave de todas as palavras em que foi inserida, descartando os nós que ficam vazios.'''
+        for palavra in palavras:
+            caminho = []
+            no      = self._raiz
+            for letra in palavra:
+                no = no.get(letra)
+                if no is None:
+                    break
+                caminho.append((letra, no))
+
+            # Os nós são percorridos de baixo para cima, para que um nó vazio seja removido do nó pai:
+            for indice in range(len(caminho) - 1, -1, -1):
+                letra, no = caminho[indice]
+                chaves    = no.get(None)
+                if chaves is not None:
+                    chaves.discard(chave)
+                    if not chaves:
+                        del no[None]
+                if not no:
+                    pai = caminho[indice - 1][1] if indice else self._raiz
+                    del pai[letra]
+
+    def prefixo(self, prefixo: str) -> Set:
+        no = self._raiz
+        for letra in prefixo:
+            no = no.get(letra)
+            if no is None:
+                return set()
+        return no.get(None, set())
+
+class CatalogoIbpt:
+    '''Consulta de IBPTs com cache e busca local por prefixo.
+
+    Cada consulta à API (`misc.get_ibpts`) é guardada pela chave `(código ou descrição, UF)` até o fim da vigência dos
+    IBPTs retornados (`vigencia_fim`). Todos os IBPTs já recebidos também são indexados em uma árvore de prefixos, pelo
+    código (NCM) e pelas palavras da descrição, permitindo sugestões enquanto o usuário digita sem uma requisição por
+    tecla:
+    ```
+    catalogo = CatalogoIbpt(credenciais)
+
+    await catalogo.consultar('2202', 'DF')     # Requisição
+    catalogo.sugerir('220', 'DF')              # Local
+    await catalogo.buscar('agua min', 'DF')    # Local, com requisição apenas quando nada é encontrado
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        ttl (float): Tempo, em segundos, que um IBPT sem `vigencia_fim` é considerado válido.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+    '''
+
+    def __init__(self, credenciais: Credenciais, ttl: float = TTL_IBPT, client: Optional[SisnoClient] = None):
+        self.credenciais = credenciais
+        self.ttl         = ttl
+        self.client      = client
+
+        self._itens    : Dict[tuple, Tuple[Ibpt, datetime]]       = {}  # chave do IBPT -> (IBPT, expira em)
+        self._palavras : Dict[tuple, Set[str]]                    = {}  # chave do IBPT -> palavras na árvore
+        self._consultas: Dict[tuple, Tuple[List[tuple], datetime]] = {}  # (consulta, UF) -> (chaves, expira em)
+        self._tries    : Dict[str, _Trie]                         = {}  # UF -> árvore de prefixos
+        self._tarefas  : Dict[tuple, asyncio.Task]                = {}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def expiracao(self, ibpt: Ibpt) -> datetime:
+        '''Momento em que o IBPT deixa de valer: o fim do dia de `vigencia_fim` (ou agora + `ttl`).'''
+        try:
+            fim = converter_data(ibpt.vigencia_fim)
+        except (ValueError, OverflowError):
+            fim = None
+
+        if fim is None:
+            return datetime.now() + timedelta(seconds=self.ttl)
+
+        return fim.replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None) + timedelta(days=1)
+
+    def _guardar(self, uf: str, ibpts: List[Ibpt]) -> List[tuple]:
+        trie   = self._tries.setdefault(uf, _Trie())
+        chaves = []
+
+        for ibpt in ibpts:
+            chave = (uf, ibpt.codigo, ibpt.ex, ibpt.tipo)
+            self._descartar(chave)     # A descrição pode ter mudado desde a última consulta
+
+            # O código é indexado com e sem pontuação (ex.: "2202.10.00" e "22021000"):
+            codigo   = re.sub(r'\D', '', ibpt.codigo or '')
+            palavras = {*_palavras(ibpt.codigo), *_palavras(codigo), *_palavras(ibpt.descricao)}
+            for palavra in palavras:
+                trie.inserir(palavra, chave)
+
+            self._itens[chave]    = (ibpt, self.expiracao(ibpt))
+            self._palavras[chave] = palavras
+            chaves.append(chave)
+
+        return chaves
+
+    def _descartar(self, chave: tuple):
+        '''Remove o IBPT do cache e da árvore de prefixos, para que a árvore não cresça com IBPTs expirados.'''
+        self._itens.pop(chave, None)
+        palavras = self._palavras.pop(chave, None)
+        if palavras:
+            self._tries[chave[0]].remover(palavras, chave)
+
+    def _validos(self, chaves: Iterable[tuple]) -> List[Ibpt]:
+        agora = datetime.now()
+        ibpts = []
+
+        for chave in chaves:
+            item = self._itens.get(chave)
+            if item is None:
+                continue
+            if item[1] <= agora:
+                self._descartar(chave)
+                continue
+            ibpts.append(item[0])
+
+        return ibpts
+
+    # ------------------------------------------------------------------------------------------------------------------
+    async def consultar(self, cod_desc: str, uf: str) -> List[Ibpt]:
+        '''Equivalente a `misc.get_ibpts`, mas com cache. Consultas simultâneas iguais compartilham a mesma requisição.
+
+        Raises:
+            Exception: Caso o parâmetro cod_desc tenha menos de 4 caracteres ou a API retorne erro.
+        '''
+        uf    = uf.upper()
+        chave = (normalizar_texto(cod_desc).strip(), uf)
+
+        consulta = self._consultas.get(chave)
+        if consulta is not None and consulta[1] > datetime.now():
+            return self._validos(consulta[0])
+
+        tarefa = self._tarefas.get(chave)
+        if tarefa is None:
+            tarefa = self._tarefas[chave] = asyncio.ensure_future(self._consultar(chave, cod_desc, uf))
+            tarefa.add_done_callback(lambda _: self._tarefas.pop(chave, None))
+
+        return await asyncio.shield(tarefa)
+
+    async def _consultar(self, chave: tuple, cod_desc: str, uf: str) -> List[Ibpt]:
+        ibpts = await _get_ibpts(self.credenciais, cod_desc, uf, client=self.client)
+        if ibpts is None:
+            raise Exception(f'Não foi possível consultar os IBPTs de "{cod_desc}" ({uf})')
+
+        # A API também retorna IBPTs com a vigência já encerrada, que são descartados como no cache:
+        chaves                 = self._guardar(uf, ibpts)
+        validos                = self._validos(chaves)
+        chaves                 = [c for c in chaves if c in self._itens]
+        expira_em              = min((self._itens[c][1] for c in chaves), default=datetime.now() + timedelta(seconds=self.ttl))
+        self._consultas[chave] = (chaves, expira_em)
+
+        return validos
+
+    def sugerir(self, texto: str, uf: str, limite: int = 10) -> List[Ibpt]:
+        '''Busca, somente entre os IBPTs já recebidos, aqueles cujo código ou descrição começam com as palavras do texto.'''
+        trie     = self._tries.get(uf.upper())
+        palavras = _palavras(texto)
+
+        if trie is None or not palavras:
+            return []
+
+        chaves = None
+        for palavra in palavras:
+            chaves = trie.prefixo(palavra) if chaves is None else chaves & trie.prefixo(palavra)
+            if not chaves:
+                return []
+
+        # `chaves` pode ser o próprio conjunto da árvore, que `_validos` altera ao descartar os IBPTs expirados:
+        ibpts = sorted(self._validos(list(chaves)), key=lambda i: (i.codigo or '', i.ex or ''))
+        return ibpts[:limite]
+
+    async def buscar(self, texto: str, uf: str, limite: int = 10) -> List[Ibpt]:
+        '''Sugere IBPTs localmente e só consulta a API quando nada é encontrado e o texto tem ao menos 4 caracteres.'''
+        ibpts = self.sugerir(texto, uf, limite)
+
+        if not ibpts and len(texto.strip()) >= 4:
+            await self.consultar(texto.strip(), uf)
+            ibpts = self.sugerir(texto, uf, limite)
+
+        return ibpts
+
+# ======================================================================================================================
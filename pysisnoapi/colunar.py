@@ -0,0 +1,309 @@
+'''
+    Módulo com a conversão das listagens para colunas (Arrow/Parquet ou NumPy).
+
+    As notas de cada bloco da listagem são convertidas diretamente em colunas tipadas, sem montar um dicionário por nota:
+    `valor_total` vira decimal (duas casas) e as datas viram timestamps. Com o `pyarrow` instalado, cada bloco vira um
+    `pyarrow.RecordBatch` e pode ser gravado em Parquet ou Arrow IPC sem manter todas as notas em memória:
+    ```
+    from pysisnoapi import colunar
+
+    await colunar.exportar_nfse(credenciais, 'nfse.parquet', data_inicio=inicio)
+    tabela = await colunar.carregar(nfe.iterar_notas(credenciais, leve=True))   # pyarrow.Table
+    ```
+
+    O `pyarrow` e o `numpy` são opcionais (`pip install pysisnoapi[colunar]`). Sem o `pyarrow`, `carregar`
+    retorna um dicionário de arrays NumPy; a gravação de arquivos exige o `pyarrow`.
+'''
+
+# ======================================================================================================================
+from datetime  import datetime, timezone
+from itertools import islice
+from pathlib   import Path
+from typing    import AsyncIterable, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from . import (
+    AmbientesEnum,
+
+    Credenciais,
+)
+from .datas      import converter_data
+from .dinheiro   import centavos, para_decimal
+from .exportacao import COLUNAS_NFE, COLUNAS_NFSE, _campos, _extrator
+from .sessao     import SisnoClient, get_client
+from .           import nfe, nfse
+
+# ======================================================================================================================
+TEXTO     = 'texto'
+INTEIRO   = 'inteiro'
+DECIMAL   = 'decimal'
+DATA_HORA = 'data_hora'
+
+# Tipo de cada coluna conhecida; as demais são texto:
+TIPOS = {
+    'id'                              : INTEIRO,
+    'valor_total'                     : DECIMAL,
+    'data_emissao'                    : DATA_HORA,
+    'data_autorizacao'                : DATA_HORA,
+    'data_competencia'                : DATA_HORA,
+    'municipio_prestacao.codigo_ibge' : INTEIRO,
+}
+
+PRECISAO_DECIMAL = 18   # Dígitos do `decimal128` de `valor_total` (duas casas decimais)
+
+FORMATOS = {
+    '.parquet': 'parquet',
+    '.arrow'  : 'arrow',
+    '.feather': 'arrow',
+    '.ipc'    : 'arrow',
+}
+
+# ======================================================================================================================
+def extrair_colunas(notas: Iterable, colunas: Sequence[str] = COLUNAS_NFE) -> Dict[str, list]:
+    '''Converte as notas em listas tipadas, uma por coluna (`int`, `Decimal`, `datetime` ou `str`; vazios são `None`).
+
+    Args:
+        notas (Iterable): Notas de uma listagem (ex.: `PaginaNotas.itens`).
+        colunas (Sequence[str]): Atributos das notas, com atributos aninhados separados por ponto (ver
+            `exportacao.Exportador`).
+
+    Raises:
+        ValueError: Caso algum valor não possa ser convertido para o tipo da coluna.
+    '''
+    notas = notas if isinstance(notas, (list, tuple)) else list(notas)
+    return {coluna: _coluna(notas, coluna) for coluna in colunas}
+
+def esquema_arrow(colunas: Sequence[str] = COLUNAS_NFE) -> 'pa.Schema':
+    '''Esquema Arrow das colunas: `int64`, `decimal128(18, 2)`, `timestamp[us]` ou `string`.'''
+    _exigir_pyarrow()
+    tipos = {
+        TEXTO    : pa.string(),
+        INTEIRO  : pa.int64(),
+        DECIMAL  : pa.decimal128(PRECISAO_DECIMAL, 2),
+        DATA_HORA: pa.timestamp('us'),
+    }
+    return pa.schema([pa.field(coluna, tipos[_tipo(coluna)]) for coluna in colunas])
+
+def lote_arrow(notas: Iterable, colunas: Sequence[str] = COLUNAS_NFE) -> 'pa.RecordBatch':
+    '''Converte as notas em um `pyarrow.RecordBatch` (ver `esquema_arrow`).'''
+    esquema = esquema_arrow(colunas)
+    valores = extrair_colunas(notas, colunas)
+    return pa.RecordBatch.from_arrays([pa.array(valores[campo.name], type=campo.type) for campo in esquema], schema=esquema)
+
+def arrays_numpy(notas: Iterable, colunas: Sequence[str] = COLUNAS_NFE) -> Dict[str, 'np.ndarray']:
+    '''Converte as notas em arrays NumPy, um por coluna.
+
+    As datas são `datetime64[us]` (vazios são `NaT`) e os inteiros são `int64` mascarados (`numpy.ma`) nos vazios. Como
+    o NumPy não possui tipo decimal, `valor_total` e os textos são arrays de objetos (`Decimal` e `str`).
+    '''
+    if np is None:
+        raise ImportError('A conversão para arrays requer o pacote "numpy" (pip install numpy)')
+    return _para_numpy(extrair_colunas(notas, colunas))
+
+# ======================================================================================================================
+async def carregar(notas: Union[AsyncIterable, Iterable],
+                   colunas: Sequence[str] = COLUNAS_NFE,
+                   tamanho_lote: int = 10_000):
+    '''Carrega todas as notas em memória, em formato colunar.
+
+    Returns:
+        pyarrow.Table: Caso o `pyarrow` esteja instalado.
+        Dict[str, numpy.ndarray]: Caso contrário, os arrays de `arrays_numpy`.
+
+    Raises:
+        ImportError: Caso nem o `pyarrow` nem o `numpy` estejam instalados.
+    '''
+    if pa is not None:
+        lotes = [lote_arrow(bloco, colunas) async for bloco in _blocos(notas, tamanho_lote)]
+        return pa.Table.from_batches(lotes, schema=esquema_arrow(colunas))
+
+    if np is None:
+        raise ImportError('O formato colunar requer o pacote "pyarrow" ou o pacote "numpy" (pip install pyarrow)')
+
+    valores = {coluna: [] for coluna in colunas}
+    async for bloco in _blocos(notas, tamanho_lote):
+        for coluna, lista in extrair_colunas(bloco, colunas).items():
+            valores[coluna].extend(lista)
+
+    return _para_numpy(valores)
+
+async def exportar(notas: Union[AsyncIterable, Iterable],
+                   caminho: Union[str, Path],
+                   colunas: Sequence[str] = COLUNAS_NFE,
+                   formato: Optional[str] = None,
+                   tamanho_lote: int = 10_000) -> int:
+    '''Grava as notas em um arquivo Parquet ou Arrow IPC, um `RecordBatch` a cada `tamanho_lote` notas.
+
+    Apenas um bloco de notas fica em memória por vez.
+
+    Args:
+        notas (AsyncIterable | Iterable): Notas a serem gravadas (ex.: `nfe.iterar_notas`).
+        caminho (str | Path): Arquivo de saída.
+        colunas (Sequence[str]): Colunas gravadas (ver `extrair_colunas`).
+        formato (str, optional): `parquet` ou `arrow`. Caso não seja informado, é deduzido da extensão do arquivo
+            (`.parquet`, `.arrow`, `.feather` ou `.ipc`).
+        tamanho_lote (int): Quantidade de notas por `RecordBatch` (e por grupo de linhas, no Parquet).
+
+    Raises:
+        ImportError: Caso o `pyarrow` não esteja instalado.
+        ValueError: Caso o formato não seja reconhecido.
+
+    Returns:
+        int: Quantidade de notas gravadas.
+    '''
+    _exigir_pyarrow()
+    caminho = Path(caminho)
+    formato = formato or FORMATOS.get(caminho.suffix.lower())
+    if formato not in FORMATOS.values():
+        raise ValueError(f'Formato colunar não reconhecido para "{caminho.name}": informe formato="parquet" ou formato="arrow"')
+
+    esquema  = esquema_arrow(colunas)
+    escritor = pq.ParquetWriter(str(caminho), esquema) if formato == 'parquet' else pa.ipc.new_file(str(caminho), esquema)
+    linhas   = 0
+
+    try:
+        async for bloco in _blocos(notas, tamanho_lote):
+            lote = lote_arrow(bloco, colunas)
+            escritor.write_batch(lote)
+            linhas += lote.num_rows
+    finally:
+        escritor.close()
+
+    return linhas
+
+async def exportar_nfe(credenciais: Credenciais,
+                       caminho: Union[str, Path],
+                       colunas: Sequence[str] = COLUNAS_NFE,
+                       qtd_por_pagina: Optional[int] = None,
+                       formato: Optional[str] = None,
+                       tamanho_lote: int = 10_000,
+                       client: Optional[SisnoClient] = None) -> int:
+    '''Grava todas as notas fiscais de `nfe.listar` em um arquivo Parquet ou Arrow IPC.
+
+    Apenas os campos usados em `colunas` são lidos de cada nota (ver `pysisnoapi.projetar`). Os demais parâmetros são
+    os mesmos de `exportar` e `nfe.iterar_notas`.
+
+    Returns:
+        int: Quantidade de notas gravadas.
+    '''
+    notas = nfe.iterar_notas(credenciais, qtd_por_pagina=qtd_por_pagina, leve=True, campos=_campos(colunas), client=get_client(client))
+    return await exportar(notas, caminho, colunas, formato=formato, tamanho_lote=tamanho_lote)
+
+async def exportar_nfse(credenciais: Credenciais,
+                        caminho: Union[str, Path],
+                        colunas: Sequence[str] = COLUNAS_NFSE,
+                        cnpjEmpresa: list = None,
+                        data_inicio: datetime = None,
+                        data_fim: datetime = None,
+                        ambiente: AmbientesEnum = None,
+                        status: str = None,
+                        texto: str = None,
+                        qtd_por_pagina: int = None,
+                        max_concorrencia: int = 4,
+                        formato: Optional[str] = None,
+                        tamanho_lote: int = 10_000,
+                        client: Optional[SisnoClient] = None) -> int:
+    '''Grava as notas fiscais de serviço de `nfse.buscar_notas` em um arquivo Parquet ou Arrow IPC.
+
+    Apenas os campos usados em `colunas` são lidos de cada nota (ver `pysisnoapi.projetar`). Os demais parâmetros são
+    os mesmos de `exportar` e `nfse.iterar_notas`.
+
+    Returns:
+        int: Quantidade de notas gravadas.
+    '''
+    notas = nfse.iterar_notas(credenciais,
+                              cnpjEmpresa      = cnpjEmpresa,
+                              data_inicio      = data_inicio,
+                              data_fim         = data_fim,
+                              ambiente         = ambiente,
+                              status           = status,
+                              texto            = texto,
+                              qtd_por_pagina   = qtd_por_pagina,
+                              max_concorrencia = max_concorrencia,
+                              leve             = True,
+                              campos           = _campos(colunas),
+                              client           = get_client(client))
+    return await exportar(notas, caminho, colunas, formato=formato, tamanho_lote=tamanho_lote)
+
+# ======================================================================================================================
+def _tipo(coluna: str) -> str:
+    return TIPOS.get(coluna, TEXTO)
+
+def _coluna(notas: list, coluna: str) -> list:
+    extrair   = _extrator(coluna)
+    converter = _CONVERSORES[_tipo(coluna)]
+    return [converter(extrair(nota)) for nota in notas]
+
+def _inteiro(valor) -> Optional[int]:
+    return None if valor is None or valor == '' else int(valor)
+
+def _decimal(valor):
+    numero = para_decimal(valor)
+    if numero is None and valor not in (None, ''):
+        raise ValueError(f'Valor monetário inválido: "{valor}"')
+    return None if numero is None else centavos(numero)
+
+def _data_hora(valor) -> Optional[datetime]:
+    if not valor:
+        return None
+    data = converter_data(valor)
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc).replace(tzinfo=None)  # Timestamps sem fuso, em UTC
+    return data
+
+def _texto(valor) -> Optional[str]:
+    if valor is None or isinstance(valor, str):
+        return valor
+    return str(getattr(valor, 'value', valor))
+
+_CONVERSORES: Dict[str, Callable] = {
+    TEXTO    : _texto,
+    INTEIRO  : _inteiro,
+    DECIMAL  : _decimal,
+    DATA_HORA: _data_hora,
+}
+
+def _para_numpy(valores: Dict[str, list]) -> Dict[str, 'np.ndarray']:
+    arrays = {}
+    for coluna, lista in valores.items():
+        tipo = _tipo(coluna)
+        if tipo == INTEIRO:
+            arrays[coluna] = np.ma.masked_array([0 if v is None else v for v in lista], mask=[v is None for v in lista], dtype=np.int64)
+        elif tipo == DATA_HORA:
+            arrays[coluna] = np.array(lista, dtype='datetime64[us]')
+        else:
+            arrays[coluna] = np.array(lista, dtype=object)
+    return arrays
+
+def _exigir_pyarrow():
+    if pa is None:
+        raise ImportError('A exportação colunar requer o pacote "pyarrow" (pip install pyarrow)')
+
+async def _blocos(notas: Union[AsyncIterable, Iterable], tamanho: int) -> AsyncIterable[List]:
+    '''Agrupa as notas em listas de até `tamanho` notas.'''
+    if not hasattr(notas, '__aiter__'):
+        iterador = iter(notas)
+        while bloco := list(islice(iterador, tamanho)):
+            yield bloco
+        return
+
+    bloco = []
+    async for nota in notas:
+        bloco.append(nota)
+        if len(bloco) >= tamanho:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+# ======================================================================================================================
@@ -0,0 +1,241 @@
+'''
+    Módulo com utilitários para executar várias requisições simultâneas de forma controlada.
+
+    É utilizado pelas operações em lote (ex.: `nfe.emitir_lote`) para limitar a quantidade de requisições em andamento
+    e a quantidade de requisições iniciadas por segundo, sem carregar toda a entrada em memória.
+'''
+
+# ======================================================================================================================
+import asyncio
+import itertools
+import math
+
+from collections import deque
+
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, NamedTuple, Optional, Union
+
+# ======================================================================================================================
+class ResultadoLote(NamedTuple):
+    '''Resultado de um item processado em lote.
+
+    Attributes:
+        indice (int): Posição do item na entrada.
+        resultado (Any): Valor retornado pela operação (`None` caso tenha ocorrido um erro).
+        erro (Exception): Exceção levantada pela operação (`None` caso tenha ocorrido tudo bem).
+    '''
+    indice   : int
+    resultado: Any
+    erro     : Optional[Exception] = None
+
+class LimitadorTaxa:
+    '''Garante um intervalo mínimo entre o início de duas operações.
+
+    Args:
+        max_por_segundo (float, optional): Quantidade máxima de operações iniciadas por segundo. `None` desabilita o limite.
+    '''
+
+    def __init__(self, max_por_segundo: Optional[float] = None):
+        if max_por_segundo is not None and max_por_segundo <= 0:
+            raise ValueError('O campo "max_por_segundo" deve ser maior que zero')
+
+        self.intervalo = 1 / max_por_segundo if max_por_segundo else 0.0
+        self._proximo  = 0.0
+        self._lock     = asyncio.Lock()
+
+    async def aguardar(self):
+        if not self.intervalo:
+            return
+
+        async with self._lock:
+            loop   = asyncio.get_running_loop()
+            agora  = loop.time()
+            espera = self._proximo - agora
+
+            if espera > 0:
+                await asyncio.sleep(espera)
+                agora = self._proximo
+
+            self._proximo = agora + self.intervalo
+
+# ======================================================================================================================
+async def iterar(itens: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    '''Percorre tanto iteráveis comuns quanto iteráveis assíncronos, um item por vez.'''
+    if hasattr(itens, '__aiter__'):
+        async for item in itens:
+            yield item
+    else:
+        for item in itens:
+            yield item
+
+async def executar_em_lote(funcao: Callable[[Any], Awaitable],
+                           itens: Union[Iterable, AsyncIterable],
+                           max_concorrencia: int = 10,
+                           max_por_segundo: Optional[float] = None,
+                           ordenado: bool = False) -> AsyncIterator[ResultadoLote]:
+    '''Executa `funcao` para cada item, com concorrência e taxa limitadas, produzindo os resultados à medida que terminam.
+
+    A entrada é consumida sob demanda: um novo item só é lido quando há uma vaga livre, portanto a memória utilizada é
+    proporcional a `max_concorrencia` e não ao tamanho da entrada. Exceções levantadas por `funcao` não interrompem o
+    lote, elas são devolvidas em `ResultadoLote.erro`.
+
+    Args:
+        funcao (Callable): Corrotina a ser executada para cada item.
+        itens (Iterable | AsyncIterable): Itens a serem processados.
+        max_concorrencia (int): Quantidade máxima de itens em andamento ao mesmo tempo.
+        max_por_segundo (float, optional): Quantidade máxima de itens iniciados por segundo.
+        ordenado (bool): Caso verdadeiro, os resultados são produzidos na mesma ordem da entrada.
+
+    Returns:
+        AsyncIterator[ResultadoLote]: Resultados identificados pela posição do item na entrada.
+    '''
+    if max_concorrencia < 1:
+        raise ValueError('O campo "max_concorrencia" deve ser maior que zero')
+
+    async def executar(indice: int, item) -> ResultadoLote:
+        try:
+            return ResultadoLote(indice, await funcao(item))
+        except Exception as e:
+            return ResultadoLote(indice, None, e)
+
+    limitador  = LimitadorTaxa(max_por_segundo)
+    entrada    = iterar(itens)
+    pendentes  = set()
+    concluidos = {}     # Somente no modo ordenado: resultados que aguardam os itens anteriores.
+    proximo    = 0      # Somente no modo ordenado: próximo índice a ser produzido.
+    indice     = 0
+    esgotado   = False
+
+    try:
+        while True:
+            while not esgotado and len(pendentes) + len(concluidos) < max_concorrencia:
+                try:
+                    item = await entrada.__anext__()
+                except StopAsyncIteration:
+                    esgotado = True
+                    break
+
+                await limitador.aguardar()
+                pendentes.add(asyncio.create_task(executar(indice, item)))
+                indice += 1
+
+            if not pendentes:
+                break
+
+            finalizados, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+
+            for tarefa in finalizados:
+                resultado = tarefa.result()
+
+                if not ordenado:
+                    yield resultado
+                    continue
+
+                concluidos[resultado.indice] = resultado
+                while proximo in concluidos:
+                    yield concluidos.pop(proximo)
+                    proximo += 1
+    finally:
+        for tarefa in pendentes:
+            tarefa.cancel()
+        # Aguarda o cancelamento, para que nenhuma operação continue em andamento depois que o lote é encerrado:
+        await asyncio.gather(*pendentes, return_exceptions=True)
+        await entrada.aclose()
+
+# ======================================================================================================================
+def para_inteiro(valor: Union[int, str, None]) -> Optional[int]:
+    '''Converte um contador de paginação (ex.: `PaginaNotas.total`, que é texto) para `int`, mantendo `None`.'''
+    if valor is None or valor == '':
+        return None
+    return int(valor)
+
+async def paginar(buscar_pagina: Callable[[int], Awaitable[Any]],
+                  primeira_pagina: int = 0,
+                  max_concorrencia: int = 2,
+                  ordenado: bool = True,
+                  pagina_inicial: Any = None) -> AsyncIterator:
+    '''Percorre todas as páginas de um endpoint de listagem, produzindo os itens de cada página.
+
+    A primeira página é buscada sozinha para descobrir `total` e `itens_por_pagina`. Com isso todas as páginas seguintes
+    são conhecidas e são buscadas simultaneamente (no máximo `max_concorrencia` páginas em memória) enquanto os itens da
+    página atual são consumidos. Caso o endpoint não informe o total, as páginas são buscadas uma a uma até que uma
+    página venha vazia.
+
+    A numeração das páginas não é deduzida das respostas: as páginas buscadas são sempre `primeira_pagina`,
+    `primeira_pagina + 1`, ... Caso uma resposta informe em `pagina_atual` um número diferente do solicitado, a
+    numeração da API é outra e um `ValueError` é levantado, em vez de produzir páginas repetidas ou ausentes.
+
+    Args:
+        buscar_pagina (Callable): Corrotina que recebe o número da página e retorna um objeto com os campos
+            `total`, `itens_por_pagina`, `pagina_atual` e `itens` (ex.: `nfe.PaginaNotas`). Os contadores podem ser
+            números ou textos numéricos.
+        primeira_pagina (int): Número da primeira página (ex.: `nfe.PRIMEIRA_PAGINA`).
+        max_concorrencia (int): Quantidade máxima de páginas buscadas (ou aguardando consumo) ao mesmo tempo.
+        ordenado (bool): Caso verdadeiro, os itens são produzidos na ordem das páginas, caso contrário na ordem em que
+            as páginas chegam.
+        pagina_inicial (Any, optional): Página `primeira_pagina` já buscada pelo chamador, que não é buscada novamente.
+
+    Raises:
+        ValueError: Caso o número de uma página retornada seja diferente do número solicitado.
+
+    Returns:
+        AsyncIterator: Itens de todas as páginas.
+    '''
+    def conferir(pagina, numero: int):
+        atual = para_inteiro(pagina.pagina_atual)
+        if atual is not None and atual != numero:
+            raise ValueError(f'A página {numero} foi solicitada, mas a API retornou a página {atual}. '
+                             f'Confira o número da primeira página ("primeira_pagina")')
+        return pagina
+
+    async def buscar(numero: int):
+        return conferir(await buscar_pagina(numero), numero)
+
+    pagina           = conferir(pagina_inicial, primeira_pagina) if pagina_inicial is not None else await buscar(primeira_pagina)
+    total            = para_inteiro(pagina.total)
+    itens_por_pagina = para_inteiro(pagina.itens_por_pagina)
+
+    if not total or not itens_por_pagina:
+        numero = primeira_pagina
+        while pagina.itens:
+            for item in pagina.itens:
+                yield item
+            numero += 1
+            pagina  = await buscar(numero)
+        return
+
+    total_paginas = math.ceil(total / itens_por_pagina)
+    restantes     = iter(range(primeira_pagina + 1, primeira_pagina + total_paginas))
+    pendentes     = deque() if ordenado else set()
+
+    def agendar():
+        for numero in itertools.islice(restantes, max(max_concorrencia - len(pendentes), 0)):
+            tarefa = asyncio.create_task(buscar(numero))
+            if ordenado:
+                pendentes.append(tarefa)
+            else:
+                pendentes.add(tarefa)
+
+    try:
+        # As próximas páginas são buscadas enquanto a página atual é consumida.
+        agendar()
+        for item in pagina.itens or []:
+            yield item
+
+        while pendentes:
+            if ordenado:
+                finalizadas = [pendentes.popleft()]
+            else:
+                finalizadas, _ = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                pendentes.difference_update(finalizadas)
+
+            for tarefa in finalizadas:
+                pagina = await tarefa
+                agendar()
+                for item in pagina.itens or []:
+                    yield item
+    finally:
+        for tarefa in pendentes:
+            tarefa.cancel()
+        await asyncio.gather(*pendentes, return_exceptions=True)
+
+# ======================================================================================================================
@@ -0,0 +1,30 @@
+'''
+    Módulo com a conversão das datas retornadas pela API.
+
+    Dependendo do endpoint, as datas vêm em ISO 8601 (ex.: "2023-06-02T17:25:57") ou no formato brasileiro
+    (ex.: "02/06/2023 17:25:57"). Os módulos que comparam ou gravam datas (sincronização, espelho, catálogos, exportação
+    colunar) as convertem com `converter_data`:
+    ```
+    from pysisnoapi.datas import converter_data
+
+    converter_data('02/06/2023 17:25:57')    # datetime(2023, 6, 2, 17, 25, 57)
+    ```
+'''
+
+# ======================================================================================================================
+from datetime import datetime
+from typing   import Optional, Union
+from dateutil import parser
+
+# ======================================================================================================================
+def converter_data(valor: Union[str, datetime, None]) -> Optional[datetime]:
+    '''Converte as datas retornadas pela API (ISO 8601 ou `dd/MM/yyyy HH:mm:ss`) em `datetime`.'''
+    if valor is None or isinstance(valor, datetime):
+        return valor
+
+    try:
+        return datetime.fromisoformat(valor)
+    except ValueError:
+        return parser.parse(valor, dayfirst=True)
+
+# ======================================================================================================================
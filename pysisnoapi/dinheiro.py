@@ -0,0 +1,77 @@
+'''
+    Módulo com a aritmética de valores monetários.
+
+    A API recebe e devolve os valores como texto (ex.: "10.50"). Converter esses valores para `float` gera erros de
+    arredondamento (ex.: 3 * 0.335 = 1.0049999...), então todos os cálculos da biblioteca usam `Decimal`:
+    ```
+    from pysisnoapi.dinheiro import centavos, para_decimal
+
+    centavos(para_decimal('3') * para_decimal('0.335'))    # Decimal('1.01')
+    produto.decimal('total')                                 # Decimal('10.00')
+    ```
+'''
+
+# ======================================================================================================================
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing  import Iterable, Optional, Union
+
+CENTAVO = Decimal('0.01')
+
+Valor = Union[str, int, float, Decimal, None]
+
+# ======================================================================================================================
+def para_decimal(valor: Valor) -> Optional[Decimal]:
+    '''Converte o valor em `Decimal`, retornando `None` caso esteja vazio ou não seja numérico.
+
+    Valores `float` são convertidos a partir da sua representação em texto, ou seja, `0.1` vira `Decimal('0.1')`.
+    '''
+    if valor is None:
+        return None
+    if isinstance(valor, Decimal):
+        return valor if valor.is_finite() else None
+
+    texto = str(valor).strip()
+    if not texto:
+        return None
+
+    try:
+        numero = Decimal(texto)
+    except InvalidOperation:
+        return None
+
+    return numero if numero.is_finite() else None
+
+def centavos(valor: Decimal) -> Decimal:
+    '''Arredonda o valor para duas casas decimais (meio centavo arredonda para cima, como na SEFAZ).'''
+    return valor.quantize(CENTAVO, rounding=ROUND_HALF_UP)
+
+def somar(valores: Iterable[Valor]) -> Decimal:
+    '''Soma os valores, ignorando os vazios.'''
+    total = Decimal(0)
+    for valor in valores:
+        numero = para_decimal(valor)
+        if numero is not None:
+            total += numero
+    return total
+
+def formatar(valor: Decimal) -> str:
+    '''Formata o valor no padrão aceito pela API (ex.: "10.50").'''
+    return str(centavos(valor))
+
+# ======================================================================================================================
+class ValoresMonetarios:
+    '''Mixin dos modelos com campos monetários em texto (`Produto`, `Pedido`, `FormaPagamento`, `Parcela`).
+
+    Os campos continuam sendo `str`, como a API espera; os métodos abaixo dão acesso exato aos valores.
+    '''
+
+    def decimal(self, campo: str) -> Optional[Decimal]:
+        '''Valor do campo como `Decimal` (ou `None` caso vazio ou inválido).'''
+        return para_decimal(getattr(self, campo))
+
+    def centavos(self, campo: str) -> Optional[Decimal]:
+        '''Valor do campo arredondado para duas casas decimais (ou `None` caso vazio ou inválido).'''
+        valor = self.decimal(campo)
+        return None if valor is None else centavos(valor)
+
+# ======================================================================================================================
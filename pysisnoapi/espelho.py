@@ -0,0 +1,331 @@
+'''
+    Módulo com um espelho local (SQLite) das notas fiscais.
+
+    Consultas frequentes (ex.: dashboards) podem ser respondidas localmente, sem uma requisição à plataforma SISNO a
+    cada chamada. O espelho é mantido atualizado gravando (upsert) as notas recebidas nas listagens:
+    ```
+    from pysisnoapi.espelho import EspelhoNotas
+
+    espelho = EspelhoNotas('notas.db')
+    await espelho.espelhar(sincronizacao.sincronizar_nfse(credenciais, 'nfse.checkpoint.json'))
+
+    aprovadas = espelho.buscar_notas(status='aprovado', data_inicio=datetime(2023, 6, 1))
+    ```
+'''
+
+# ======================================================================================================================
+import asyncio
+import sqlite3
+import threading
+
+from datetime import datetime
+from pathlib  import Path
+from typing   import AsyncIterable, Iterable, List, Optional, Union
+
+from . import (
+    AmbientesEnum,
+
+    NotaFiscal,
+)
+from .concorrencia import iterar
+from .datas        import converter_data
+from .nfse         import NotaFiscalServico
+
+# ======================================================================================================================
+_ESQUEMA = '''
+CREATE TABLE IF NOT EXISTS nfe (
+    id                    INTEGER PRIMARY KEY,
+    chave_acesso          TEXT,
+    status                TEXT,
+    ambiente              TEXT,
+    cnpj_empresa          TEXT,
+    cpf_cnpj_destinatario TEXT,
+    nome_destinatario     TEXT,
+    uf_destinatario       TEXT,
+    numero_nota           TEXT,
+    data_emissao          TEXT,
+    valor_total           TEXT,
+    dados                 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nfe_chave_acesso          ON nfe (chave_acesso);
+CREATE INDEX IF NOT EXISTS nfe_status                ON nfe (status);
+CREATE INDEX IF NOT EXISTS nfe_cpf_cnpj_destinatario ON nfe (cpf_cnpj_destinatario);
+CREATE INDEX IF NOT EXISTS nfe_data_emissao          ON nfe (data_emissao);
+
+CREATE TABLE IF NOT EXISTS nfse (
+    id                    INTEGER PRIMARY KEY,
+    uuid                  TEXT,
+    status                TEXT,
+    ambiente              TEXT,
+    cnpj_empresa          TEXT,
+    cpf_cnpj_destinatario TEXT,
+    nome_destinatario     TEXT,
+    uf_destinatario       TEXT,
+    numero_nota           TEXT,
+    data_emissao          TEXT,
+    valor_total           TEXT,
+    dados                 TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nfse_uuid                  ON nfse (uuid);
+CREATE INDEX IF NOT EXISTS nfse_status                ON nfse (status);
+CREATE INDEX IF NOT EXISTS nfse_cpf_cnpj_destinatario ON nfse (cpf_cnpj_destinatario);
+CREATE INDEX IF NOT EXISTS nfse_data_emissao          ON nfse (data_emissao);
+CREATE INDEX IF NOT EXISTS nfse_cnpj_empresa          ON nfse (cnpj_empresa, data_emissao);
+'''
+
+_COLUNAS = {
+    'nfe' : ['id', 'chave_acesso', 'status', 'ambiente', 'cnpj_empresa', 'cpf_cnpj_destinatario', 'nome_destinatario', 'uf_destinatario', 'numero_nota', 'data_emissao', 'valor_total', 'dados'],
+    'nfse': ['id', 'uuid', 'status', 'ambiente', 'cnpj_empresa', 'cpf_cnpj_destinatario', 'nome_destinatario', 'uf_destinatario', 'numero_nota', 'data_emissao', 'valor_total', 'dados'],
+}
+
+# Campos aceitos em `ordencao` (mesmos valores de `nfse.buscar_notas`) e a expressão SQL correspondente:
+_ORDENACOES = {
+    'empresa'          : 'cnpj_empresa',
+    'ambiente'         : 'ambiente',
+    'numero_nota'      : 'CAST(numero_nota AS INTEGER)',
+    'status'           : 'status',
+    'data_emissao'     : 'data_emissao',
+    'nome_destinatario': 'nome_destinatario',
+    'uf_destinatario'  : 'uf_destinatario',
+    'valor_total'      : 'CAST(valor_total AS REAL)',
+}
+
+# ======================================================================================================================
+def _data(valor) -> Optional[str]:
+    valor = converter_data(valor)
+    return valor.isoformat() if valor else None
+
+def _id(nota: Union[NotaFiscal, NotaFiscalServico]) -> int:
+    '''Chave da nota no espelho. Sem o `id` o SQLite geraria uma chave nova e a nota seria duplicada.'''
+    if nota.id is None:
+        raise ValueError(f'A nota não possui "id" e não pode ser gravada no espelho (uuid: {getattr(nota, "uuid", None)})')
+    return nota.id
+
+def _linha_nfe(nota: NotaFiscal) -> tuple:
+    return (
+        _id(nota),
+        nota.chave_acesso,
+        nota.status,
+        nota.ambiente,
+        nota.empresa.cnpj if nota.empresa else None,
+        nota.cpf_cnpj_destinatario,
+        nota.nome_destinatario,
+        nota.uf_destinatario,
+        nota.numero_nota,
+        _data(nota.data_emissao),
+        nota.valor_total,
+        nota.model_dump_json(exclude_none=True),
+    )
+
+def _linha_nfse(nota: NotaFiscalServico) -> tuple:
+    return (
+        _id(nota),
+        nota.uuid,
+        nota.status,
+        nota.ambiente,
+        nota.empresa.cnpj if nota.empresa else None,
+        nota.cpf_cnpj_destinatario,
+        nota.nome_destinatario,
+        nota.uf_destinatario,
+        nota.numero_nota or nota.numer_nota,
+        _data(nota.data_emissao),
+        nota.valor_total,
+        nota.model_dump_json(exclude_none=True),
+    )
+
+class EspelhoNotas:
+    '''Espelho local, em SQLite, das notas fiscais (`NotaFiscal`) e notas fiscais de serviço (`NotaFiscalServico`).
+
+    As colunas utilizadas nos filtros (chave de acesso, uuid, status, CPF/CNPJ do destinatário e data de emissão) são
+    indexadas, a nota completa é guardada em JSON. A conexão pode ser compartilhada entre threads.
+
+    As notas são identificadas pelo `id`. Ao gravar uma nota que já está no espelho, apenas os campos informados
+    (diferentes de `None`) são atualizados, tanto nas colunas quanto no JSON. Assim gravar uma nota do modo leve ou
+    projetada (ex.: `nfse.iterar_notas(leve=True)`) não apaga o `xml` nem os demais campos gravados antes.
+
+    Args:
+        caminho (str | Path): Arquivo do banco de dados. O padrão, `:memory:`, mantém o espelho apenas em memória.
+    '''
+
+    def __init__(self, caminho: Union[str, Path] = ':memory:'):
+        self.caminho  = str(caminho)
+        self._lock    = threading.Lock()
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+
+        with self._lock, self._conexao:
+            if self.caminho != ':memory:':
+                self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.executescript(_ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def fechar(self):
+        self._conexao.close()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _gravar(self, tabela: str, linhas: List[tuple]) -> int:
+        colunas     = _COLUNAS[tabela]
+        atualizacao = ', '.join(f'{c} = COALESCE(excluded.{c}, {c})' for c in colunas[1:-1])
+        atualizacao = f'{atualizacao}, dados = json_patch(dados, excluded.dados)'  # O JSON não possui campos `None`
+        sql         = f'INSERT INTO {tabela} ({", ".join(colunas)}) VALUES ({", ".join("?" * len(colunas))}) ON CONFLICT ({colunas[0]}) DO UPDATE SET {atualizacao}'
+
+        with self._lock, self._conexao:
+            self._conexao.executemany(sql, linhas)
+
+        return len(linhas)
+
+    def salvar_nfe(self, notas: Iterable[NotaFiscal]) -> int:
+        '''Insere ou atualiza as notas fiscais (pelo `id`). Retorna a quantidade de notas gravadas.
+
+        Raises:
+            ValueError: Caso alguma nota não possua `id`.
+        '''
+        return self._gravar('nfe', [_linha_nfe(n) for n in notas])
+
+    def salvar_nfse(self, notas: Iterable[NotaFiscalServico]) -> int:
+        '''Insere ou atualiza as notas fiscais de serviço (pelo `id`). Retorna a quantidade de notas gravadas.
+
+        Raises:
+            ValueError: Caso alguma nota não possua `id`.
+        '''
+        return self._gravar('nfse', [_linha_nfse(n) for n in notas])
+
+    async def espelhar(self, notas: Union[Iterable, AsyncIterable], tamanho_lote: int = 500) -> int:
+        '''Grava as notas de uma listagem (ex.: `nfse.iterar_notas`, `sincronizacao.sincronizar_nfe`) em lotes.
+
+        Aceita tanto `NotaFiscal` quanto `NotaFiscalServico`. Retorna a quantidade de notas gravadas. Cada lote é
+        gravado em outra thread, para que o loop de eventos (ex.: as requisições da listagem) não fique parado.
+        '''
+        total     = 0
+        lote_nfe  = []
+        lote_nfse = []
+
+        def gravar(nfes: List[NotaFiscal], nfses: List[NotaFiscalServico]) -> int:
+            return self.salvar_nfe(nfes) + self.salvar_nfse(nfses)
+
+        async for nota in iterar(notas):
+            (lote_nfse if isinstance(nota, NotaFiscalServico) else lote_nfe).append(nota)
+
+            if len(lote_nfe) + len(lote_nfse) >= tamanho_lote:
+                total += await asyncio.to_thread(gravar, lote_nfe, lote_nfse)
+                lote_nfe, lote_nfse = [], []
+
+        return total + await asyncio.to_thread(gravar, lote_nfe, lote_nfse)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _consultar(self,
+                   tabela: str,
+                   filtros: dict,
+                   cnpjEmpresa: list = None,
+                   data_inicio: datetime = None,
+                   data_fim: datetime = None,
+                   texto: str = None,
+                   pagina: int = None,
+                   qtd_por_pagina: int = None,
+                   ordencao: str = None,
+                   tipo_ordenacao: str = None) -> List[str]:
+        condicoes  = []
+        parametros = []
+
+        for coluna, valor in filtros.items():
+            if valor:
+                condicoes.append(f'{coluna} = ?')
+                parametros.append(str(valor))
+
+        if cnpjEmpresa:
+            condicoes.append(f'cnpj_empresa IN ({", ".join("?" * len(cnpjEmpresa))})')
+            parametros.extend(cnpjEmpresa)
+
+        if data_inicio:
+            condicoes.append('data_emissao >= ?')
+            parametros.append(data_inicio.isoformat())
+
+        if data_fim:
+            condicoes.append('data_emissao <= ?')
+            parametros.append(data_fim.isoformat())
+
+        if texto:
+            condicoes.append('(nome_destinatario LIKE ? OR cpf_cnpj_destinatario LIKE ? OR numero_nota LIKE ?)')
+            parametros.extend([f'%{texto}%'] * 3)
+
+        sql = f'SELECT dados FROM {tabela}'
+        if condicoes:
+            sql += ' WHERE ' + ' AND '.join(condicoes)
+
+        if ordencao:
+            if ordencao not in _ORDENACOES:
+                raise ValueError(f'Ordenação "{ordencao}" inválida, utilize uma das opções: {", ".join(_ORDENACOES)}')
+            sql += f' ORDER BY {_ORDENACOES[ordencao]} {"DESC" if (tipo_ordenacao or "").lower() == "desc" else "ASC"}'
+
+        if qtd_por_pagina:
+            sql += ' LIMIT ? OFFSET ?'
+            parametros.extend([qtd_por_pagina, (max(pagina or 1, 1) - 1) * qtd_por_pagina])
+
+        with self._lock:
+            return [d for (d,) in self._conexao.execute(sql, parametros)]
+
+    def buscar_notas(self,
+                     cnpjEmpresa: list = None,
+                     data_inicio: datetime = None,
+                     data_fim: datetime = None,
+                     ambiente: AmbientesEnum = None,
+                     status: str = None,
+                     texto: str = None,
+                     pagina: int = None,
+                     qtd_por_pagina: int = None,
+                     ordencao: str = None,
+                     tipo_ordenacao: str = None,
+                     uuid: str = None,
+                     cpf_cnpj_destinatario: str = None) -> List[NotaFiscalServico]:
+        '''Consulta as notas fiscais de serviço do espelho, com os mesmos parâmetros de `nfse.buscar_notas`.
+
+        Args:
+            pagina (int): Número da página (a partir de 1), só é utilizado junto com `qtd_por_pagina`.
+            uuid (str, optional): UUID da NFSe.
+            cpf_cnpj_destinatario (str, optional): CPF/CNPJ do destinatário (apenas números).
+
+            Os demais parâmetros são os mesmos de `nfse.buscar_notas`.
+
+        Raises:
+            ValueError: Caso `ordencao` não seja um dos campos aceitos por `nfse.buscar_notas`.
+
+        Returns:
+            List[NotaFiscalServico]: Notas encontradas.
+        '''
+        filtros = {'ambiente': ambiente, 'status': status, 'uuid': uuid, 'cpf_cnpj_destinatario': cpf_cnpj_destinatario}
+        dados   = self._consultar('nfse', filtros, cnpjEmpresa, data_inicio, data_fim, texto, pagina, qtd_por_pagina, ordencao, tipo_ordenacao)
+        return [NotaFiscalServico.model_validate_json(d) for d in dados]
+
+    def listar_nfe(self,
+                   cnpjEmpresa: list = None,
+                   data_inicio: datetime = None,
+                   data_fim: datetime = None,
+                   ambiente: AmbientesEnum = None,
+                   status: str = None,
+                   texto: str = None,
+                   pagina: int = None,
+                   qtd_por_pagina: int = None,
+                   ordencao: str = None,
+                   tipo_ordenacao: str = None,
+                   chave_acesso: str = None,
+                   cpf_cnpj_destinatario: str = None) -> List[NotaFiscal]:
+        '''Consulta as notas fiscais do espelho, com os mesmos filtros de `EspelhoNotas.buscar_notas`.'''
+        filtros = {'ambiente': ambiente, 'status': status, 'chave_acesso': chave_acesso, 'cpf_cnpj_destinatario': cpf_cnpj_destinatario}
+        dados   = self._consultar('nfe', filtros, cnpjEmpresa, data_inicio, data_fim, texto, pagina, qtd_por_pagina, ordencao, tipo_ordenacao)
+        return [NotaFiscal.model_validate_json(d) for d in dados]
+
+    def get_nfe(self, chave_acesso: str) -> Optional[NotaFiscal]:
+        '''Retorna a nota fiscal com a chave de acesso informada, caso esteja no espelho.'''
+        notas = self.listar_nfe(chave_acesso=chave_acesso, qtd_por_pagina=1)
+        return notas[0] if notas else None
+
+    def get_nfse(self, uuid: str) -> Optional[NotaFiscalServico]:
+        '''Retorna a nota fiscal de serviço com o UUID informado, caso esteja no espelho.'''
+        notas = self.buscar_notas(uuid=uuid, qtd_por_pagina=1)
+        return notas[0] if notas else None
+
+# ======================================================================================================================
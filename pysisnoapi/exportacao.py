@@ -0,0 +1,467 @@
+'''
+    Módulo com a exportação das listagens para arquivos CSV ou JSON Lines.
+
+    As notas são lidas com as listagens em fluxo (`nfe.listar_fluxo` e `nfse.buscar_notas_fluxo`) e cada nota é escrita
+    no arquivo assim que chega, com um conjunto fixo de colunas. A memória usada não depende da quantidade de notas:
+    ```
+    from pysisnoapi import exportacao
+
+    linhas = await exportacao.exportar_nfse(credenciais, 'nfse.csv.gz', caminho_checkpoint='nfse.exportacao.json')
+    ```
+
+    O formato é deduzido da extensão do arquivo (`.csv`, `.jsonl` ou `.ndjson`, opcionalmente seguida de `.gz`). Com
+    `caminho_checkpoint`, a página seguinte, a quantidade de linhas e o tamanho do arquivo são gravados ao final de cada
+    página. Uma exportação interrompida é retomada a partir da última página concluída: o arquivo é truncado nesse ponto
+    e as páginas seguintes são acrescentadas. Arquivos compactados são gravados em vários membros gzip (um por página),
+    que são lidos normalmente como um único arquivo (ex.: `gzip.open`).
+'''
+
+# ======================================================================================================================
+import csv
+import gzip
+import io
+import json
+import math
+import operator
+import os
+
+from datetime          import date, datetime
+from decimal           import Decimal
+from enum              import Enum
+from pathlib           import Path
+from typing            import AsyncIterable, Callable, Iterable, List, Optional, Sequence, Union
+from typing_extensions import Annotated
+from pydantic          import BaseModel, Field
+
+from . import (
+    AmbientesEnum,
+
+    Credenciais,
+)
+from .concorrencia  import para_inteiro
+from .sessao        import SisnoClient, get_client
+from .sincronizacao import ArquivoCheckpoint
+from .              import nfe, nfse
+
+# ======================================================================================================================
+COLUNAS_NFE = (
+    'id',
+    'chave_acesso',
+    'serie',
+    'numero_nota',
+    'modelo',
+    'status',
+    'motivo',
+    'data_emissao',
+    'data_autorizacao',
+    'cpf_cnpj_destinatario',
+    'nome_destinatario',
+    'uf_destinatario',
+    'valor_total',
+    'ambiente',
+    'empresa.cnpj',
+)
+
+COLUNAS_NFSE = (
+    'id',
+    'uuid',
+    'numero_nota',
+    'codigo_verificacao',
+    'status',
+    'motivo',
+    'data_emissao',
+    'data_competencia',
+    'cpf_cnpj_destinatario',
+    'nome_destinatario',
+    'uf_destinatario',
+    'municipio_prestacao.codigo_ibge',
+    'valor_total',
+    'ambiente',
+    'empresa.cnpj',
+)
+
+FORMATOS = {
+    '.csv'   : 'csv',
+    '.jsonl' : 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+TAMANHO_BUFFER = 64 * 1024  # Caracteres acumulados antes de cada escrita no arquivo
+
+# ======================================================================================================================
+class CheckpointExportacao(ArquivoCheckpoint):
+    '''Progresso de uma exportação paginada.
+
+    Attributes:
+        pagina (int): Próxima página a ser exportada. `None` caso nenhuma página tenha sido concluída.
+        linhas (int): Quantidade de notas já escritas.
+        posicao (int): Tamanho do arquivo (em bytes) ao final da última página concluída.
+        colunas (List[str]): Colunas da exportação, para impedir que um arquivo seja retomado com outras colunas.
+        atualizado_em (datetime): Momento em que o checkpoint foi gravado.
+    '''
+    pagina       : Optional[Annotated[int, Field()]]      = None
+    linhas       : Annotated[int, Field()]                = 0
+    posicao      : Annotated[int, Field()]                = 0
+    colunas      : Annotated[List[str], Field()]          = []
+    atualizado_em: Optional[Annotated[datetime, Field()]] = None
+
+# ======================================================================================================================
+class Exportador:
+    '''Escreve notas, uma a uma, em um arquivo CSV ou JSON Lines (opcionalmente compactado com gzip).
+
+    As linhas são acumuladas em um buffer e escritas em blocos. `marcar` descarrega o buffer, encerra o membro gzip
+    atual e retorna o tamanho do arquivo, que pode ser informado em `posicao` para continuar o arquivo a partir dali.
+    ```
+    with Exportador('notas.csv', COLUNAS_NFE) as exportador:
+        for nota in notas:
+            exportador.escrever(nota)
+    ```
+
+    Args:
+        caminho (str | Path): Arquivo de saída.
+        colunas (Sequence[str]): Atributos de cada nota. Atributos aninhados são separados por ponto (ex.:
+            `empresa.cnpj`) e resultam em vazio quando algum nível é `None`.
+        formato (str, optional): `csv` ou `jsonl`. Caso não seja informado, é deduzido da extensão do arquivo.
+        compactar (bool, optional): Caso verdadeiro, grava com gzip. Caso não seja informado, é deduzido da extensão
+            (`.gz`).
+        delimitador (str): Delimitador das colunas do CSV.
+        posicao (int, optional): Tamanho, em bytes, do trecho do arquivo existente que é mantido. Caso não seja
+            informado, o arquivo é recriado (com o cabeçalho, no caso do CSV).
+        encoding (str): Codificação do arquivo.
+
+    Raises:
+        ValueError: Caso o formato não seja reconhecido ou o arquivo seja menor que `posicao`.
+    '''
+
+    def __init__(self,
+                 caminho: Union[str, Path],
+                 colunas: Sequence[str],
+                 formato: Optional[str] = None,
+                 compactar: Optional[bool] = None,
+                 delimitador: str = ',',
+                 posicao: Optional[int] = None,
+                 encoding: str = 'utf-8'):
+        caminho = Path(caminho)
+        sufixos = [s.lower() for s in caminho.suffixes]
+
+        if compactar is None:
+            compactar = bool(sufixos) and sufixos[-1] == '.gz'
+        if formato is None:
+            sufixos = sufixos[:-1] if sufixos and sufixos[-1] == '.gz' else sufixos
+            formato = FORMATOS.get(sufixos[-1]) if sufixos else None
+        if formato not in FORMATOS.values():
+            raise ValueError(f'Formato de exportação não reconhecido para "{caminho.name}": informe formato="csv" ou formato="jsonl"')
+
+        self.caminho   = caminho
+        self.colunas   = tuple(colunas)
+        self.formato   = formato
+        self.compactar = compactar
+        self.encoding  = encoding
+        self.linhas    = 0
+
+        self._extratores = [_extrator(coluna) for coluna in self.colunas]
+        self._texto      = io.StringIO()
+        self._csv        = csv.writer(self._texto, delimiter=delimitador, lineterminator='\n') if formato == 'csv' else None
+        self._membro     : Optional[gzip.GzipFile] = None
+
+        if posicao is None:
+            self._arquivo = open(caminho, 'wb')
+            if self._csv is not None:
+                self._csv.writerow(self.colunas)
+        else:
+            self._arquivo = open(caminho, 'r+b')
+            if self._arquivo.seek(0, os.SEEK_END) < posicao:
+                self._arquivo.close()
+                raise ValueError(f'O arquivo "{caminho.name}" é menor que a posição informada ({posicao} bytes)')
+            self._arquivo.truncate(posicao)
+            self._arquivo.seek(posicao)
+
+    def escrever(self, nota):
+        '''Acrescenta uma nota ao arquivo.'''
+        valores = [_valor(extrair(nota)) for extrair in self._extratores]
+
+        if self._csv is not None:
+            self._csv.writerow(valores)
+        else:
+            self._texto.write(json.dumps(dict(zip(self.colunas, valores)), ensure_ascii=False))
+            self._texto.write('\n')
+
+        self.linhas += 1
+        if self._texto.tell() >= TAMANHO_BUFFER:
+            self._descarregar()
+
+    def marcar(self) -> int:
+        '''Grava em disco tudo o que já foi escrito e retorna o tamanho do arquivo, em bytes.'''
+        self._descarregar()
+
+        if self._membro is not None:
+            self._membro.close()  # Não fecha `self._arquivo`
+            self._membro = None
+
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        return self._arquivo.tell()
+
+    def fechar(self):
+        '''Grava o que falta e fecha o arquivo.'''
+        if self._arquivo.closed:
+            return
+        try:
+            self.marcar()
+        finally:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.fechar()
+
+    def _descarregar(self):
+        texto = self._texto.getvalue()
+        if not texto:
+            return
+
+        if self.compactar and self._membro is None:
+            self._membro = gzip.GzipFile(fileobj=self._arquivo, mode='wb', mtime=0)
+
+        (self._membro or self._arquivo).write(texto.encode(self.encoding))
+        self._texto.seek(0)
+        self._texto.truncate()
+
+# ======================================================================================================================
+async def exportar(notas: Union[AsyncIterable, Iterable],
+                   caminho: Union[str, Path],
+                   colunas: Sequence[str],
+                   formato: Optional[str] = None,
+                   compactar: Optional[bool] = None,
+                   delimitador: str = ',') -> int:
+    '''Escreve todas as notas de `notas` (ex.: `sincronizacao.sincronizar_nfse`) em um arquivo, sem checkpoint.
+
+    Os parâmetros do arquivo são os mesmos de `Exportador`.
+
+    Returns:
+        int: Quantidade de notas escritas.
+    '''
+    with Exportador(caminho, colunas, formato=formato, compactar=compactar, delimitador=delimitador) as exportador:
+        if hasattr(notas, '__aiter__'):
+            async for nota in notas:
+                exportador.escrever(nota)
+        else:
+            for nota in notas:
+                exportador.escrever(nota)
+
+    return exportador.linhas
+
+async def exportar_paginas(buscar_pagina: Callable[[int, dict], AsyncIterable],
+                           caminho: Union[str, Path],
+                           colunas: Sequence[str],
+                           caminho_checkpoint: Union[str, Path, None] = None,
+                           primeira_pagina: int = 0,
+                           formato: Optional[str] = None,
+                           compactar: Optional[bool] = None,
+                           delimitador: str = ',') -> int:
+    '''Exporta, página a página, as notas produzidas por `buscar_pagina`, com retomada opcional.
+
+    As páginas são buscadas em sequência, sempre com o número explícito (`primeira_pagina`, `primeira_pagina + 1`,
+    ...). A quantidade de páginas é calculada a partir de `total` e `itens_por_pagina` informados pela API, como em
+    `concorrencia.paginar`, de modo que uma página menor que a solicitada (ex.: a API limita o tamanho das páginas) não
+    encerra a exportação. Caso a API não informe os contadores, a exportação termina na primeira página vazia.
+
+    Ao final de cada página o arquivo é gravado em disco e, com `caminho_checkpoint`, o progresso é registrado. Caso o
+    checkpoint exista (e o arquivo também), a exportação continua da página seguinte à última concluída. O checkpoint é
+    apagado ao terminar.
+
+    Args:
+        buscar_pagina (Callable): Recebe o número da página e um dicionário a ser preenchido com os contadores da página
+            (`total`, `itens_por_pagina` e `pagina_atual`), e retorna as notas dela (ex.: `nfe.listar_fluxo` com
+            `contadores`).
+        caminho (str | Path): Arquivo de saída.
+        colunas (Sequence[str]): Colunas exportadas (ver `Exportador`).
+        caminho_checkpoint (str | Path, optional): Arquivo onde o progresso é gravado.
+        primeira_pagina (int): Número da primeira página da API (ex.: `nfe.PRIMEIRA_PAGINA`). Deve ser o mesmo ao
+            retomar uma exportação.
+
+        Os demais parâmetros são os mesmos de `Exportador`.
+
+    Raises:
+        ValueError: Caso o checkpoint tenha sido gravado com outras colunas, ou caso o número de uma página retornada
+            seja diferente do número solicitado.
+
+    Returns:
+        int: Quantidade total de notas no arquivo (incluindo as de execuções anteriores).
+    '''
+    colunas    = list(colunas)
+    checkpoint = CheckpointExportacao.carregar(caminho_checkpoint) if caminho_checkpoint else CheckpointExportacao()
+    retomar    = checkpoint.pagina is not None and Path(caminho).exists()
+
+    if retomar and checkpoint.colunas != colunas:
+        raise ValueError(f'O checkpoint "{caminho_checkpoint}" foi gravado com outras colunas: {", ".join(checkpoint.colunas)}')
+
+    numero = checkpoint.pagina  if retomar else primeira_pagina
+    linhas = checkpoint.linhas  if retomar else 0
+    inicio = checkpoint.posicao if retomar else None
+
+    with Exportador(caminho, colunas, formato=formato, compactar=compactar, delimitador=delimitador, posicao=inicio) as exportador:
+        while True:
+            qtd        = 0
+            contadores = {}
+            async for nota in buscar_pagina(numero, contadores):
+                exportador.escrever(nota)
+                qtd += 1
+
+            atual = para_inteiro(contadores.get('pagina_atual'))
+            if atual is not None and atual != numero:
+                raise ValueError(f'A página {numero} foi solicitada, mas a API retornou a página {atual}. '
+                                 f'Confira o número da primeira página ("primeira_pagina")')
+
+            linhas  += qtd
+            numero  += 1
+            posicao  = exportador.marcar()
+
+            total            = para_inteiro(contadores.get('total'))
+            itens_por_pagina = para_inteiro(contadores.get('itens_por_pagina'))
+
+            if total and itens_por_pagina:
+                if numero >= primeira_pagina + math.ceil(total / itens_por_pagina):
+                    break
+            elif not qtd:
+                break
+
+            if caminho_checkpoint:
+                CheckpointExportacao(pagina=numero, linhas=linhas, posicao=posicao, colunas=colunas, atualizado_em=datetime.now()).salvar(caminho_checkpoint)
+
+    if caminho_checkpoint:
+        Path(caminho_checkpoint).unlink(missing_ok=True)
+
+    return linhas
+
+async def exportar_nfe(credenciais: Credenciais,
+                       caminho: Union[str, Path],
+                       caminho_checkpoint: Union[str, Path, None] = None,
+                       colunas: Sequence[str] = COLUNAS_NFE,
+                       qtd_por_pagina: int = 500,
+                       formato: Optional[str] = None,
+                       compactar: Optional[bool] = None,
+                       delimitador: str = ',',
+                       client: Optional[SisnoClient] = None) -> int:
+    '''Exporta todas as notas fiscais de `nfe.listar` para um arquivo CSV ou JSON Lines.
+
+    Apenas os campos usados em `colunas` são lidos de cada nota (ver `pysisnoapi.projetar`).
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        qtd_por_pagina (int): Quantidade de notas solicitada em cada página.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Os demais parâmetros são os mesmos de `exportar_paginas`.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+
+    Returns:
+        int: Quantidade de notas no arquivo.
+    '''
+    client = get_client(client)
+    campos = _campos(colunas)
+
+    def buscar_pagina(numero: int, contadores: dict) -> AsyncIterable:
+        return nfe.listar_fluxo(credenciais, qtd=str(qtd_por_pagina), pagina=str(numero), leve=True, campos=campos, contadores=contadores, client=client)
+
+    return await exportar_paginas(buscar_pagina, caminho, colunas,
+                                  caminho_checkpoint = caminho_checkpoint,
+                                  primeira_pagina    = nfe.PRIMEIRA_PAGINA,
+                                  formato            = formato,
+                                  compactar          = compactar,
+                                  delimitador        = delimitador)
+
+async def exportar_nfse(credenciais: Credenciais,
+                        caminho: Union[str, Path],
+                        caminho_checkpoint: Union[str, Path, None] = None,
+                        colunas: Sequence[str] = COLUNAS_NFSE,
+                        cnpjEmpresa: list = None,
+                        data_inicio: datetime = None,
+                        data_fim: datetime = None,
+                        ambiente: AmbientesEnum = None,
+                        status: str = None,
+                        texto: str = None,
+                        qtd_por_pagina: int = 500,
+                        formato: Optional[str] = None,
+                        compactar: Optional[bool] = None,
+                        delimitador: str = ',',
+                        client: Optional[SisnoClient] = None) -> int:
+    '''Exporta as notas fiscais de serviço de `nfse.buscar_notas` para um arquivo CSV ou JSON Lines.
+
+    Apenas os campos usados em `colunas` são lidos de cada nota (ver `pysisnoapi.projetar`). Os filtros são os mesmos de
+    `nfse.buscar_notas` e devem ser iguais ao retomar uma exportação.
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        qtd_por_pagina (int): Quantidade de notas solicitada em cada página.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Os demais parâmetros são os mesmos de `exportar_paginas`.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+
+    Returns:
+        int: Quantidade de notas no arquivo.
+    '''
+    client = get_client(client)
+    campos = _campos(colunas)
+
+    def buscar_pagina(numero: int, contadores: dict) -> AsyncIterable:
+        return nfse.buscar_notas_fluxo(credenciais,
+                                       cnpjEmpresa    = cnpjEmpresa,
+                                       data_inicio    = data_inicio,
+                                       data_fim       = data_fim,
+                                       ambiente       = ambiente,
+                                       status         = status,
+                                       texto          = texto,
+                                       pagina         = numero,
+                                       qtd_por_pagina = qtd_por_pagina,
+                                       leve           = True,
+                                       campos         = campos,
+                                       contadores     = contadores,
+                                       client         = client)
+
+    return await exportar_paginas(buscar_pagina, caminho, colunas,
+                                  caminho_checkpoint = caminho_checkpoint,
+                                  primeira_pagina    = nfse.PRIMEIRA_PAGINA,
+                                  formato            = formato,
+                                  compactar          = compactar,
+                                  delimitador        = delimitador)
+
+# ======================================================================================================================
+def _campos(colunas: Sequence[str]) -> List[str]:
+    '''Campos de primeiro nível usados pelas colunas (para a projeção das listagens).'''
+    return sorted({coluna.split('.', 1)[0] for coluna in colunas})
+
+def _extrator(coluna: str) -> Callable:
+    partes = coluna.split('.')
+    if len(partes) == 1:
+        return operator.attrgetter(coluna)
+
+    def extrair(nota):
+        for parte in partes:
+            if nota is None:
+                return None
+            nota = getattr(nota, parte)
+        return nota
+
+    return extrair
+
+def _valor(valor):
+    '''Converte o valor de uma coluna para CSV/JSON.'''
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, Decimal):
+        return str(valor)
+    if isinstance(valor, BaseModel):
+        return valor.model_dump(mode='json')
+    return valor
+
+# ======================================================================================================================
@@ -0,0 +1,144 @@
+'''
+    Módulo com a leitura incremental (streaming) das listagens.
+
+    Com `qtd_por_pagina` alto, o corpo de uma listagem pode ter centenas de MB. `response.json()` exige o corpo inteiro
+    em memória e uma única decodificação antes da primeira nota. O `ExtratorItens` recebe os bytes à medida que chegam e
+    separa cada elemento de `dados.itens` assim que ele termina, de modo que a memória fica limitada ao maior item (mais
+    um bloco de bytes) e a primeira nota fica disponível logo após os seus bytes chegarem:
+    ```
+    async for nota in nfse.buscar_notas_fluxo(credenciais, qtd_por_pagina=50_000):
+        print(nota.uuid, nota.status)
+    ```
+'''
+
+# ======================================================================================================================
+import json
+import re
+
+from typing import AsyncIterator, List, Optional, Sequence, Type, TypeVar
+
+import httpx
+
+from pydantic import BaseModel
+
+M = TypeVar('M', bound=BaseModel)
+
+# Uma string completa (ou o seu início, caso ainda não tenha chegado inteira), um caractere estrutural ou um número:
+_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*(?:(")|\\?\Z)|[{}\[\],]|([-0-9][0-9.eE+-]*)', re.DOTALL)
+
+# ======================================================================================================================
+class ExtratorItens:
+    '''Separa, incrementalmente, os elementos de um array JSON de uma resposta.
+
+    Apenas a estrutura do JSON é percorrida (chaves, colchetes, vírgulas, strings e números): cada elemento é devolvido
+    como os bytes originais, para ser validado depois (ex.: `NotaFiscal.model_validate_json`). Os números e strings do
+    objeto que contém o array (ex.: `total`, `itens_por_pagina` e `pagina_atual` de `dados`) são guardados em
+    `valores`, o restante da resposta é descartado à medida que é lido.
+
+    Args:
+        caminho (Sequence[str]): Chaves até o array, a partir da raiz. Padrão: `('dados', 'itens')`.
+        valores (dict, optional): Dicionário preenchido com os valores do objeto que contém o array. Caso não seja
+            informado, um novo dicionário é criado.
+    '''
+
+    def __init__(self, caminho: Sequence[str] = ('dados', 'itens'), valores: Optional[dict] = None):
+        self.caminho = tuple(caminho)
+        self.valores = {} if valores is None else valores
+
+        self._buffer  = bytearray()
+        self._pos     = 0
+        self._pilha   : List[list] = []            # [tipo ('{' ou '['), chave atual, esperando chave]
+        self._inicio  : Optional[int] = None       # Início do elemento sendo lido
+        self._no_alvo = False                      # Indica se o topo da pilha é o array procurado
+
+    def alimentar(self, bloco: bytes) -> List[bytes]:
+        '''Processa mais um bloco da resposta e retorna os elementos que foram concluídos nele.'''
+        self._buffer += bloco
+        concluidos = []
+        buffer     = self._buffer
+        pilha      = self._pilha
+        pos        = self._pos
+
+        while True:
+            m = _TOKEN.search(buffer, pos)
+            if m is None:
+                pos = len(buffer)
+                break
+
+            i, j = m.span()
+            c    = buffer[i]
+
+            if m.group(2) is not None:                  # Número
+                if j == len(buffer):
+                    pos = i                             # O número pode continuar no próximo bloco
+                    break
+                if self._inicio is None and self._no_objeto():
+                    self.valores[pilha[-1][1]] = json.loads(buffer[i:j])
+            elif c == 0x22:                             # "
+                if m.group(1) is None:
+                    pos = i                             # A string ainda não chegou inteira
+                    break
+                if self._inicio is None and pilha and pilha[-1][0] == '{':
+                    if pilha[-1][2]:
+                        pilha[-1][1] = json.loads(buffer[i:j])
+                        pilha[-1][2] = False
+                    elif self._no_objeto():
+                        self.valores[pilha[-1][1]] = json.loads(buffer[i:j])
+            elif c == 0x7B or c == 0x5B:                # { [
+                if self._no_alvo:
+                    self._inicio = i
+                pilha.append(['{' if c == 0x7B else '[', None, c == 0x7B])
+                self._no_alvo = self._inicio is None and self._e_alvo()
+            elif c == 0x7D or c == 0x5D:                # } ]
+                pilha.pop()
+                if self._inicio is not None:
+                    if len(pilha) == len(self.caminho) + 1:
+                        concluidos.append(bytes(buffer[self._inicio:j]))
+                        self._inicio  = None
+                        self._no_alvo = True
+                else:
+                    self._no_alvo = self._e_alvo()
+            elif pilha and pilha[-1][0] == '{':         # ,
+                pilha[-1][2] = True
+
+            pos = j
+
+        # Descarta o que já foi lido, mantendo apenas o elemento (ou a string) incompleto:
+        corte = pos if self._inicio is None else self._inicio
+
+        del buffer[:corte]
+        self._pos = pos - corte
+        if self._inicio is not None:
+            self._inicio -= corte
+
+        return concluidos
+
+    def _no_objeto(self) -> bool:
+        '''Indica se o topo da pilha é o objeto que contém o array procurado, aguardando um valor.'''
+        profundidade = len(self.caminho)
+        if len(self._pilha) != profundidade or self._pilha[-1][0] != '{' or self._pilha[-1][2]:
+            return False
+        return all(self._pilha[k][1] == chave for k, chave in enumerate(self.caminho[:-1]))
+
+    def _e_alvo(self) -> bool:
+        profundidade = len(self.caminho)
+        if len(self._pilha) != profundidade + 1 or self._pilha[-1][0] != '[':
+            return False
+        return all(self._pilha[k][1] == chave for k, chave in enumerate(self.caminho))
+
+# ======================================================================================================================
+async def iterar_itens(response: httpx.Response,
+                       modelo: Type[M],
+                       caminho: Sequence[str] = ('dados', 'itens'),
+                       valores: Optional[dict] = None) -> AsyncIterator[M]:
+    '''Valida e produz, um a um, os elementos do array `caminho` de uma resposta aberta com `stream`.
+
+    Com `valores`, os números e strings do objeto que contém o array são gravados no dicionário (ver `ExtratorItens`).
+    '''
+    extrator = ExtratorItens(caminho, valores)
+
+    async for bloco in response.aiter_bytes():
+        for item in extrator.alimentar(bloco):
+            yield modelo.model_validate_json(item)
+
+# ======================================================================================================================
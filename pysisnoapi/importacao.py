@@ -0,0 +1,803 @@
+'''
+    Módulo com a importação de notas a partir de planilhas (CSV) no formato de upload do SISNO (ex.: `nfe.CSV_HEADERS`).
+
+    O arquivo é lido linha a linha, portanto a memória utilizada não depende do tamanho do arquivo. Cada linha vira um
+    objeto de emissão ou um erro, que é informado junto com o número da linha sem interromper a importação. As linhas
+    válidas seguem direto para a emissão em lote, que começa enquanto o restante do arquivo ainda está sendo lido:
+    ```
+    from pysisnoapi.importacao import ImportadorNFe
+
+    importador = ImportadorNFe(produtos={p.codigo: p for p in produtos}, serie='1', natureza_operacao='VENDA', ambiente='2')
+
+    async for resultado in importador.emitir(credenciais, 'notas.csv', tipo_emissao='1', max_concorrencia=20):
+        print(resultado.linha, resultado.resultado, resultado.erro)
+
+    print(importador.estatisticas)      # 1000000 linhas (12 inválidas) em 512.3s: 1952 linhas/s
+    ```
+
+    Com `processos`, a montagem e a validação das linhas são feitas em outros processos, em blocos, mantendo a ordem
+    do arquivo e a memória limitada (ver `Importador.ler`).
+'''
+
+# ======================================================================================================================
+import asyncio
+import contextlib
+import csv
+import itertools
+import pickle
+import re
+import time
+
+from collections        import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime           import datetime
+from decimal            import Decimal
+from pathlib            import Path
+from typing             import IO, Any, AsyncIterable, AsyncIterator, Callable, Dict, Generator, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from . import (
+    MEIOS_PAGAMENTO,
+    TIPOS_CONTRIBUINTES,
+
+    Cliente,
+    Credenciais,
+    Endereco,
+    PessoaFisica,
+    PessoaJuridica,
+
+    normalizar_texto,
+)
+from . import nfe, nfse
+from .catalogos    import CatalogoMunicipios
+from .concorrencia import ResultadoLote
+from .dinheiro     import centavos, formatar, para_decimal, somar
+from .sessao       import SisnoClient
+
+# ======================================================================================================================
+PAIS_BRASIL           = '1058'
+DESCRICAO_PAIS_BRASIL = 'BRASIL'
+
+VERDADEIROS = {'1', 's', 'sim', 'true', 'verdadeiro', 'x'}
+FALSOS      = {'', '0', 'n', 'nao', 'false', 'falso'}
+
+# Resultados (emitidos ou inválidos) aguardando o consumidor de `emitir`. Com a fila cheia, a leitura do arquivo e as
+# emissões aguardam, então um arquivo com muitas linhas inválidas não acumula os erros em memória.
+TAMANHO_FILA_RESULTADOS = 1000
+
+Arquivo = Union[str, Path, IO[str]]
+
+# ======================================================================================================================
+class LinhaImportada(NamedTuple):
+    '''Linha lida do arquivo.
+
+    Attributes:
+        linha (int): Número da linha no arquivo (o cabeçalho é a linha 1).
+        objeto (Any): Objeto de emissão montado a partir da linha (`None` caso a linha seja inválida).
+        erro (Exception): Motivo da linha ser inválida (`None` caso tenha ocorrido tudo bem).
+    '''
+    linha : int
+    objeto: Any
+    erro  : Optional[Exception] = None
+
+class ResultadoImportacao(NamedTuple):
+    '''Resultado da emissão de uma linha do arquivo.
+
+    Attributes:
+        linha (int): Número da linha no arquivo (o cabeçalho é a linha 1).
+        resultado (Any): Valor retornado pela emissão (`None` caso a linha seja inválida).
+        erro (Exception): Erro da leitura da linha ou da emissão (`None` caso tenha ocorrido tudo bem).
+    '''
+    linha    : int
+    resultado: Any
+    erro     : Optional[Exception] = None
+
+class EstatisticasImportacao:
+    '''Contadores de uma importação, atualizados à medida que o arquivo é lido e as notas são emitidas.'''
+
+    def __init__(self):
+        self.lidas     = 0
+        self.validas   = 0
+        self.invalidas = 0
+        self.enviadas  = 0      # Emissões concluídas (com ou sem rejeição da SEFAZ)
+        self.falhas    = 0      # Emissões que não foram concluídas (ex.: erro de conexão)
+
+        self.inicio: float           = time.perf_counter()
+        self.fim   : Optional[float] = None
+
+    @property
+    def segundos(self) -> float:
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    @property
+    def linhas_por_segundo(self) -> float:
+        segundos = self.segundos
+        return self.lidas / segundos if segundos > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f'{self.lidas} linhas ({self.invalidas} inválidas) em {self.segundos:.1f}s: {self.linhas_por_segundo:.0f} linhas/s'
+
+# ======================================================================================================================
+class Importador:
+    '''Base dos importadores: lê o CSV linha a linha e monta um objeto de emissão para cada uma (ver `montar`).
+
+    As colunas são localizadas pelo cabeçalho, ignorando acentos, maiúsculas e a ordem. Colunas extras são ignoradas e
+    a falta de alguma coluna de `CABECALHOS` impede a importação (`ValueError`).
+
+    Args:
+        municipios (CatalogoMunicipios, optional): Catálogo utilizado para preencher a descrição do município (e a UF,
+            caso não informada) a partir do código IBGE. Sem ele, apenas o código é enviado.
+        delimitador (str, optional): Separador das colunas. Caso não seja informado, é detectado pelo cabeçalho.
+        encoding (str): Codificação do arquivo.
+    '''
+    CABECALHOS: List[str] = []
+
+    def __init__(self,
+                 municipios: Optional[CatalogoMunicipios] = None,
+                 delimitador: Optional[str] = None,
+                 encoding: str = 'utf-8-sig'):
+        self.municipios   = municipios
+        self.delimitador  = delimitador
+        self.encoding     = encoding
+        self.estatisticas = EstatisticasImportacao()
+
+    def montar(self, valores: Dict[str, str]) -> Any:
+        '''Monta o objeto de emissão a partir dos valores de uma linha, indexados pelos nomes de `CABECALHOS`.
+
+        Com `processos`, é executado em outro processo, portanto não deve alterar o importador (ver `_concluir`).
+        '''
+        raise NotImplementedError
+
+    def _concluir(self, objeto: Any) -> Any:
+        '''Etapa final de cada linha válida, executada sempre no processo principal e na ordem do arquivo.'''
+        return objeto
+
+    def _serializar(self, objeto: Any) -> Any:
+        '''Converte o objeto montado em outro processo no formato enviado ao processo principal (por padrão, `pickle`).'''
+        return objeto
+
+    def _desserializar(self, dados: Any) -> Any:
+        '''Inverso de `_serializar`, executado no processo principal.'''
+        return dados
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def ler(self, arquivo: Arquivo, processos: Optional[int] = None, tamanho_bloco: int = 500) -> Iterator[LinhaImportada]:
+        '''Lê o arquivo, produzindo cada linha (montada ou com o seu erro), na ordem do arquivo, à medida que é lida.
+
+        Args:
+            arquivo (str | Path | IO[str]): Arquivo CSV.
+            processos (int, optional): Caso informado, as linhas são montadas e validadas (`montar`) nessa quantidade
+                de processos, em blocos de `tamanho_bloco` linhas. No máximo dois blocos por processo ficam em memória.
+            tamanho_bloco (int): Quantidade de linhas enviadas de uma vez para cada processo.
+
+        Raises:
+            ValueError: Caso o arquivo esteja vazio ou falte alguma coluna obrigatória.
+        '''
+        self.estatisticas = EstatisticasImportacao()
+
+        registros = self._registros(arquivo)
+        if processos:
+            itens = self._montar_em_processos(registros, processos, tamanho_bloco)
+        else:
+            itens = (self._montar_linha(linha, valores) for linha, valores in registros)
+
+        for item in itens:
+            yield self._contar(item)
+
+        self.estatisticas.fim = time.perf_counter()
+
+    async def ler_async(self, arquivo: Arquivo, processos: Optional[int] = None, tamanho_bloco: int = 500) -> AsyncIterator[LinhaImportada]:
+        '''Equivalente assíncrono de `ler`, com os mesmos argumentos.
+
+        A leitura do arquivo e a montagem das linhas são executadas em outra thread, `tamanho_bloco` linhas por vez, de
+        modo que o loop de eventos (ex.: as emissões em andamento) não fica parado enquanto o arquivo é lido. Com
+        `processos`, os blocos montados nos outros processos são aguardados sem bloquear o loop.
+        '''
+        if processos:
+            self.estatisticas = EstatisticasImportacao()
+
+            async for item in self._montar_em_processos_async(self._registros(arquivo), processos, tamanho_bloco):
+                yield self._contar(item)
+
+            self.estatisticas.fim = time.perf_counter()
+            return
+
+        linhas = _BlocosEmThread(self.ler(arquivo, tamanho_bloco=tamanho_bloco), tamanho_bloco)
+
+        try:
+            while bloco := await linhas.ler():
+                for item in bloco:
+                    yield item
+        finally:
+            await linhas.fechar()
+
+    def _registros(self, arquivo: Arquivo) -> Iterator[Tuple[int, Dict[str, str]]]:
+        '''Produz o número e os valores (indexados pelos nomes de `CABECALHOS`) de cada linha não vazia.'''
+        with self._abrir(arquivo) as f:
+            primeira    = f.readline()
+            delimitador = self.delimitador or self._detectar_delimitador(primeira)
+            cabecalho   = next(csv.reader([primeira], delimiter=delimitador), None)
+            colunas     = self._colunas(cabecalho)
+
+            leitor = csv.reader(f, delimiter=delimitador)
+            for registro in leitor:
+                if not any(valor.strip() for valor in registro):
+                    continue
+                yield leitor.line_num + 1, {nome: registro[i].strip() if i < len(registro) else '' for i, nome in colunas}
+
+    def _contar(self, item: LinhaImportada) -> LinhaImportada:
+        '''Atualiza as estatísticas e conclui (`_concluir`) a linha, caso seja válida.'''
+        self.estatisticas.lidas += 1
+
+        if item.erro is not None:
+            self.estatisticas.invalidas += 1
+            return item
+
+        self.estatisticas.validas += 1
+        return item._replace(objeto=self._concluir(item.objeto))
+
+    def _montar_linha(self, linha: int, valores: Dict[str, str]) -> LinhaImportada:
+        try:
+            return LinhaImportada(linha, self.montar(valores))
+        except Exception as e:
+            return LinhaImportada(linha, None, e)
+
+    def _montar_em_processos(self,
+                             registros: Iterator[Tuple[int, Dict[str, str]]],
+                             processos: int,
+                             tamanho_bloco: int) -> Iterator[LinhaImportada]:
+        # O importador (com os seus catálogos) é enviado uma única vez para cada processo, e não a cada bloco:
+        with ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(self,)) as executor:
+            pendentes = deque()
+
+            while True:
+                bloco = list(itertools.islice(registros, tamanho_bloco))
+                if bloco:
+                    pendentes.append(executor.submit(_montar_bloco, bloco))
+                if not pendentes:
+                    break
+                if bloco and len(pendentes) < 2 * processos:
+                    continue
+
+                for item in pendentes.popleft().result():
+                    yield item if item.erro is not None else item._replace(objeto=self._desserializar(item.objeto))
+
+    async def _montar_em_processos_async(self,
+                                         registros: Iterator[Tuple[int, Dict[str, str]]],
+                                         processos: int,
+                                         tamanho_bloco: int) -> AsyncIterator[LinhaImportada]:
+        '''Mesma distribuição de `_montar_em_processos`, mas os blocos são lidos em outra thread e os resultados dos
+        processos são aguardados com `asyncio.wrap_future`, sem bloquear o loop de eventos.'''
+        executor  = ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(self,))
+        pendentes = deque()
+        blocos    = _BlocosEmThread(registros, tamanho_bloco)
+
+        try:
+            while True:
+                bloco = await blocos.ler()
+                if bloco:
+                    pendentes.append(asyncio.wrap_future(executor.submit(_montar_bloco, bloco)))
+                if not pendentes:
+                    break
+                if bloco and len(pendentes) < 2 * processos:
+                    continue
+
+                for item in await pendentes.popleft():
+                    yield item if item.erro is not None else item._replace(objeto=self._desserializar(item.objeto))
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+            # Encerrar o executor aguarda os processos, o que também não pode parar o loop:
+            await asyncio.to_thread(executor.shutdown, cancel_futures=True)
+            await blocos.fechar()
+
+    async def _emitir_lote(self,
+                           arquivo: Arquivo,
+                           emitir_lote: Callable[[AsyncIterable], AsyncIterator],
+                           processos: Optional[int] = None) -> AsyncIterator[ResultadoImportacao]:
+        '''Envia as linhas válidas para `emitir_lote` enquanto o arquivo é lido, produzindo também as linhas inválidas.
+
+        A leitura e as emissões são executadas em uma tarefa própria, que entrega os dois tipos de resultado na mesma
+        fila limitada (`TAMANHO_FILA_RESULTADOS`).
+        '''
+        saida    = asyncio.Queue(TAMANHO_FILA_RESULTADOS)
+        linhas   = {}       # Posição no lote -> linha do arquivo, somente das emissões em andamento
+        posicoes = itertools.count()
+
+        async def validas() -> AsyncIterator[Any]:
+            async for item in self.ler_async(arquivo, processos=processos):
+                if item.erro is not None:
+                    await saida.put(ResultadoImportacao(item.linha, None, item.erro))
+                    continue
+                linhas[next(posicoes)] = item.linha
+                yield item.objeto
+
+        async def emitir():
+            try:
+                async with contextlib.aclosing(emitir_lote(validas())) as lotes:
+                    async for lote in lotes:
+                        resultado, erro = self._interpretar(lote)
+                        if erro is None:
+                            self.estatisticas.enviadas += 1
+                        else:
+                            self.estatisticas.falhas += 1
+                        await saida.put(ResultadoImportacao(linhas.pop(lote.indice), resultado, erro))
+            except Exception:
+                await saida.put(None)   # Fim da fila, o erro é levantado ao aguardar a tarefa
+                raise
+            await saida.put(None)
+
+        tarefa = asyncio.create_task(emitir())
+        try:
+            while (resultado := await saida.get()) is not None:
+                yield resultado
+            await tarefa    # Levanta o erro da leitura (ex.: coluna ausente), caso exista
+        finally:
+            tarefa.cancel()
+            await asyncio.gather(tarefa, return_exceptions=True)
+
+    def _interpretar(self, lote: ResultadoLote) -> Tuple[Any, Optional[Exception]]:
+        '''Separa o resultado e o erro de um item produzido pelo `emitir_lote`.'''
+        return lote.resultado, lote.erro
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def _pessoa(self, documento: str, nome: str) -> Dict[str, Union[PessoaFisica, PessoaJuridica]]:
+        '''Argumentos de `Cliente` com a pessoa física ou jurídica, conforme a quantidade de dígitos do documento.'''
+        documento = _digitos(documento)
+        if len(documento) == 14:
+            return {'pessoa_juridica': PessoaJuridica(cnpj=documento, razao_social=nome)}
+        return {'pessoa_fisica': PessoaFisica(nome_completo=nome, cpf=documento or None)}
+
+    def _endereco(self, uf: str, codigo_municipio: str, cep: str, **campos) -> Endereco:
+        '''Endereço no Brasil, com a descrição do município (e a UF, caso vazia) obtida de `municipios`.'''
+        uf        = uf.upper() or None
+        codigo    = codigo_municipio or None
+        descricao = None
+
+        if self.municipios is not None and codigo:
+            municipio = self.municipios.por_codigo(codigo)
+            if municipio is None:
+                raise ValueError(f'Município com código IBGE "{codigo}" não encontrado')
+            descricao = municipio.descricao
+            uf        = uf or self.municipios.uf(codigo)
+
+        return Endereco(
+            codigo_pais         = PAIS_BRASIL,
+            descricao_pais      = DESCRICAO_PAIS_BRASIL,
+            uf                  = uf,
+            codigo_municipio    = codigo,
+            descricao_municipio = descricao,
+            cep                 = _digitos(cep) or None,
+            **{campo: valor or None for campo, valor in campos.items()},
+        )
+
+    def _abrir(self, arquivo: Arquivo):
+        if isinstance(arquivo, (str, Path)):
+            return open(arquivo, encoding=self.encoding, newline='')
+        return contextlib.nullcontext(arquivo)
+
+    @staticmethod
+    def _detectar_delimitador(cabecalho: str) -> str:
+        return max(';,\t', key=cabecalho.count)
+
+    def _colunas(self, cabecalho: Optional[List[str]]) -> List[Tuple[int, str]]:
+        if not cabecalho:
+            raise ValueError('Arquivo vazio')
+
+        posicoes = {_chave(nome): i for i, nome in enumerate(cabecalho)}
+        faltando = [nome for nome in self.CABECALHOS if _chave(nome) not in posicoes]
+        if faltando:
+            raise ValueError(f'Colunas ausentes no arquivo: {", ".join(faltando)}')
+
+        return [(posicoes[_chave(nome)], nome) for nome in self.CABECALHOS]
+
+# ======================================================================================================================
+class ImportadorNFe(Importador):
+    '''Importa notas fiscais eletrônicas de um CSV com as colunas de `nfe.CSV_HEADERS`.
+
+    A planilha não possui os dados fiscais dos produtos, então cada produto é informado pelo código e copiado de
+    `produtos` (CFOP, NCM, impostos, ...), com a quantidade e o valor unitário da linha. A coluna `PRODUTOS` contém
+    `codigo:quantidade[:valor_unitario]` separados por `|` (ex.: `123:2|456:1,5:10,90`) e a coluna `MEIO PAGAMENTO` o
+    código do meio (ex.: `01`) ou `meio:valor` separados por `|`, quando houver mais de um. Valores aceitam vírgula
+    decimal e as colunas de códigos aceitam também a descrição (ex.: `Saída` em `OPERAÇÃO`).
+
+    Args:
+        produtos (Mapping[str, Produto]): Produtos cadastrados, indexados pelo código.
+        serie (str): Série das notas.
+        natureza_operacao (str): Natureza da operação das notas.
+        ambiente (str): Ambiente de emissão (ver `AMBIENTES`).
+        numero_inicial (int): Número (`numero_nota_sequencial`) da primeira nota válida, incrementado a cada nota.
+        presenca (str): Indicador de presença do comprador (ver `nfe.PRESENCAS`).
+        forma_pagamento (str): Forma de pagamento (ver `FORMAS_PAGAMENTO`).
+        cnpj_emitente (str, optional): Caso informado, linhas de outro `CNPJ EMITENTE` são inválidas.
+        municipios (CatalogoMunicipios, optional): Catálogo utilizado para preencher a descrição do município (e a UF,
+            caso não informada) a partir do código IBGE. Sem ele, apenas o código é enviado.
+        delimitador (str, optional): Separador das colunas. Caso não seja informado, é detectado pelo cabeçalho.
+        encoding (str): Codificação do arquivo.
+    '''
+    CABECALHOS = nfe.CSV_HEADERS
+
+    SEPARADOR_ITENS  = '|'
+    SEPARADOR_CAMPOS = ':'
+
+    def __init__(self,
+                 produtos: Mapping[str, nfe.Produto],
+                 serie: str,
+                 natureza_operacao: str,
+                 ambiente: str,
+                 numero_inicial: int = 1,
+                 presenca: str = '1',
+                 forma_pagamento: str = '0',
+                 cnpj_emitente: Optional[str] = None,
+                 municipios: Optional[CatalogoMunicipios] = None,
+                 delimitador: Optional[str] = None,
+                 encoding: str = 'utf-8-sig'):
+        super().__init__(municipios, delimitador, encoding)
+
+        self.produtos          = produtos
+        self.serie             = serie
+        self.natureza_operacao = natureza_operacao
+        self.ambiente          = ambiente
+        self.numero            = numero_inicial
+        self.presenca          = presenca
+        self.forma_pagamento   = forma_pagamento
+        self.cnpj_emitente     = _digitos(cnpj_emitente) if cnpj_emitente else None
+
+    async def emitir(self,
+                     credenciais: Credenciais,
+                     arquivo: Arquivo,
+                     tipo_emissao: nfe.TiposEmissaoEnum = '1',
+                     max_concorrencia: int = 10,
+                     max_por_segundo: Optional[float] = None,
+                     validar_localmente: bool = False,
+                     processos: Optional[int] = None,
+                     client: Optional[SisnoClient] = None) -> AsyncIterator[ResultadoImportacao]:
+        '''Lê o arquivo e emite as notas das linhas válidas com `nfe.emitir_lote`, produzindo o resultado de cada linha.
+
+        As linhas inválidas são produzidas com o seu erro, sem requisição. Os resultados não seguem a ordem do arquivo.
+
+        Args:
+            credenciais (Credenciais): Tokens do emissor e da empresa.
+            arquivo (str | Path | IO[str]): Arquivo CSV.
+            tipo_emissao (str): Tipo de Emissão (ver `nfe.emitir`).
+            max_concorrencia (int): Quantidade máxima de emissões em andamento ao mesmo tempo.
+            max_por_segundo (float, optional): Quantidade máxima de emissões iniciadas por segundo.
+            validar_localmente (bool): Caso verdadeiro, as notas passam por `validacao.validar_nfe` antes do envio.
+            processos (int, optional): Quantidade de processos que montam as linhas (ver `ler`).
+            client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Returns:
+            AsyncIterator[ResultadoImportacao]: Resultado de cada linha do arquivo.
+        '''
+        def emitir_lote(objetos: AsyncIterable[nfe.ObjetoEmissaoNFe]) -> AsyncIterator[ResultadoLote]:
+            return nfe.emitir_lote(credenciais, objetos, tipo_emissao,
+                                   max_concorrencia   = max_concorrencia,
+                                   max_por_segundo    = max_por_segundo,
+                                   validar_localmente = validar_localmente,
+                                   client             = client)
+
+        async for resultado in self._emitir_lote(arquivo, emitir_lote, processos):
+            yield resultado
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def montar(self, valores: Dict[str, str]) -> nfe.ObjetoEmissaoNFe:
+        if self.cnpj_emitente and _digitos(valores['CNPJ EMITENTE']) != self.cnpj_emitente:
+            raise ValueError(f'CNPJ do emitente "{valores["CNPJ EMITENTE"]}" diferente de "{self.cnpj_emitente}"')
+
+        produtos = self._produtos(valores['PRODUTOS'])
+        total    = somar(p.total for p in produtos)
+        data     = datetime.now()
+
+        return nfe.ObjetoEmissaoNFe(
+            numero_nota_sequencial = str(self.numero),
+            serie                  = self.serie,
+            operacao               = _opcao(valores['OPERAÇÃO'], 'OPERAÇÃO', _OPERACOES),
+            natureza_operacao      = self.natureza_operacao,
+            modelo                 = _opcao(valores['MODELO'], 'MODELO', _MODELOS),
+            finalidade             = _opcao(valores['FINALIDADE'], 'FINALIDADE', _FINALIDADES),
+            ambiente               = self.ambiente,
+            cliente                = self._cliente(valores),
+            produtos               = produtos,
+            pedido                 = nfe.Pedido(
+                presenca                   = self.presenca,
+                pagamento                  = nfe.Pagamento(formas_pagamento=self._pagamentos(valores['MEIO PAGAMENTO'], total)),
+                total                      = formatar(total),
+                informacoes_complementares = valores['INFORMAÇÕES COMPLEMENTARES'] or None,
+            ),
+            data_entrada_saida     = data,
+            data_emissao           = data,
+        )
+
+    def _concluir(self, objeto: nfe.ObjetoEmissaoNFe) -> nfe.ObjetoEmissaoNFe:
+        # O número é atribuído aqui, na ordem do arquivo e apenas às linhas válidas, para não deixar lacunas:
+        objeto.numero_nota_sequencial = str(self.numero)
+        self.numero += 1
+        return objeto
+
+    def _cliente(self, valores: Dict[str, str]) -> Cliente:
+        return Cliente(
+            consumidor_final = '1' if _booleano(valores['CONSUMIDOR FINAL'], 'CONSUMIDOR FINAL') else '0',
+            contribuinte     = _opcao(valores['INDICADOR IE'], 'INDICADOR IE', _CONTRIBUINTES),
+            endereco         = self._endereco(
+                uf               = valores['SIGLA UF'],
+                codigo_municipio = valores['IBGE MUNICÍPIO'],
+                cep              = valores['CEP'],
+                bairro           = valores['BAIRRO'],
+                logradouro       = valores['LOGRADOURO'],
+                numero           = valores['NUMERO'],
+                complemento      = valores['COMPLEMENTO ENDEREÇO'],
+            ),
+            email            = valores['EMAIL DESTINATÁRIO'] or None,
+            faz_retencao     = _booleano(valores['FAZ RETENÇÃO DE IMPOSTOS'], 'FAZ RETENÇÃO DE IMPOSTOS'),
+            **self._pessoa(valores['CPF/CNPJ DESTINATÁRIO'], valores['NOME/RAZAO SOCIAL DESTINATÁRIO']),
+        )
+
+    def _produtos(self, texto: str) -> List[nfe.Produto]:
+        produtos = []
+
+        for item, descricao in enumerate(_itens(texto, self.SEPARADOR_ITENS), start=1):
+            codigo, *numeros = [parte.strip() for parte in descricao.split(self.SEPARADOR_CAMPOS)]
+            if len(numeros) not in (1, 2):
+                raise ValueError(f'Produto "{descricao}" deve estar no formato codigo:quantidade[:valor_unitario]')
+
+            modelo = self.produtos.get(codigo)
+            if modelo is None:
+                raise ValueError(f'Produto "{codigo}" não cadastrado')
+
+            quantidade = _numero(numeros[0], 'quantidade')
+            subtotal   = _numero(numeros[1], 'valor_unitario') if len(numeros) == 2 else modelo.decimal('subtotal')
+            if subtotal is None:
+                raise ValueError(f'Produto "{codigo}" sem valor unitário')
+
+            produtos.append(modelo.model_copy(update={
+                'item'      : str(item),
+                'quantidade': str(quantidade),
+                'subtotal'  : str(subtotal),
+                'total'     : formatar(centavos(quantidade * subtotal)),
+            }))
+
+        if not produtos:
+            raise ValueError('Nenhum produto informado')
+        return produtos
+
+    def _pagamentos(self, texto: str, total: Decimal) -> List[nfe.FormaPagamento]:
+        pagamentos = []     # [meio, valor]
+
+        for descricao in _itens(texto, self.SEPARADOR_ITENS):
+            meio, *valor = [parte.strip() for parte in descricao.split(self.SEPARADOR_CAMPOS)]
+            pagamentos.append([_opcao(meio, 'MEIO PAGAMENTO', _MEIOS_PAGAMENTO), _numero(valor[0], 'valor') if valor else None])
+
+        if not pagamentos:
+            raise ValueError('Nenhum meio de pagamento informado')
+
+        # Um único meio sem valor recebe o que falta para completar o total:
+        sem_valor = [p for p in pagamentos if p[1] is None]
+        if len(sem_valor) > 1:
+            raise ValueError('Com mais de um meio de pagamento, apenas um pode ficar sem valor')
+        if sem_valor:
+            sem_valor[0][1] = total - somar(p[1] for p in pagamentos if p[1] is not None)
+
+        return [
+            nfe.FormaPagamento(
+                forma_pagamento = self.forma_pagamento,
+                meio_pagamento  = meio,
+                valor_pagamento = formatar(centavos(valor)),
+                tipo_integracao = '2' if meio in ('03', '04') else None,   # Pagamento não integrado ao sistema de automação
+            )
+            for meio, valor in pagamentos
+        ]
+
+class ImportadorNFSe(Importador):
+    '''Importa notas fiscais de serviço de um CSV com as colunas de `nfse.CSV_HEADERS` (ex.: faturamento mensal).
+
+    A coluna `Serviço` contém o código de um serviço de `servicos` (discriminação, impostos, ...), opcionalmente
+    seguido do valor: `codigo[:valor]` (ex.: `consultoria:1.500,00`). Sem valor, é utilizado o `valor_servicos` do
+    serviço cadastrado. Os códigos são comparados sem acentos e sem diferença entre maiúsculas e minúsculas.
+
+    Args:
+        servicos (Mapping[str, Servico]): Serviços cadastrados, indexados pelo código.
+        municipios (CatalogoMunicipios, optional): Catálogo utilizado para preencher a descrição do município (e a UF,
+            caso não informada) a partir do código IBGE. Sem ele, apenas o código é enviado.
+        delimitador (str, optional): Separador das colunas. Caso não seja informado, é detectado pelo cabeçalho.
+        encoding (str): Codificação do arquivo.
+    '''
+    CABECALHOS = nfse.CSV_HEADERS
+
+    SEPARADOR_CAMPOS = ':'
+
+    def __init__(self,
+                 servicos: Mapping[str, nfse.Servico],
+                 municipios: Optional[CatalogoMunicipios] = None,
+                 delimitador: Optional[str] = None,
+                 encoding: str = 'utf-8-sig'):
+        super().__init__(municipios, delimitador, encoding)
+
+        self.servicos = {_chave(codigo): servico for codigo, servico in servicos.items()}
+
+    async def emitir(self,
+                     credenciais: Credenciais,
+                     arquivo: Arquivo,
+                     max_concorrencia: int = 10,
+                     max_por_segundo: Optional[float] = None,
+                     processos: Optional[int] = None,
+                     client: Optional[SisnoClient] = None) -> AsyncIterator[ResultadoImportacao]:
+        '''Lê o arquivo e emite as notas das linhas válidas com `nfse.emitir_lote`, produzindo o resultado de cada linha.
+
+        O resultado das linhas válidas é o `nfse.ResultadoEmissaoNFSe` (aprovada, em processamento, reprovada ou erro).
+        As linhas inválidas são produzidas com o seu erro, sem requisição. Os resultados não seguem a ordem do arquivo.
+
+        Args:
+            credenciais (Credenciais): Tokens do emissor e da empresa.
+            arquivo (str | Path | IO[str]): Arquivo CSV.
+            max_concorrencia (int): Quantidade máxima de emissões em andamento ao mesmo tempo.
+            max_por_segundo (float, optional): Quantidade máxima de emissões iniciadas por segundo.
+            processos (int, optional): Quantidade de processos que montam e validam as linhas (ver `ler`).
+            client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Returns:
+            AsyncIterator[ResultadoImportacao]: Resultado de cada linha do arquivo.
+        '''
+        def emitir_lote(objetos: AsyncIterable[nfse.ObjetoEmissaoNFSe]) -> AsyncIterator[nfse.ResultadoEmissaoNFSe]:
+            return nfse.emitir_lote(credenciais, objetos,
+                                    max_concorrencia = max_concorrencia,
+                                    max_por_segundo  = max_por_segundo,
+                                    client           = client)
+
+        async for resultado in self._emitir_lote(arquivo, emitir_lote, processos):
+            yield resultado
+
+    # Em JSON o envio entre processos custa cerca de um terço do `pickle` dos modelos:
+    def _serializar(self, objeto: nfse.ObjetoEmissaoNFSe) -> str:
+        return objeto.model_dump_json()
+
+    def _desserializar(self, dados: str) -> nfse.ObjetoEmissaoNFSe:
+        return nfse.ObjetoEmissaoNFSe.model_validate_json(dados)
+
+    def _interpretar(self, lote: nfse.ResultadoEmissaoNFSe) -> Tuple[Any, Optional[Exception]]:
+        # Notas reprovadas pela prefeitura são um resultado, apenas as requisições não concluídas são erros:
+        return lote, Exception(lote.motivo) if lote.situacao == 'erro' else None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    def montar(self, valores: Dict[str, str]) -> nfse.ObjetoEmissaoNFSe:
+        if valores['CNPJ'] and valores['CPF']:
+            raise ValueError('Informe apenas uma das colunas: CNPJ ou CPF')
+
+        faz_retencao = _booleano(valores['Faz Retenção'], 'Faz Retenção')
+
+        cliente = Cliente(
+            consumidor_final = '1' if _booleano(valores['Consumidor Final'], 'Consumidor Final') else '0',
+            contribuinte     = _opcao(valores['Indicador IE'], 'Indicador IE', _CONTRIBUINTES),
+            endereco         = self._endereco(
+                uf               = valores['UF'],
+                codigo_municipio = valores['IBGE'],
+                cep              = valores['CEP'],
+                bairro           = valores['Bairro'],
+                logradouro       = valores['Endereço'],
+                numero           = valores['Número'],
+                complemento      = valores['Complemento'],
+            ),
+            email            = valores['E-mail'] or None,
+            faz_retencao     = faz_retencao,
+            **self._pessoa(valores['CNPJ'] or valores['CPF'], valores['Nome']),
+        )
+
+        return nfse.ObjetoEmissaoNFSe(cliente=cliente, servico=self._servico(valores['Serviço'], faz_retencao, valores['Informações Complementares']))
+
+    def _servico(self, texto: str, iss_retido: bool, informacoes_complementares: str) -> nfse.Servico:
+        codigo, *valor = [parte.strip() for parte in texto.split(self.SEPARADOR_CAMPOS)]
+        if len(valor) > 1:
+            raise ValueError(f'Serviço "{texto}" deve estar no formato codigo[:valor]')
+
+        modelo = self.servicos.get(_chave(codigo))
+        if modelo is None:
+            raise ValueError(f'Serviço "{codigo}" não cadastrado')
+
+        valor = _numero(valor[0], 'valor') if valor else _numero(modelo.valor_servicos, 'valor_servicos')
+        if valor <= 0:
+            raise ValueError(f'Valor do serviço "{codigo}" deve ser maior que zero')
+
+        return modelo.model_copy(update={
+            'valor_servicos'            : formatar(centavos(valor)),
+            'iss_retido'                : nfse.IndicadoresIssRetidoEnum('1' if iss_retido else '2'),
+            'responsavel_retencao_iss'  : nfse.ResponsaveisRetencaoIssEnum('1') if iss_retido else None,     # Tomador
+            'informacoes_complementares': informacoes_complementares or modelo.informacoes_complementares,
+        })
+
+# ======================================================================================================================
+class _BlocosEmThread:
+    '''Lê um gerador em blocos de `tamanho` itens, em outra thread, para `Importador.ler_async`.
+
+    Cancelar a tarefa não interrompe a thread. Por isso `fechar` aguarda a leitura em andamento terminar antes de fechar
+    o gerador (fechar um gerador que ainda está executando levanta `ValueError` e deixa o arquivo aberto).
+    '''
+
+    def __init__(self, gerador: Generator, tamanho: int):
+        self.gerador = gerador
+        self.tamanho = tamanho
+        self._leitura: Optional[asyncio.Future] = None
+
+    async def ler(self) -> list:
+        self._leitura = asyncio.ensure_future(asyncio.to_thread(list, itertools.islice(self.gerador, self.tamanho)))
+        return await asyncio.shield(self._leitura)
+
+    async def fechar(self):
+        if self._leitura is not None:
+            await asyncio.wait([self._leitura])
+            if not self._leitura.cancelled():
+                self._leitura.exception()   # A exceção (caso exista) já foi levantada em `ler`
+
+        await asyncio.to_thread(self.gerador.close)
+
+# ======================================================================================================================
+_importador_processo: Optional[Importador] = None     # Importador de cada processo de `Importador.ler`
+
+def _iniciar_processo(importador: Importador):
+    global _importador_processo
+    _importador_processo = importador
+
+def _montar_bloco(bloco: List[Tuple[int, Dict[str, str]]]) -> List[LinhaImportada]:
+    '''Executado nos processos de `Importador.ler`: monta as linhas de um bloco.'''
+    linhas = [_importador_processo._montar_linha(linha, valores) for linha, valores in bloco]
+
+    for i, item in enumerate(linhas):
+        if item.erro is None:
+            linhas[i] = item._replace(objeto=_importador_processo._serializar(item.objeto))
+            continue
+
+        # O erro precisa voltar para o processo principal, o que nem toda exceção permite:
+        try:
+            pickle.dumps(item.erro)
+        except Exception:
+            linhas[i] = item._replace(erro=ValueError(str(item.erro)))
+
+    return linhas
+
+# ======================================================================================================================
+def _chave(nome: str) -> str:
+    return re.sub(r'\s+', ' ', normalizar_texto(nome)).strip()
+
+def _digitos(texto: Optional[str]) -> str:
+    return re.sub(r'\D', '', texto or '')
+
+def _itens(texto: str, separador: str) -> List[str]:
+    return [item.strip() for item in texto.split(separador) if item.strip()]
+
+def _numero(texto: str, nome: str) -> Decimal:
+    '''Converte números com vírgula ou ponto decimal (ex.: "1.234,56" ou "1234.56").'''
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+
+    valor = para_decimal(texto)
+    if valor is None:
+        raise ValueError(f'Campo "{nome}" deve ser numérico e não "{texto}"')
+    return valor
+
+def _booleano(valor: str, coluna: str) -> bool:
+    chave = normalizar_texto(valor).strip()
+    if chave in VERDADEIROS:
+        return True
+    if chave in FALSOS:
+        return False
+    raise ValueError(f'Coluna "{coluna}": valor "{valor}" deve ser Sim ou Não')
+
+def _indice(opcoes: Dict[str, str]) -> Dict[str, str]:
+    '''Índice de uma tabela de códigos pelo código (com ou sem zeros à esquerda) e pela descrição.'''
+    indice = {_chave(descricao): codigo for codigo, descricao in opcoes.items()}
+    indice.update({codigo.lstrip('0') or '0': codigo for codigo in opcoes})
+    indice.update({codigo: codigo for codigo in opcoes})
+    return indice
+
+def _opcao(valor: str, coluna: str, indice: Dict[str, str]) -> str:
+    '''Retorna o código da opção a partir do código ou da descrição (ver `_indice`).'''
+    codigo = indice.get(valor) or indice.get(_chave(valor))
+    if codigo is None:
+        raise ValueError(f'Coluna "{coluna}": valor "{valor}" inválido')
+    return codigo
+
+# Tabelas de códigos indexadas uma única vez, já que são consultadas a cada linha:
+_CONTRIBUINTES   = _indice(TIPOS_CONTRIBUINTES)
+_FINALIDADES     = _indice(nfe.FINALIDADES)
+_MEIOS_PAGAMENTO = _indice(MEIOS_PAGAMENTO)
+_MODELOS         = _indice(nfe.MODELOS)
+_OPERACOES       = _indice(nfe.OPERACOES)
+
+# ======================================================================================================================
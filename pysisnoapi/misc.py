@@ -9,44 +9,48 @@
 '''
 
 # ======================================================================================================================
-import httpx
-
-from typing import List
+from pathlib  import Path
+from typing   import List, Optional, Union
 from pydantic import validate_call
 
 from . import (
-    BASE_URL,
-    HEADERS,
-
     Cfop,
+    Credenciais,
     Ibpt,
     Municipio,
-
-    validate_tokens,
 )
+from .cache  import CacheTTL
+from .sessao import SisnoClient, get_client
+
+# ======================================================================================================================
+TTL_CFOPS = 7 * 24 * 60 * 60    # A tabela de CFOPs muda poucas vezes por ano
 
 # ======================================================================================================================
 @validate_call
 async def get_cfops(token_emissor: str,
               token_secret_emissor: str,
-              *args, **kwargs) -> List[Cfop]:
+              *args,
+              client: Optional[SisnoClient] = None,
+              **kwargs) -> List[Cfop]:
     '''Obtém a lista de todos os CFOPs disponíveis através de uma requisição à API.
 
     Essa função permite obter a lista completa de CFOPs (Código Fiscal de Operações e Prestações) disponíveis através de uma requisição à API.
 
+    Args:
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
     Returns:
         List[Cfop]: Uma lista de objetos Cfop, representando os CFOPs disponíveis.
     '''
 
-    headers  = HEADERS.copy()
+    credenciais = Credenciais(token_emissor=token_emissor, token_secret_emissor=token_secret_emissor)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+    return await _get_cfops(credenciais, client=client)
 
-    url      = f'{BASE_URL}/cfops'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
+async def _get_cfops(credenciais: Credenciais,
+                     client: Optional[SisnoClient] = None) -> List[Cfop]:
+    client   = get_client(client)
+    response = await client.get(client.url('cfops'), headers=credenciais.headers_emissor)
 
     match (response.status_code):
         case 200:
@@ -60,12 +64,46 @@ async def get_cfops(token_emissor: str,
 
     # TODO: return response ?
 
+def cache_cfops(credenciais: Credenciais,
+                ttl: float = TTL_CFOPS,
+                caminho: Optional[Union[str, Path]] = None,
+                client: Optional[SisnoClient] = None) -> CacheTTL[List[Cfop]]:
+    '''Cria um cache para a lista de CFOPs, evitando uma requisição a cada chamada de `get_cfops`.
+    ```
+    cfops = misc.cache_cfops(credenciais, caminho='cfops.json')
+
+    lista = await cfops.obter()
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        ttl (float): Tempo, em segundos, que a lista é considerada válida.
+        caminho (str | Path, optional): Arquivo onde a lista é persistida e de onde é lida ao iniciar o processo.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Returns:
+        CacheTTL[List[Cfop]]: Cache cujo método `obter()` retorna a lista de CFOPs.
+    '''
+    async def carregar() -> List[Cfop]:
+        cfops = await _get_cfops(credenciais, client=client)
+        if not cfops:
+            raise Exception('Não foi possível obter a lista de CFOPs')
+        return cfops
+
+    return CacheTTL(carregar,
+                    ttl           = ttl,
+                    caminho       = caminho,
+                    serializar    = lambda cfops: [c.model_dump() for c in cfops],
+                    desserializar = lambda dados: [Cfop(**d) for d in dados])
+
 @validate_call
 async def get_ibpts(token_emissor: str,
               token_secret_emissor: str,
               cod_desc: str,
               uf: str,
-              *args, **kwargs) -> List[Ibpt]:
+              *args,
+              client: Optional[SisnoClient] = None,
+              **kwargs) -> List[Ibpt]:
     '''
     Obtém os IBPTs através de uma requisição à API.
 
@@ -74,6 +112,7 @@ async def get_ibpts(token_emissor: str,
     Args:
         cod_desc (str): Breve descrição do item ou código. Deve ter no mínimo 4 caracteres.
         uf (str): UF do estado para o qual deseja-se consultar os IBPTs.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
 
     Raises:
         Exception: Caso o parâmetro cod_desc tenha menos de 4 caracteres.
@@ -82,26 +121,28 @@ async def get_ibpts(token_emissor: str,
         List[Ibpt]: Uma lista de objetos Ibpt representando os IBPTs.
     '''
 
-    if len(cod_desc) < 4:
-        raise Exception('Código ou Descrição precisa ter no mínimo 4 caracteres')
+    credenciais = Credenciais(token_emissor=token_emissor, token_secret_emissor=token_secret_emissor)
 
-    headers  = HEADERS.copy()
+    return await _get_ibpts(credenciais, cod_desc, uf, client=client)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+async def _get_ibpts(credenciais: Credenciais,
+                     cod_desc: str,
+                     uf: str,
+                     client: Optional[SisnoClient] = None) -> List[Ibpt]:
+    if len(cod_desc) < 4:
+        raise Exception('Código ou Descrição precisa ter no mínimo 4 caracteres')
 
+    headers = credenciais.headers_emissor.copy()
     headers['codigo-ou-descricao'] = cod_desc
     headers['uf'] = uf
 
-    url      = f'{BASE_URL}/ibpts'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
+    client   = get_client(client)
+    response = await client.get(client.url('ibpts'), headers=headers)
 
     match (response.status_code):
         case 200:
             json_data = response.json().get('dados')
-            ibpts     = [Ibpt.from_json(**d) for d in json_data]
+            ibpts     = [Ibpt(**d) for d in json_data]
             return ibpts
         case 412:
             return []
@@ -114,7 +155,9 @@ async def get_ibpts(token_emissor: str,
 async def get_municipios(token_emissor: str,
                    token_secret_emissor: str,
                    uf: str,
-                   *args, **kwargs) -> List[Municipio]:
+                   *args,
+                   client: Optional[SisnoClient] = None,
+                   **kwargs) -> List[Municipio]:
     '''Consulta os municípios de um determinado estado através de uma requisição à API.
 
     Essa função permite consultar os municípios de um estado específico através de uma requisição à API.
@@ -122,20 +165,21 @@ async def get_municipios(token_emissor: str,
 
     Args:
         uf (str): UF do estado para o qual deseja-se consultar os municípios.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
 
     Returns:
         List[Municipio]: Uma lista de objetos Municipio, representando os municípios do estado consultado.
     '''
 
-    headers  = HEADERS.copy()
+    credenciais = Credenciais(token_emissor=token_emissor, token_secret_emissor=token_secret_emissor)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+    return await _get_municipios(credenciais, uf, client=client)
 
-    url = f'{BASE_URL}/unidades-federativas/{uf}/municipios'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
+async def _get_municipios(credenciais: Credenciais,
+                          uf: str,
+                          client: Optional[SisnoClient] = None) -> List[Municipio]:
+    client   = get_client(client)
+    response = await client.get(client.url(f'unidades-federativas/{uf}/municipios'), headers=credenciais.headers_emissor)
 
     match (response.status_code):
         case 200:
@@ -6,40 +6,50 @@
 '''
 
 # =====================================================================
+import asyncio
+import functools
+import hashlib
 import httpx
-import json
+import os
+import uuid
 
 from typing            import Optional
 from typing_extensions import Annotated
-from pydantic          import BaseModel, Field, validate_call, model_validator
-from typing            import List
+from pydantic          import BaseModel, ConfigDict, Field, create_model, validate_call, model_validator
+from typing            import Any, AsyncIterable, AsyncIterator, BinaryIO, Dict, Iterable, List, NamedTuple, Tuple, Union
 from enum              import StrEnum
 from datetime          import datetime
+from decimal           import Decimal
+from pathlib           import Path
 
 from . import (
-    BASE_URL,
-    HEADERS,
-
     AmbientesEnum,
     FormasPagamentoEnum,
     MeiosPagamentoEnum,
     UnidadesEnum,
 
     Cliente,
+    Credenciais,
     DeclaracaoImportacaoAdicao,
     Icms,
     Impostos,
     Ipi,
     NotaFiscal,
+    NotaFiscalLeve,
     Transporte,
 
     Endereco,
     PessoaFisica,
     PessoaJuridica,
     Pis,
+    RespostaApi,
 
-    validate_tokens,
+    projetar,
 )
+from .concorrencia import ResultadoLote, executar_em_lote, paginar
+from .dinheiro     import ValoresMonetarios, centavos, para_decimal
+from .fluxo        import iterar_itens
+from .sessao       import SisnoClient, get_client
 
 # =====================================================================
 CSV_HEADERS = [
@@ -232,23 +242,28 @@ TIPOS_VEICULO = {
 }
 
 # =====================================================================
-BandeirasEnum         = StrEnum('Bandeiras', list(BANDEIRAS.keys()), )
-CondicoesChassiEnum   = StrEnum('Condições do Chassi', list(CONDICOES_CHASSI.keys()), )
-CondicoesVeiculoEnum  = StrEnum('Condições do Veículo', list(CONDICOES_VEICULO.keys()), )
-CoresEnum             = StrEnum('Cores', list(CORES.keys()), )
-EspeciesVeiculoEnum   = StrEnum('Espécies de Veículo', list(ESPECIES_VEICULO.keys()), )
-FinalidadeEnum        = StrEnum('Finalidades', list(FINALIDADES.keys()), )
-IndicativosEscalaEnum = StrEnum('Indicativos de Escala', list(INDICATIVOS_ESCALA.keys()), )
-ModalidadesFreteEnum  = StrEnum('Modalidade do Frete', list(MODALIDADES_FRETE.keys()), )
-ModelosEnum           = StrEnum('Modelos', list(MODELOS.keys()), )
-OperacoesEnum         = StrEnum('Operações', list(OPERACOES.keys()), )
-OrigensEnum           = StrEnum('Origens', list(ORIGENS.keys()), )
-PresencasEnum         = StrEnum('Presenças', list(PRESENCAS.keys()), )
-RestricoesEnum        = StrEnum('Restrições', list(RESTRICOES.keys()), )
-TiposCombustivelEnum  = StrEnum('Tipos de Combustiveis', list(TIPOS_COMBUSTIVEL.keys()), )
-TiposEmissaoEnum      = StrEnum('Tipos de Emissões', list(TIPOS_EMISSAO.keys()), )
-TiposOperacaoEnum     = StrEnum('Tipos de Operações', list(TIPOS_OPERACAO.keys()), )
-TiposVeiculoEnum      = StrEnum('Tipos de Veículos', list(TIPOS_VEICULO.keys()), )
+BandeirasEnum         = StrEnum('Bandeiras', list(BANDEIRAS.keys()), module=__name__, qualname='BandeirasEnum')
+CondicoesChassiEnum   = StrEnum('Condições do Chassi', list(CONDICOES_CHASSI.keys()), module=__name__, qualname='CondicoesChassiEnum')
+CondicoesVeiculoEnum  = StrEnum('Condições do Veículo', list(CONDICOES_VEICULO.keys()), module=__name__, qualname='CondicoesVeiculoEnum')
+CoresEnum             = StrEnum('Cores', list(CORES.keys()), module=__name__, qualname='CoresEnum')
+EspeciesVeiculoEnum   = StrEnum('Espécies de Veículo', list(ESPECIES_VEICULO.keys()), module=__name__, qualname='EspeciesVeiculoEnum')
+FinalidadeEnum        = StrEnum('Finalidades', list(FINALIDADES.keys()), module=__name__, qualname='FinalidadeEnum')
+IndicativosEscalaEnum = StrEnum('Indicativos de Escala', list(INDICATIVOS_ESCALA.keys()), module=__name__, qualname='IndicativosEscalaEnum')
+ModalidadesFreteEnum  = StrEnum('Modalidade do Frete', list(MODALIDADES_FRETE.keys()), module=__name__, qualname='ModalidadesFreteEnum')
+ModelosEnum           = StrEnum('Modelos', list(MODELOS.keys()), module=__name__, qualname='ModelosEnum')
+OperacoesEnum         = StrEnum('Operações', list(OPERACOES.keys()), module=__name__, qualname='OperacoesEnum')
+OrigensEnum           = StrEnum('Origens', list(ORIGENS.keys()), module=__name__, qualname='OrigensEnum')
+PresencasEnum         = StrEnum('Presenças', list(PRESENCAS.keys()), module=__name__, qualname='PresencasEnum')
+RestricoesEnum        = StrEnum('Restrições', list(RESTRICOES.keys()), module=__name__, qualname='RestricoesEnum')
+TiposCombustivelEnum  = StrEnum('Tipos de Combustiveis', list(TIPOS_COMBUSTIVEL.keys()), module=__name__, qualname='TiposCombustivelEnum')
+TiposEmissaoEnum      = StrEnum('Tipos de Emissões', list(TIPOS_EMISSAO.keys()), module=__name__, qualname='TiposEmissaoEnum')
+TiposOperacaoEnum     = StrEnum('Tipos de Operações', list(TIPOS_OPERACAO.keys()), module=__name__, qualname='TiposOperacaoEnum')
+TiposVeiculoEnum      = StrEnum('Tipos de Veículos', list(TIPOS_VEICULO.keys()), module=__name__, qualname='TiposVeiculoEnum')
+
+# =====================================================================
+# Número da primeira página de `listar`: a listagem de NFe começa na página 0. As funções que percorrem as páginas
+# (ex.: `iterar_notas`) conferem o `pagina_atual` de cada resposta e levantam `ValueError` caso a numeração seja outra.
+PRIMEIRA_PAGINA = 0
 
 # =====================================================================
 class Compra(BaseModel):
@@ -274,7 +289,7 @@ class Fatura(BaseModel):
     desconto     : str = Field()
     valor_liquido: str = Field()
 
-class FormaPagamento(BaseModel):
+class FormaPagamento(ValoresMonetarios, BaseModel):
     forma_pagamento         : FormasPagamentoEnum = Field()
     meio_pagamento          : MeiosPagamentoEnum = Field()
     valor_pagamento         : str = Field()
@@ -361,16 +376,22 @@ class Pagamento(BaseModel):
     formas_pagamento: List['FormaPagamento'] = Field()
 
 class PaginaNotas(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)  # A API pode retornar os contadores como números
+
     total           : Optional[Annotated[str, Field()]] = None
     itens_por_pagina: Optional[Annotated[str, Field()]] = None
     pagina_atual    : Optional[Annotated[str, Field()]] = None
     itens           : Optional[List['NotaFiscal']]      = None
 
-class Parcela(BaseModel):
+class PaginaNotasLeve(PaginaNotas):
+    '''Página de `listar` em modo leve: as notas são `NotaFiscalLeve`, sem `xml` e `json_objeto_nfe`.'''
+    itens: Optional[List['NotaFiscalLeve']] = None
+
+class Parcela(ValoresMonetarios, BaseModel):
     vencimento: str = Field()
     valor     : str = Field()
 
-class Pedido(BaseModel):
+class Pedido(ValoresMonetarios, BaseModel):
     presenca                  : PresencasEnum = Field()
     pagamento                 : 'Pagamento'   = Field()
 
@@ -385,7 +406,7 @@ class Pedido(BaseModel):
     observacoes_fisco         : Optional[Annotated[str, Field()]] = None
     observacoes_contribuinte  : Optional[Annotated[str, Field()]] = None
 
-class Produto(BaseModel):
+class Produto(ValoresMonetarios, BaseModel):
     '''Classe Produto
 
     Raises:
@@ -435,12 +456,16 @@ class Produto(BaseModel):
 
     @model_validator(mode='after')
     def validate_total(self, *args, **kwargs):
-        quantidade = float(self.quantidade)
-        subtotal   = float(self.subtotal)
-        total      = float(self.total)
+        quantidade = para_decimal(self.quantidade)
+        subtotal   = para_decimal(self.subtotal)
+        total      = para_decimal(self.total)
+
+        for nome, valor in (('quantidade', quantidade), ('subtotal', subtotal), ('total', total)):
+            if valor is None:
+                raise ValueError(f'Campo "{nome}" deve ser numérico e não "{getattr(self, nome)}"')
 
-        if f'{total:.2f}' != f'{quantidade*subtotal:.2f}':
-            raise ValueError(f'Total {total:.2f} é diferente de quantidade {quantidade:.2f} * subtotal {subtotal:.2f} = {quantidade*subtotal:.2f}')
+        if centavos(total) != centavos(quantidade * subtotal):
+            raise ValueError(f'Total {centavos(total)} é diferente de quantidade {quantidade} * subtotal {subtotal} = {centavos(quantidade * subtotal)}')
         return self
 
 class Rastreamento(BaseModel):
@@ -478,6 +503,93 @@ class VeiculoNovo(BaseModel):
     condicao_chassi         : Optional[Annotated[CondicoesChassiEnum, Field()]] = None
     potencia                : Optional[Annotated[str, Field()]] = None
 
+# =====================================================================
+class ConferenciaTotais(NamedTuple):
+    '''Resultado de `conferir_totais`.
+
+    Attributes:
+        total_produtos (Decimal): Soma dos totais dos produtos.
+        total_nota (Decimal): Soma dos produtos + frete + despesas acessórias - desconto do pedido.
+        total_informado (Decimal, optional): Total informado no pedido (`pedido.total`).
+        divergentes (List[Tuple[int, Decimal, Decimal]]): Produtos cujo total difere de quantidade * subtotal, como
+            `(índice, total informado, total calculado)`.
+        invalidos (List[int]): Índices dos produtos com quantidade, subtotal ou total não numéricos.
+    '''
+    total_produtos : Decimal
+    total_nota     : Decimal
+    total_informado: Optional[Decimal]
+    divergentes    : List[Tuple[int, Decimal, Decimal]]
+    invalidos      : List[int]
+
+    @property
+    def total_divergente(self) -> bool:
+        '''Indica se o total informado no pedido difere do total calculado da nota.'''
+        return self.total_informado is not None and centavos(self.total_informado) != self.total_nota
+
+    @property
+    def ok(self) -> bool:
+        return not self.divergentes and not self.invalidos and not self.total_divergente
+
+def conferir_totais(produtos: Iterable[Produto], pedido: Optional[Pedido] = None) -> ConferenciaTotais:
+    '''Confere, numa única passagem, o total de todos os produtos e o total da nota, com aritmética decimal exata.
+
+    Útil para notas com muitos itens ou construídas sem validação (ex.: `model_construct`), em que o
+    `Produto.validate_total` não foi executado.
+
+    Args:
+        produtos (Iterable[Produto]): Produtos da nota.
+        pedido (Pedido, optional): Pedido da nota, para o frete, as despesas, o desconto e o total informado.
+
+    Returns:
+        ConferenciaTotais: Totais calculados e produtos divergentes.
+    '''
+    total_produtos = Decimal(0)
+    divergentes    = []
+    invalidos      = []
+
+    for i, produto in enumerate(produtos):
+        quantidade, subtotal, total = produto.decimal('quantidade'), produto.decimal('subtotal'), produto.decimal('total')
+        if quantidade is None or subtotal is None or total is None:
+            invalidos.append(i)
+            continue
+
+        total, calculado = centavos(total), centavos(quantidade * subtotal)
+        if total != calculado:
+            divergentes.append((i, total, calculado))
+        total_produtos += total
+
+    total_nota      = total_produtos
+    total_informado = None
+    if pedido is not None:
+        for campo, sinal in (('frete', 1), ('despesas_acessorias', 1), ('desconto', -1)):
+            valor = pedido.centavos(campo)
+            if valor is not None:
+                total_nota += sinal * valor
+        total_informado = pedido.decimal('total')
+
+    return ConferenciaTotais(total_produtos, total_nota, total_informado, divergentes, invalidos)
+
+# =====================================================================
+TAMANHO_BLOCO_DANFE = 64 * 1024
+TAMANHO_ESCRITA     = 1024 * 1024   # Bytes acumulados antes de cada escrita em disco (uma ida à thread por escrita)
+MANIFESTO_DANFES    = 'SHA256SUMS'  # Hashes dos DANFEs de uma pasta, no formato do `sha256sum`
+
+class Danfe(NamedTuple):
+    '''DANFE gravado por `get_danfe` ou `baixar_danfes`.
+
+    Attributes:
+        chave_acesso (str): Chave de acesso da nota.
+        caminho (Path, optional): Arquivo gravado (`None` quando o destino é um objeto de arquivo).
+        sha256 (str): Hash SHA-256 do PDF, em hexadecimal.
+        tamanho (int): Tamanho do PDF, em bytes.
+        baixado (bool): Falso caso o arquivo já existisse com o mesmo hash e nada tenha sido baixado.
+    '''
+    chave_acesso: str
+    caminho     : Optional[Path]
+    sha256      : str
+    tamanho     : int
+    baixado     : bool = True
+
 # =====================================================================
 @validate_call
 async def buscar(token_emissor: str,
@@ -508,7 +620,9 @@ async def emitir(token_emissor: str,
            token_secret_empresa: str,
            objetoNfe: ObjetoEmissaoNFe,
            tipo_emissao: TiposEmissaoEnum,
-           *args, **kwargs):
+           *args,
+           client: Optional[SisnoClient] = None,
+           **kwargs):
     '''Endpoint utilizado para efetivamente emitir uma nota fiscal eletrônica.
 
     Args:
@@ -518,27 +632,27 @@ async def emitir(token_emissor: str,
             1: Normal
             6: Contigência SNC-AN
             7: Contigência SVC-RS
-    '''
-
-    headers = HEADERS.copy()
 
-    # -----------------------------------------
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+    '''
 
-    validate_tokens(token_empresa, token_secret_empresa)
-    headers['token-empresa']        = token_empresa
-    headers['token-secret-empresa'] = token_secret_empresa
+    credenciais = Credenciais(
+        token_emissor        = token_emissor,
+        token_secret_emissor = token_secret_emissor,
+        token_empresa        = token_empresa,
+        token_secret_empresa = token_secret_empresa,
+    )
 
-    headers['tipo-emissao'] = tipo_emissao
+    return await _emitir(credenciais, objetoNfe, tipo_emissao, client=client)
 
-    # -----------------------------------------
-    obj_dict = objetoNfe.model_dump(exclude_none=True)
+async def _emitir(credenciais: Credenciais,
+                  objetoNfe: ObjetoEmissaoNFe,
+                  tipo_emissao: TiposEmissaoEnum,
+                  client: Optional[SisnoClient] = None):
+    obj_dict = objetoNfe.model_dump(mode='json', exclude_none=True)
 
-    url = f'{BASE_URL}/nfe'
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=obj_dict)
+    client   = get_client(client)
+    response = await client.http.post(client.url('nfe'), headers=credenciais.headers_emissao(tipo_emissao), json=obj_dict)
 
     match response.status_code:
         case 200:
@@ -548,13 +662,275 @@ async def emitir(token_emissor: str,
         case _:
             return response.text
 
+async def emitir_lote(credenciais: Credenciais,
+                      objetos: Union[Iterable[ObjetoEmissaoNFe], AsyncIterable[ObjetoEmissaoNFe]],
+                      tipo_emissao: TiposEmissaoEnum,
+                      max_concorrencia: int = 10,
+                      max_por_segundo: Optional[float] = None,
+                      ordenado: bool = False,
+                      validar_localmente: bool = False,
+                      client: Optional[SisnoClient] = None) -> AsyncIterator[ResultadoLote]:
+    '''Emite várias notas fiscais eletrônicas simultaneamente, produzindo os resultados à medida que ficam prontos.
+
+    A entrada é lida sob demanda, então é possível emitir a partir de um gerador (ex.: linhas de um arquivo) sem
+    carregar todas as notas em memória. Todas as requisições compartilham o pool de conexões da sessão.
+    ```
+    async for resultado in nfe.emitir_lote(credenciais, objetos, '1', max_concorrencia=20, max_por_segundo=10):
+        print(resultado.indice, resultado.resultado, resultado.erro)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor e da empresa.
+        objetos (Iterable[ObjetoEmissaoNFe] | AsyncIterable[ObjetoEmissaoNFe]): Notas Fiscais a serem emitidas.
+        tipo_emissao (str): Tipo de Emissão (ver `emitir`).
+        max_concorrencia (int): Quantidade máxima de emissões em andamento ao mesmo tempo.
+        max_por_segundo (float, optional): Quantidade máxima de emissões iniciadas por segundo.
+        ordenado (bool): Caso verdadeiro, os resultados são produzidos na mesma ordem da entrada.
+        validar_localmente (bool): Caso verdadeiro, cada nota passa por `validacao.validar_nfe` antes de ser enviada.
+            Notas com erros não geram requisição e retornam `validacao.NotaInvalida` em `ResultadoLote.erro`.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Returns:
+        AsyncIterator[ResultadoLote]: Resultado de cada emissão (o mesmo retornado por `emitir`) junto com a posição da nota na entrada.
+    '''
+    from .validacao import NotaInvalida, validar_nfe
+
+    client = get_client(client)
+
+    async def emitir_objeto(objetoNfe: ObjetoEmissaoNFe):
+        if validar_localmente:
+            erros = validar_nfe(objetoNfe)
+            if erros:
+                raise NotaInvalida(erros)
+
+        return await _emitir(credenciais, objetoNfe, tipo_emissao, client=client)
+
+    async for resultado in executar_em_lote(emitir_objeto, objetos, max_concorrencia, max_por_segundo, ordenado):
+        yield resultado
+
 @validate_call
 async def get_danfe(token_emissor: str,
               token_secret_emissor: str,
               token_empresa:str,
               token_secret_empresa:str,
-              *args, **kwargs):
-    raise NotImplementedError
+              chave_acesso: str,
+              destino: Any,
+              rota: str,
+              *args,
+              tamanho_bloco: int = TAMANHO_BLOCO_DANFE,
+              client: Optional[SisnoClient] = None,
+              **kwargs) -> Danfe:
+    '''Baixa o DANFE (PDF) de uma nota fiscal, gravando-o em `destino` à medida que os bytes chegam.
+
+    O PDF nunca fica inteiro em memória. Quando `destino` é um caminho, o PDF é gravado em um arquivo temporário que só
+    substitui o destino ao final do download, de modo que um download interrompido não deixa um PDF incompleto.
+
+    O endpoint do DANFE não consta na Documentação, por isso o caminho é obrigatório e não há valor padrão: `rota` é
+    relativo à `base_url` da sessão e deve conter `{chave_acesso}` no lugar da chave.
+    ```
+    rota = '...'  # Caminho do endpoint do DANFE, com "{chave_acesso}" no lugar da chave
+    await nfe.get_danfe(..., chave_acesso=nota.chave_acesso, destino=f'{nota.chave_acesso}.pdf', rota=rota)
+    ```
+
+    Args:
+        chave_acesso (str): Chave de acesso da nota fiscal.
+        destino (str | Path | BinaryIO): Arquivo onde o PDF é gravado, ou objeto de arquivo aberto em modo binário.
+        rota (str): Caminho do endpoint do DANFE, com `{chave_acesso}` no lugar da chave.
+        tamanho_bloco (int): Tamanho, em bytes, de cada bloco lido da resposta.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Raises:
+        httpx.HTTPStatusError: Caso a resposta seja um erro.
+        ValueError: Caso a resposta não seja um PDF, ou caso `rota` não contenha `{chave_acesso}`.
+
+    Returns:
+        Danfe: Caminho, hash e tamanho do PDF.
+    '''
+    credenciais = Credenciais(
+        token_emissor        = token_emissor,
+        token_secret_emissor = token_secret_emissor,
+        token_empresa        = token_empresa,
+        token_secret_empresa = token_secret_empresa,
+    )
+
+    return await _get_danfe(credenciais, chave_acesso, destino, rota, tamanho_bloco, client=client)
+
+async def _get_danfe(credenciais: Credenciais,
+                     chave_acesso: str,
+                     destino: Union[str, Path, BinaryIO],
+                     rota: str,
+                     tamanho_bloco: int = TAMANHO_BLOCO_DANFE,
+                     client: Optional[SisnoClient] = None) -> Danfe:
+    client = get_client(client)
+
+    if not isinstance(destino, (str, os.PathLike)):
+        tamanho, sha256 = await _baixar_danfe(credenciais, chave_acesso, rota, destino, tamanho_bloco, client)
+        return Danfe(chave_acesso, None, sha256, tamanho)
+
+    # Nome único, para que dois downloads do mesmo destino não gravem no mesmo arquivo temporário:
+    caminho    = Path(destino)
+    temporario = caminho.with_name(f'{caminho.name}.{uuid.uuid4().hex}.tmp')
+
+    try:
+        arquivo = await asyncio.to_thread(open, temporario, 'wb')
+        try:
+            tamanho, sha256 = await _baixar_danfe(credenciais, chave_acesso, rota, arquivo, tamanho_bloco, client)
+        finally:
+            await asyncio.to_thread(arquivo.close)
+
+        await asyncio.to_thread(os.replace, temporario, caminho)
+    except BaseException:
+        temporario.unlink(missing_ok=True)
+        raise
+
+    return Danfe(chave_acesso, caminho, sha256, tamanho)
+
+async def _baixar_danfe(credenciais: Credenciais,
+                        chave_acesso: str,
+                        rota: str,
+                        arquivo: BinaryIO,
+                        tamanho_bloco: int,
+                        client: SisnoClient) -> (int, str,):
+    '''Grava o PDF em `arquivo`, bloco a bloco, e retorna o tamanho e o hash SHA-256 do que foi gravado.
+
+    Os blocos são acumulados até `TAMANHO_ESCRITA` e então gravados (e incluídos no hash) em uma thread, para não
+    bloquear o event loop com o disco sem pagar uma troca de thread a cada bloco.
+    '''
+    if '{chave_acesso}' not in rota:
+        raise ValueError(f'A rota do DANFE deve conter "{{chave_acesso}}": "{rota}"')
+
+    sha256    = hashlib.sha256()
+    tamanho   = 0
+    pendente  = []
+    acumulado = 0
+
+    def gravar(blocos: List[bytes]):
+        for bloco in blocos:
+            arquivo.write(bloco)
+            sha256.update(bloco)
+
+    async with client.stream('GET', client.url(rota.format(chave_acesso=chave_acesso)), headers=credenciais.headers_empresa) as response:
+        if response.status_code != 200:
+            await response.aread()
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao buscar o DANFE da nota "{chave_acesso}" ({response.status_code})')
+
+        async for bloco in response.aiter_bytes(tamanho_bloco):
+            if tamanho == 0 and not bloco.startswith(b'%PDF'):
+                raise ValueError(f'A resposta do DANFE da nota "{chave_acesso}" não é um PDF')
+
+            pendente.append(bloco)
+            acumulado += len(bloco)
+            tamanho   += len(bloco)
+
+            if acumulado >= TAMANHO_ESCRITA:
+                await asyncio.to_thread(gravar, pendente)
+                pendente, acumulado = [], 0
+
+    if pendente:
+        await asyncio.to_thread(gravar, pendente)
+
+    if tamanho == 0:
+        raise ValueError(f'A resposta do DANFE da nota "{chave_acesso}" está vazia')
+
+    return tamanho, sha256.hexdigest()
+
+async def baixar_danfes(credenciais: Credenciais,
+                        chaves_acesso: Union[Iterable[str], AsyncIterable[str]],
+                        pasta: Union[str, Path],
+                        rota: str,
+                        max_concorrencia: int = 10,
+                        max_por_segundo: Optional[float] = None,
+                        ordenado: bool = False,
+                        tamanho_bloco: int = TAMANHO_BLOCO_DANFE,
+                        client: Optional[SisnoClient] = None) -> AsyncIterator[ResultadoLote]:
+    '''Baixa vários DANFEs simultaneamente para `pasta` (um arquivo `<chave de acesso>.pdf` por nota).
+
+    Todas as requisições compartilham o pool de conexões da sessão e cada PDF é gravado em disco à medida que chega. Os
+    hashes dos PDFs baixados ficam no arquivo `SHA256SUMS` da pasta (verificável com `sha256sum -c`): uma nota cujo
+    arquivo já existe com o mesmo hash registrado não é baixada novamente, já um arquivo ausente, incompleto ou alterado
+    é baixado outra vez. Cada hash é acrescentado ao arquivo assim que o seu download termina, de modo que um processo
+    interrompido não perde os downloads já concluídos; ao final o arquivo é reescrito sem entradas repetidas.
+    ```
+    async for resultado in nfe.baixar_danfes(credenciais, chaves, 'danfes', rota, max_concorrencia=20):
+        print(resultado.indice, resultado.resultado, resultado.erro)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor e da empresa.
+        chaves_acesso (Iterable[str] | AsyncIterable[str]): Chaves de acesso das notas.
+        pasta (str | Path): Pasta onde os PDFs são gravados (criada caso não exista).
+        rota (str): Caminho do endpoint do DANFE, com `{chave_acesso}` no lugar da chave (ver `get_danfe`).
+        max_concorrencia (int): Quantidade máxima de downloads em andamento ao mesmo tempo.
+        max_por_segundo (float, optional): Quantidade máxima de downloads iniciados por segundo.
+        ordenado (bool): Caso verdadeiro, os resultados são produzidos na mesma ordem da entrada.
+        tamanho_bloco (int): Tamanho, em bytes, de cada bloco lido das respostas.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Returns:
+        AsyncIterator[ResultadoLote]: `Danfe` de cada nota (ou o erro do download) junto com a posição da chave na entrada.
+    '''
+    pasta = Path(pasta)
+    pasta.mkdir(parents=True, exist_ok=True)
+
+    manifesto = _ler_manifesto(pasta / MANIFESTO_DANFES)
+    client    = get_client(client)
+
+    async def baixar(chave_acesso: str) -> Danfe:
+        caminho  = pasta / f'{chave_acesso}.pdf'
+        esperado = manifesto.get(caminho.name)
+
+        if esperado is not None and caminho.exists():
+            tamanho, sha256 = await asyncio.to_thread(_sha256_arquivo, caminho)
+            if sha256 == esperado:
+                return Danfe(chave_acesso, caminho, sha256, tamanho, baixado=False)
+
+        danfe = await _get_danfe(credenciais, chave_acesso, caminho, rota, tamanho_bloco, client=client)
+        manifesto[caminho.name] = danfe.sha256
+        await asyncio.to_thread(_acrescentar_manifesto, pasta / MANIFESTO_DANFES, caminho.name, danfe.sha256)
+        return danfe
+
+    try:
+        async for resultado in executar_em_lote(baixar, chaves_acesso, max_concorrencia, max_por_segundo, ordenado):
+            yield resultado
+    finally:
+        await asyncio.to_thread(_gravar_manifesto, pasta / MANIFESTO_DANFES, manifesto)
+
+def _sha256_arquivo(caminho: Path) -> (int, str,):
+    sha256  = hashlib.sha256()
+    tamanho = 0
+
+    with open(caminho, 'rb') as arquivo:
+        while bloco := arquivo.read(TAMANHO_BLOCO_DANFE):
+            sha256.update(bloco)
+            tamanho += len(bloco)
+
+    return tamanho, sha256.hexdigest()
+
+def _ler_manifesto(caminho: Path) -> Dict[str, str]:
+    '''Lê um arquivo no formato do `sha256sum` ("<hash>  <nome>"), retornando `{nome: hash}`.'''
+    if not caminho.exists():
+        return {}
+
+    manifesto = {}
+    for linha in caminho.read_text(encoding='utf-8').splitlines():
+        sha256, _, nome = linha.partition(' ')
+        if sha256 and nome:
+            manifesto[nome[1:]] = sha256  # Remove o indicador de modo (" " ou "*")
+
+    return manifesto
+
+def _acrescentar_manifesto(caminho: Path, nome: str, sha256: str):
+    '''Acrescenta uma entrada ao manifesto (entradas repetidas valem pela última, ver `_ler_manifesto`).'''
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(f'{sha256}  {nome}\n')
+
+def _gravar_manifesto(caminho: Path, manifesto: Dict[str, str]):
+    '''Grava o manifesto de forma atômica (arquivo temporário + renomear).'''
+    temporario = caminho.with_name(caminho.name + '.tmp')
+
+    temporario.write_text(''.join(f'{sha256}  {nome}\n' for nome, sha256 in sorted(manifesto.items())), encoding='utf-8')
+    os.replace(temporario, caminho)
 
 @validate_call
 async def get_nota(token_emissor: str,
@@ -583,7 +959,11 @@ async def listar(token_emissor: str,
            token_secret_emissor: str,
            qtd:str = None,
            pagina:str = None,
-           *args, **kwargs) -> List[NotaFiscal]:
+           *args,
+           leve: bool = False,
+           campos: Optional[List[str]] = None,
+           client: Optional[SisnoClient] = None,
+           **kwargs) -> List[NotaFiscal]:
     '''Recupera as notas fiscais.
 
     No Distrito Federal (DF), antes de 01/2023, as notas fiscais de serviço eram emitidas como NFe.
@@ -591,35 +971,163 @@ async def listar(token_emissor: str,
     Args:
         qtd (str, optional): Quantidade de notas por página.
         pagina (str, optional): Página a ser retornada.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfe` não são lidos e as notas são `NotaFiscalLeve`.
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
 
     Returns:
         List[NotaFiscal]: Lista contendo as notas fiscais.
     '''
-    headers = HEADERS.copy()
+    credenciais = Credenciais(token_emissor=token_emissor, token_secret_emissor=token_secret_emissor)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+    return await _listar(credenciais, qtd, pagina, leve=leve, campos=campos, client=client)
 
-    params   = {}
+async def _listar(credenciais: Credenciais,
+                  qtd: str = None,
+                  pagina: str = None,
+                  leve: bool = False,
+                  campos: Optional[List[str]] = None,
+                  client: Optional[SisnoClient] = None):
+    response, pagina_notas = await _listar_pagina(credenciais, qtd, pagina, leve=leve, campos=campos, client=client)
 
-    if qtd:
-        params['qtd'] = qtd
-    if pagina:
-        params['pagina'] = pagina
+    if pagina_notas is not None:
+        return response, pagina_notas.itens
+
+    return response, None
 
-    url = f'{BASE_URL}/nfe/lista-notas'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params, headers=headers)
+async def _listar_pagina(credenciais: Credenciais,
+                         qtd: str = None,
+                         pagina: str = None,
+                         leve: bool = False,
+                         campos: Optional[List[str]] = None,
+                         client: Optional[SisnoClient] = None) -> (httpx.Response, PaginaNotas,):
+    client   = get_client(client)
+    response = await client.get(client.url('nfe/lista-notas'), params=_parametros_listagem(qtd, pagina), headers=credenciais.headers_emissor)
 
     match (response.status_code):
         case 200:
-            itens = response.json()['dados']['itens']
-            nfes  = [NotaFiscal(**d) for d in itens]
-            return response, nfes
+            # Valida os bytes diretamente, sem o passo intermediário de `response.json()`:
+            _, modelo    = _modelos(leve, campos)
+            pagina_notas = RespostaApi[modelo].model_validate_json(response.content).dados
+            if pagina_notas is not None and pagina_notas.itens is None:
+                pagina_notas.itens = []
+            return response, pagina_notas
 
     return response, None
 
+def _modelos(leve: bool = False, campos: Optional[Iterable[str]] = None) -> (type, type,):
+    '''Classes da nota e da página conforme o modo leve e a projeção de campos.'''
+    return _modelos_projetados(leve, None if campos is None else frozenset(campos))
+
+@functools.cache
+def _modelos_projetados(leve: bool, campos: Optional[frozenset]) -> (type, type,):
+    nota, pagina = (NotaFiscalLeve, PaginaNotasLeve) if leve else (NotaFiscal, PaginaNotas)
+    if campos is None:
+        return nota, pagina
+
+    nota = projetar(nota, campos)
+    return nota, create_model(f'PaginaNotas{nota.__name__}', __base__=PaginaNotas, itens=(Optional[List[nota]], None))
+
+def _parametros_listagem(qtd: str = None, pagina: str = None) -> dict:
+    params = {}
+
+    if qtd:
+        params['qtd'] = qtd
+    if pagina is not None:  # A página 0 também é enviada
+        params['pagina'] = str(pagina)
+
+    return params
+
+async def listar_fluxo(credenciais: Credenciais,
+                       qtd: str = None,
+                       pagina: str = None,
+                       leve: bool = False,
+                       campos: Optional[List[str]] = None,
+                       contadores: Optional[dict] = None,
+                       client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscal]:
+    '''Produz as notas fiscais de uma página de `listar` à medida que os bytes da resposta chegam.
+
+    O corpo não é carregado inteiro em memória: cada nota é validada assim que termina de chegar (ver
+    `pysisnoapi.fluxo`). Útil para páginas muito grandes (`qtd` alto).
+    ```
+    async for nota in nfe.listar_fluxo(credenciais, qtd='50000'):
+        print(nota.chave_acesso, nota.status)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        qtd (str, optional): Quantidade de notas por página.
+        pagina (str, optional): Página a ser retornada.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfe` não são lidos e as notas são `NotaFiscalLeve`.
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        contadores (dict, optional): Caso informado, recebe os contadores da página (`total`, `itens_por_pagina` e
+            `pagina_atual`) à medida que chegam. Só estão todos disponíveis ao final da iteração.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Raises:
+        httpx.HTTPStatusError: Caso a resposta seja um erro.
+
+    Returns:
+        AsyncIterator[NotaFiscal]: Notas fiscais da página, na ordem da resposta.
+    '''
+    client = get_client(client)
+    modelo, _ = _modelos(leve, campos)
+
+    async with client.stream('GET', client.url('nfe/lista-notas'), params=_parametros_listagem(qtd, pagina), headers=credenciais.headers_emissor) as response:
+        if response.status_code != 200:
+            await response.aread()
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao listar as notas fiscais ({response.status_code})')
+
+        async for nota in iterar_itens(response, modelo, valores=contadores):
+            yield nota
+
+async def iterar_notas(credenciais: Credenciais,
+                       qtd_por_pagina: Optional[int] = None,
+                       prefetch: int = 2,
+                       leve: bool = False,
+                       campos: Optional[List[str]] = None,
+                       primeira_pagina: int = PRIMEIRA_PAGINA,
+                       client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscal]:
+    '''Percorre as notas fiscais de todas as páginas de `listar`.
+
+    Enquanto as notas de uma página são consumidas, as próximas `prefetch` páginas já são buscadas em paralelo.
+    A quantidade de páginas é calculada a partir de `PaginaNotas.total` e `PaginaNotas.itens_por_pagina` da primeira
+    resposta, e no máximo `prefetch + 1` páginas ficam em memória, independente da quantidade de notas.
+    ```
+    async for nota in nfe.iterar_notas(credenciais, qtd_por_pagina=100):
+        print(nota.chave_acesso, nota.status)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        qtd_por_pagina (int, optional): Quantidade de notas por página.
+        prefetch (int): Quantidade de páginas buscadas antecipadamente.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfe` não são lidos e as notas são `NotaFiscalLeve`.
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        primeira_pagina (int): Número da primeira página da listagem.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+        ValueError: Caso a API numere as páginas a partir de outro número que não `primeira_pagina`.
+
+    Returns:
+        AsyncIterator[NotaFiscal]: Notas fiscais, na ordem das páginas.
+    '''
+    client = get_client(client)
+    qtd    = str(qtd_por_pagina) if qtd_por_pagina else None
+
+    async def buscar_pagina(numero: int) -> PaginaNotas:
+        response, pagina = await _listar_pagina(credenciais, qtd, str(numero), leve=leve, campos=campos, client=client)
+        if pagina is None:
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao listar as notas fiscais ({response.status_code})')
+        return pagina
+
+    async for nota in paginar(buscar_pagina, primeira_pagina, max_concorrencia=max(prefetch, 1), ordenado=True):
+        yield nota
+
 @validate_call
 async def validar(token_emissor: str,
             token_secret_emissor: str,
@@ -627,7 +1135,9 @@ async def validar(token_emissor: str,
             token_secret_empresa:str,
             objetoNfe:ObjetoEmissaoNFe,
             tipo_emissao:TiposEmissaoEnum,
-            *args, **kwargs) -> str:
+            *args,
+            client: Optional[SisnoClient] = None,
+            **kwargs) -> str:
     '''Endpoint utilizado para validar a nota fiscal eletrônica antes de emitir.
 
     Args:
@@ -637,27 +1147,27 @@ async def validar(token_emissor: str,
             1: Normal
             6: Contigência SNC-AN
             7: Contigência SVC-RS
-    '''
 
-    headers = HEADERS.copy()
-
-    # -----------------------------------------
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+    '''
 
-    validate_tokens(token_empresa, token_secret_empresa)
-    headers['token-empresa']        = token_empresa
-    headers['token-secret-empresa'] = token_secret_empresa
+    credenciais = Credenciais(
+        token_emissor        = token_emissor,
+        token_secret_emissor = token_secret_emissor,
+        token_empresa        = token_empresa,
+        token_secret_empresa = token_secret_empresa,
+    )
 
-    headers['tipo-emissao'] = tipo_emissao
+    return await _validar(credenciais, objetoNfe, tipo_emissao, client=client)
 
-    # -----------------------------------------
-    obj_dict = objetoNfe.model_dump(exclude_none=True)
+async def _validar(credenciais: Credenciais,
+                   objetoNfe: ObjetoEmissaoNFe,
+                   tipo_emissao: TiposEmissaoEnum,
+                   client: Optional[SisnoClient] = None) -> str:
+    obj_dict = objetoNfe.model_dump(mode='json', exclude_none=True)
 
-    url = f'{BASE_URL}/nfe/validacao-nota'
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=json.dumps(obj_dict))
+    client   = get_client(client)
+    response = await client.http.post(client.url('nfe/validacao-nota'), headers=credenciais.headers_emissao(tipo_emissao), json=obj_dict)
 
     match response.status_code:
         case 200:
@@ -6,22 +6,25 @@
 '''
 
 # =====================================================================
+import asyncio
+import contextlib
+import functools
 import httpx
 
-from datetime          import datetime
+from collections       import deque
+from datetime          import datetime, timedelta
 from typing            import Optional
 from typing_extensions import Annotated
-from pydantic          import BaseModel, Field, validate_call
-from typing            import List
+from pydantic          import BaseModel, ConfigDict, Field, ValidationError, create_model, validate_call
+from typing            import AsyncIterable, AsyncIterator, Iterable, List, Union
 from enum              import StrEnum
 
 from . import (
-    BASE_URL,
-    HEADERS,
-
     AmbientesEnum,
+    CAMPO_NAO_LIDO,
 
     Cliente,
+    Credenciais,
     Empresa,
     Impostos,
     Municipio,
@@ -31,9 +34,13 @@ from . import (
     PessoaFisica,
     PessoaJuridica,
     Pis,
+    RespostaApi,
 
-    validate_tokens,
+    projetar,
 )
+from .concorrencia import executar_em_lote, iterar, paginar, para_inteiro
+from .fluxo        import iterar_itens
+from .sessao       import SisnoClient, get_client
 
 # =====================================================================
 CSV_HEADERS = [
@@ -80,6 +87,20 @@ RESPONSAVEIS_RETENCAO_ISS = {
     '2': 'Intermediário',
 }
 
+SITUACOES_EMISSAO = {
+    'aprovado'   : 'Aprovada',
+    'processando': 'Em processamento',
+    'reprovado'  : 'Reprovada',
+    'erro'       : 'Erro na requisição',
+}
+
+# Respostas que indicam um problema da requisição (e não uma rejeição da nota), ver `_interpretar_emissao`:
+ERROS_REQUISICAO = {
+    401: 'Credenciais recusadas pela API',
+    403: 'Acesso negado pela API',
+    429: 'Limite de requisições da API excedido',
+}
+
 STATUS = {
     'aprovado'    : 'aprovado',
     'reprovado'   : 'reprovado',
@@ -89,11 +110,18 @@ STATUS = {
 }
 
 # =====================================================================
-IndicadoresExigibilidadeIssEnum = StrEnum('Indicadores de Exigibilidade do ISS', list(INDICADORES_EXIGIBILIDADE_ISS.keys()), )
-IndicadoresIncentivoFiscalEnum  = StrEnum('Indicadores de Incentivo Fiscal', list(INDICADORES_INCENTIVO_FISCAL.keys()), )
-IndicadoresIssRetidoEnum        = StrEnum('Indicadores de ISS Retido', list(INDICADORES_ISS_RETIDO.keys()), )
-ResponsaveisRetencaoIssEnum     = StrEnum('Responsável pela Retenção do ISS', list(RESPONSAVEIS_RETENCAO_ISS.keys()), )
-StatusEnum                      = StrEnum('Status', STATUS)
+IndicadoresExigibilidadeIssEnum = StrEnum('Indicadores de Exigibilidade do ISS', list(INDICADORES_EXIGIBILIDADE_ISS.keys()), module=__name__, qualname='IndicadoresExigibilidadeIssEnum')
+IndicadoresIncentivoFiscalEnum  = StrEnum('Indicadores de Incentivo Fiscal', list(INDICADORES_INCENTIVO_FISCAL.keys()), module=__name__, qualname='IndicadoresIncentivoFiscalEnum')
+IndicadoresIssRetidoEnum        = StrEnum('Indicadores de ISS Retido', list(INDICADORES_ISS_RETIDO.keys()), module=__name__, qualname='IndicadoresIssRetidoEnum')
+ResponsaveisRetencaoIssEnum     = StrEnum('Responsável pela Retenção do ISS', list(RESPONSAVEIS_RETENCAO_ISS.keys()), module=__name__, qualname='ResponsaveisRetencaoIssEnum')
+SituacoesEmissaoEnum            = StrEnum('Situações da Emissão', list(SITUACOES_EMISSAO.keys()), module=__name__, qualname='SituacoesEmissaoEnum')
+StatusEnum                      = StrEnum('Status', STATUS, module=__name__, qualname='StatusEnum')
+
+# =====================================================================
+# Número da primeira página de `buscar_notas`: a listagem de NFSe começa na página 1 (a de NFe começa na página 0, ver
+# `nfe.PRIMEIRA_PAGINA`). As funções que percorrem as páginas (ex.: `iterar_notas`) conferem o `pagina_atual` de cada
+# resposta e levantam `ValueError` caso a numeração seja outra.
+PRIMEIRA_PAGINA = 1
 
 # =====================================================================
 class ConstrucaoCivil(BaseModel):
@@ -151,6 +179,15 @@ class NotaFiscalServico(BaseModel):
     def __repr__(self):
         return f'NFSe {self.uuid}'
 
+class NotaFiscalServicoLeve(NotaFiscalServico):
+    '''`NotaFiscalServico` das listagens em modo leve (`leve=True`).
+
+    Os campos `xml` e `json_objeto_nfse`, que podem ter dezenas de KB cada, são ignorados durante a leitura da resposta
+    (nunca são convertidos em `str`) e ficam sempre `None`. Quando necessários, use `completar` para buscá-los.
+    '''
+    json_objeto_nfse: Optional[str] = Field(default=None, validation_alias=CAMPO_NAO_LIDO)
+    xml             : Optional[str] = Field(default=None, validation_alias=CAMPO_NAO_LIDO)
+
 class ObjetoEmissaoNFSe(BaseModel):
     cliente: 'Cliente' = Field()
     servico: 'Servico' = Field()
@@ -158,11 +195,35 @@ class ObjetoEmissaoNFSe(BaseModel):
     construcao_civil: Optional[Annotated['ConstrucaoCivil', Field()]] = None
 
 class PaginaNotasServico(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)  # A API pode retornar os contadores como números
+
     total           : Optional[Annotated[str, Field()]]                       = None
     itens_por_pagina: Optional[Annotated[str, Field()]]                       = None
     pagina_atual    : Optional[Annotated[str, Field()]]                       = None
     itens           : Optional[Annotated[List['NotaFiscalServico'], Field()]] = None
 
+class PaginaNotasServicoLeve(PaginaNotasServico):
+    '''Página de `buscar_notas` em modo leve: as notas são `NotaFiscalServicoLeve`.'''
+    itens: Optional[Annotated[List['NotaFiscalServicoLeve'], Field()]] = None
+
+class ResultadoEmissaoNFSe(BaseModel):
+    '''Resultado da emissão de uma NFSe em lote.
+
+    situacao:
+        aprovado: Nota aprovada pela prefeitura.
+        processando: Nota recebida, aguardando o processamento (consultar posteriormente com `recuperar_dados`).
+        reprovado: Nota rejeitada, o motivo é informado em `motivo`.
+        erro: Não foi possível concluir a requisição (ex.: falha de conexão, credenciais recusadas, limite de requisições
+            ou erro do servidor), a nota pode ser reenviada. Caso `status_code` seja 200, a resposta não pôde ser
+            interpretada e a nota pode ter sido recebida: consulte-a antes de reenviar.
+    '''
+    indice     : int                  = Field()
+    situacao   : SituacoesEmissaoEnum = Field()
+
+    motivo     : Optional[Annotated[str, Field()]]                 = None
+    status_code: Optional[Annotated[int, Field()]]                 = None
+    nota       : Optional[Annotated['NotaFiscalServico', Field()]] = None
+
 class Servico(BaseModel):
     '''_summary_
 
@@ -201,7 +262,11 @@ async def buscar_notas(token_emissor: str,
                  qtd_por_pagina:int=None,
                  ordencao:str=None,
                  tipo_ordenacao:str=None,
-                 *args, **kwargs) -> (httpx.Response, List[NotaFiscalServico],):
+                 *args,
+                 leve: bool = False,
+                 campos: Optional[List[str]] = None,
+                 client: Optional[SisnoClient] = None,
+                 **kwargs) -> (httpx.Response, List[NotaFiscalServico],):
     '''Recupera as notas fiscais de serviço.
 
     Args:
@@ -242,6 +307,14 @@ async def buscar_notas(token_emissor: str,
             - desc
             - asc
 
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfse` não são lidos e as notas são
+            `NotaFiscalServicoLeve` (ver `completar`).
+
+        campos (List[str], optional): Campos lidos de cada nota, ex.: `['uuid', 'status', 'valor_total']`. Os demais
+            campos são ignorados durante a leitura e ficam `None` (ver `pysisnoapi.projetar`).
+
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
     Returns:
         httpx.Reponse: Resposta do servidor
         List[NotaFiscalServico]: Lista com todas as NFSe
@@ -252,12 +325,109 @@ async def buscar_notas(token_emissor: str,
     # TODO: textoBusca é case sensitive e leva em consideração acentos.
     # TODO: dataFim não precisa de dataInicio
 
-    headers = HEADERS.copy()
+    credenciais = Credenciais(token_emissor=token_emissor, token_secret_emissor=token_secret_emissor)
+
+    return await _buscar_notas(credenciais,
+                               cnpjEmpresa    = cnpjEmpresa,
+                               data_inicio    = data_inicio,
+                               data_fim       = data_fim,
+                               ambiente       = ambiente,
+                               status         = status,
+                               texto          = texto,
+                               pagina         = pagina,
+                               qtd_por_pagina = qtd_por_pagina,
+                               ordencao       = ordencao,
+                               tipo_ordenacao = tipo_ordenacao,
+                               leve           = leve,
+                               campos         = campos,
+                               client         = client)
+
+async def _buscar_notas(credenciais: Credenciais,
+                        cnpjEmpresa: list = None,
+                        data_inicio: datetime = None,
+                        data_fim: datetime = None,
+                        ambiente: AmbientesEnum = None,
+                        status: str = None,
+                        texto: str = None,
+                        pagina: int = None,
+                        qtd_por_pagina: int = None,
+                        ordencao: str = None,
+                        tipo_ordenacao: str = None,
+                        leve: bool = False,
+                        campos: Optional[List[str]] = None,
+                        client: Optional[SisnoClient] = None) -> (httpx.Response, List[NotaFiscalServico],):
+    response, pagina_notas = await _buscar_pagina(credenciais,
+                                                  cnpjEmpresa    = cnpjEmpresa,
+                                                  data_inicio    = data_inicio,
+                                                  data_fim       = data_fim,
+                                                  ambiente       = ambiente,
+                                                  status         = status,
+                                                  texto          = texto,
+                                                  pagina         = pagina,
+                                                  qtd_por_pagina = qtd_por_pagina,
+                                                  ordencao       = ordencao,
+                                                  tipo_ordenacao = tipo_ordenacao,
+                                                  leve           = leve,
+                                                  campos         = campos,
+                                                  client         = client)
+
+    if pagina_notas is not None:
+        return (response, pagina_notas.itens)
+
+    return (response, None)
+
+async def _buscar_pagina(credenciais: Credenciais,
+                         cnpjEmpresa: list = None,
+                         data_inicio: datetime = None,
+                         data_fim: datetime = None,
+                         ambiente: AmbientesEnum = None,
+                         status: str = None,
+                         texto: str = None,
+                         pagina: int = None,
+                         qtd_por_pagina: int = None,
+                         ordencao: str = None,
+                         tipo_ordenacao: str = None,
+                         leve: bool = False,
+                         campos: Optional[List[str]] = None,
+                         client: Optional[SisnoClient] = None) -> (httpx.Response, PaginaNotasServico,):
+    params   = _parametros_busca(cnpjEmpresa, data_inicio, data_fim, ambiente, status, texto, pagina, qtd_por_pagina, ordencao, tipo_ordenacao)
+    client   = get_client(client)
+    response = await client.get(client.url('nfse'), headers=credenciais.headers_emissor, params=params)
+
+    match (response.status_code):
+        case 200:
+            # Valida os bytes diretamente, sem o passo intermediário de `response.json()`:
+            _, modelo    = _modelos(leve, campos)
+            pagina_notas = RespostaApi[modelo].model_validate_json(response.content).dados
+            if pagina_notas is not None and pagina_notas.itens is None:
+                pagina_notas.itens = []
+            return (response, pagina_notas)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+    return (response, None)
 
+def _modelos(leve: bool = False, campos: Optional[Iterable[str]] = None) -> (type, type,):
+    '''Classes da nota e da página conforme o modo leve e a projeção de campos.'''
+    return _modelos_projetados(leve, None if campos is None else frozenset(campos))
+
+@functools.cache
+def _modelos_projetados(leve: bool, campos: Optional[frozenset]) -> (type, type,):
+    nota, pagina = (NotaFiscalServicoLeve, PaginaNotasServicoLeve) if leve else (NotaFiscalServico, PaginaNotasServico)
+    if campos is None:
+        return nota, pagina
+
+    nota = projetar(nota, campos)
+    return nota, create_model(f'PaginaNotasServico{nota.__name__}', __base__=PaginaNotasServico, itens=(Optional[List[nota]], None))
+
+def _parametros_busca(cnpjEmpresa: list = None,
+                      data_inicio: datetime = None,
+                      data_fim: datetime = None,
+                      ambiente: AmbientesEnum = None,
+                      status: str = None,
+                      texto: str = None,
+                      pagina: int = None,
+                      qtd_por_pagina: int = None,
+                      ordencao: str = None,
+                      tipo_ordenacao: str = None) -> dict:
     params = {
         'cnpjEmpresa'  : cnpjEmpresa,
         'dataInicio'   : data_inicio.strftime('%d/%m/%Y %H:%M:%S') if data_inicio else None,
@@ -270,19 +440,239 @@ async def buscar_notas(token_emissor: str,
         'ordenacao'    : ordencao,
         'tipoOrdenacao': tipo_ordenacao
     }
-    params = {k: v for k,v in params.items() if v}
+    return {k: v for k,v in params.items() if v or (k == 'pagina' and v is not None)}  # A página 0 também é enviada
+
+async def buscar_notas_fluxo(credenciais: Credenciais,
+                             cnpjEmpresa: list = None,
+                             data_inicio: datetime = None,
+                             data_fim: datetime = None,
+                             ambiente: AmbientesEnum = None,
+                             status: str = None,
+                             texto: str = None,
+                             pagina: int = None,
+                             qtd_por_pagina: int = None,
+                             ordencao: str = None,
+                             tipo_ordenacao: str = None,
+                             leve: bool = False,
+                             campos: Optional[List[str]] = None,
+                             contadores: Optional[dict] = None,
+                             client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscalServico]:
+    '''Produz as notas fiscais de serviço de uma página de `buscar_notas` à medida que os bytes da resposta chegam.
+
+    O corpo não é carregado inteiro em memória: cada nota é validada assim que termina de chegar (ver
+    `pysisnoapi.fluxo`). Útil para páginas muito grandes (`qtd_por_pagina` alto).
+    ```
+    async for nota in nfse.buscar_notas_fluxo(credenciais, data_inicio=inicio, qtd_por_pagina=50_000):
+        print(nota.uuid, nota.status)
+    ```
 
-    url = f'{BASE_URL}/nfse'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers, params=params)
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfse` não são lidos (ver `NotaFiscalServicoLeve`).
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        contadores (dict, optional): Caso informado, recebe os contadores da página (`total`, `itens_por_pagina` e
+            `pagina_atual`) à medida que chegam. Só estão todos disponíveis ao final da iteração.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
 
-    match (response.status_code):
-        case 200:
-            itens = response.json()['dados']['itens']
-            nfses = [NotaFiscalServico(**d) for d in itens]
-            return (response, nfses)
+        Os demais parâmetros são os mesmos de `buscar_notas`.
 
-    return (response, None)
+    Raises:
+        httpx.HTTPStatusError: Caso a resposta seja um erro.
+
+    Returns:
+        AsyncIterator[NotaFiscalServico]: Notas fiscais de serviço da página, na ordem da resposta.
+    '''
+    params = _parametros_busca(cnpjEmpresa, data_inicio, data_fim, ambiente, status, texto, pagina, qtd_por_pagina, ordencao, tipo_ordenacao)
+    client = get_client(client)
+    modelo, _ = _modelos(leve, campos)
+
+    async with client.stream('GET', client.url('nfse'), headers=credenciais.headers_emissor, params=params) as response:
+        if response.status_code != 200:
+            await response.aread()
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao buscar as notas fiscais de serviço ({response.status_code})')
+
+        async for nota in iterar_itens(response, modelo, valores=contadores):
+            yield nota
+
+async def iterar_notas(credenciais: Credenciais,
+                       cnpjEmpresa: list = None,
+                       data_inicio: datetime = None,
+                       data_fim: datetime = None,
+                       ambiente: AmbientesEnum = None,
+                       status: str = None,
+                       texto: str = None,
+                       qtd_por_pagina: int = None,
+                       ordencao: str = None,
+                       tipo_ordenacao: str = None,
+                       max_concorrencia: int = 4,
+                       ordenado: bool = True,
+                       leve: bool = False,
+                       campos: Optional[List[str]] = None,
+                       primeira_pagina: int = PRIMEIRA_PAGINA,
+                       client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscalServico]:
+    '''Percorre as notas fiscais de serviço de todas as páginas de `buscar_notas`.
+
+    Após a primeira resposta, `PaginaNotasServico.total` e `PaginaNotasServico.itens_por_pagina` indicam todas as
+    páginas restantes, que são buscadas em paralelo (no máximo `max_concorrencia` ao mesmo tempo). Assim o tempo total
+    é proporcional a `páginas / max_concorrencia` e não à quantidade de páginas.
+    ```
+    async for nota in nfse.iterar_notas(credenciais, data_inicio=inicio, qtd_por_pagina=100, max_concorrencia=8):
+        print(nota.uuid, nota.status)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        max_concorrencia (int): Quantidade máxima de páginas buscadas ao mesmo tempo.
+        ordenado (bool): Caso verdadeiro, as notas são produzidas na ordem das páginas, caso contrário na ordem em que
+            as páginas chegam.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfse` não são lidos (ver `NotaFiscalServicoLeve`).
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        primeira_pagina (int): Número da primeira página da listagem.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Os demais parâmetros são os mesmos filtros de `buscar_notas`.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+        ValueError: Caso a API numere as páginas a partir de outro número que não `primeira_pagina`.
+
+    Returns:
+        AsyncIterator[NotaFiscalServico]: Notas fiscais de serviço de todas as páginas.
+    '''
+    client = get_client(client)
+
+    async def buscar_pagina(numero: int) -> PaginaNotasServico:
+        response, pagina = await _buscar_pagina(credenciais,
+                                                cnpjEmpresa    = cnpjEmpresa,
+                                                data_inicio    = data_inicio,
+                                                data_fim       = data_fim,
+                                                ambiente       = ambiente,
+                                                status         = status,
+                                                texto          = texto,
+                                                pagina         = numero,
+                                                qtd_por_pagina = qtd_por_pagina,
+                                                ordencao       = ordencao,
+                                                tipo_ordenacao = tipo_ordenacao,
+                                                leve           = leve,
+                                                campos         = campos,
+                                                client         = client)
+        if pagina is None:
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao buscar as notas fiscais de serviço ({response.status_code})')
+        return pagina
+
+    async for nota in paginar(buscar_pagina, primeira_pagina, max_concorrencia=max_concorrencia, ordenado=ordenado):
+        yield nota
+
+async def iterar_periodo(credenciais: Credenciais,
+                         data_inicio: datetime,
+                         data_fim: datetime,
+                         cnpjEmpresa: list = None,
+                         ambiente: AmbientesEnum = None,
+                         status: str = None,
+                         texto: str = None,
+                         limite: int = 500,
+                         duracao_minima: timedelta = timedelta(minutes=1),
+                         max_concorrencia: int = 4,
+                         leve: bool = False,
+                         campos: Optional[List[str]] = None,
+                         client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscalServico]:
+    '''Percorre as notas fiscais de serviço de um período longo dividindo-o em sub-períodos.
+
+    Cada sub-período é consultado com uma única requisição de até `limite` notas. Caso o servidor informe um total maior
+    que `limite`, o sub-período é dividido ao meio e cada metade é consultada novamente, de modo que nenhuma consulta
+    depende de paginação profunda. Os sub-períodos são consultados em paralelo e as notas são produzidas à medida que
+    chegam, sem repetições (pelo `uuid`), mesmo que uma nota seja incluída durante a consulta.
+    ```
+    async for nota in nfse.iterar_periodo(credenciais, datetime(2023, 1, 1), datetime(2023, 12, 31, 23, 59, 59)):
+        print(nota.uuid, nota.data_emissao)
+    ```
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        data_inicio (datetime): Início do período.
+        data_fim (datetime): Fim do período.
+        limite (int): Quantidade máxima de notas por sub-período (também utilizada como `qtd_por_pagina`).
+        duracao_minima (timedelta): Sub-períodos menores que isso não são mais divididos: a página já consultada é
+            aproveitada e as demais são percorridas em fluxo (como em `iterar_notas`).
+        max_concorrencia (int): Quantidade máxima de sub-períodos consultados ao mesmo tempo.
+        leve (bool): Caso verdadeiro, `xml` e `json_objeto_nfse` não são lidos (ver `NotaFiscalServicoLeve`).
+        campos (List[str], optional): Campos lidos de cada nota, os demais ficam `None` (ver `pysisnoapi.projetar`).
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Os demais parâmetros são os mesmos filtros de `buscar_notas`.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma consulta retorne erro.
+
+    Returns:
+        AsyncIterator[NotaFiscalServico]: Notas fiscais de serviço do período, fora de ordem.
+    '''
+    if data_fim < data_inicio:
+        raise ValueError('O campo "data_fim" deve ser maior ou igual a "data_inicio"')
+    if max_concorrencia < 1:
+        raise ValueError('O campo "max_concorrencia" deve ser maior que zero')
+
+    if campos is not None:
+        campos = {*campos, 'id', 'uuid'}       # Necessários para descartar as repetições
+
+    client  = get_client(client)
+    filtros = {'cnpjEmpresa': cnpjEmpresa, 'ambiente': ambiente, 'status': status, 'texto': texto, 'leve': leve, 'campos': campos}
+
+    async def buscar(inicio: datetime, fim: datetime, numero: int) -> PaginaNotasServico:
+        response, pagina = await _buscar_pagina(credenciais, data_inicio=inicio, data_fim=fim, pagina=numero, qtd_por_pagina=limite,
+                                                client=client, **filtros)
+        if pagina is None:
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao buscar as notas fiscais de serviço ({response.status_code})')
+        return pagina
+
+    async def consultar(inicio: datetime, fim: datetime) -> (Union[List[NotaFiscalServico], AsyncIterator[NotaFiscalServico]], List[tuple],):
+        '''Retorna as notas do sub-período ou, caso ele possua notas demais, as suas duas metades.'''
+        pagina = await buscar(inicio, fim, PRIMEIRA_PAGINA)
+
+        total = para_inteiro(pagina.total)
+        if not total or total <= len(pagina.itens or []):
+            return (pagina.itens or [], [])
+
+        # Os filtros de data possuem precisão de segundos, com ambos os extremos inclusos:
+        meio = inicio + (fim - inicio) / 2
+        meio = meio.replace(microsecond=0)
+        if fim - inicio >= duracao_minima and inicio <= meio < fim:
+            return ([], [(inicio, meio), (meio + timedelta(seconds=1), fim)])
+
+        # Não é possível dividir mais: as demais páginas são percorridas, sem buscar a primeira novamente
+        notas = paginar(functools.partial(buscar, inicio, fim), PRIMEIRA_PAGINA, pagina_inicial=pagina)
+        return (notas, [])
+
+    periodos  = deque([(data_inicio, data_fim)])
+    pendentes = set()
+    vistos    = set()
+
+    try:
+        while periodos or pendentes:
+            while periodos and len(pendentes) < max_concorrencia:
+                pendentes.add(asyncio.create_task(consultar(*periodos.popleft())))
+
+            finalizadas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+
+            for tarefa in finalizadas:
+                notas, divisoes = tarefa.result()
+                periodos.extend(divisoes)
+
+                async with contextlib.aclosing(iterar(notas)) as notas:
+                    async for nota in notas:
+                        chave = nota.uuid or nota.id
+                        if chave is not None:
+                            if chave in vistos:
+                                continue
+                            vistos.add(chave)
+                        yield nota
+    finally:
+        for tarefa in pendentes:
+            tarefa.cancel()
+        await asyncio.gather(*pendentes, return_exceptions=True)
 
 @validate_call
 async def cancelar(token_emissor: str,
@@ -298,67 +688,175 @@ async def emitir(token_emissor: str,
            token_empresa: str,
            token_secret_empresa: str,
            objetoNfse: ObjetoEmissaoNFSe,
-           *args, **kwargs) -> httpx.Response:
+           *args,
+           client: Optional[SisnoClient] = None,
+           **kwargs) -> httpx.Response:
     '''Método responsável por enviar uma requisição para a plataforma SISNO solicitando a emissão de uma nova fiscal de SERVIÇO.
 
     Args:
         obj_emissao_nfse (ObjetoEmissaoNFSe): Objeto da classe "ObjetoEmissaoNFSe" que contém todos os dados necessários
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
 
     Returns:
         httpx.Response: Resposta do servidor
     '''
 
-    headers = HEADERS.copy()
+    credenciais = Credenciais(
+        token_emissor        = token_emissor,
+        token_secret_emissor = token_secret_emissor,
+        token_empresa        = token_empresa,
+        token_secret_empresa = token_secret_empresa,
+    )
 
-    # -----------------------------------------
-    validate_tokens(token_emissor, token_secret_emissor)
-    validate_tokens(token_empresa, token_secret_empresa)
+    return await _emitir(credenciais, objetoNfse, client=client)
 
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
-    headers['token-empresa']        = token_empresa
-    headers['token-secret-empresa'] = token_secret_empresa
-
-    # -----------------------------------------
+async def _emitir(credenciais: Credenciais,
+                  objetoNfse: ObjetoEmissaoNFSe,
+                  client: Optional[SisnoClient] = None) -> httpx.Response:
     obj_dict = objetoNfse.model_dump(exclude_none=True)
 
-    url = f'{BASE_URL}/nfse'
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, headers=headers, json=obj_dict)
+    client   = get_client(client)
+    response = await client.http.post(client.url('nfse'), headers=credenciais.headers_empresa, json=obj_dict)
 
     # Resultado:
     # TODO: Retornar algo mais útil do que simplesmente o response...
     return response
 
+async def emitir_lote(credenciais: Credenciais,
+                      objetos: Union[Iterable[ObjetoEmissaoNFSe], AsyncIterable[ObjetoEmissaoNFSe]],
+                      max_concorrencia: int = 10,
+                      max_por_segundo: Optional[float] = None,
+                      ordenado: bool = False,
+                      client: Optional[SisnoClient] = None) -> AsyncIterator[ResultadoEmissaoNFSe]:
+    '''Emite várias notas fiscais de serviço simultaneamente, produzindo o resultado de cada uma assim que fica pronto.
+
+    A entrada é lida sob demanda, portanto a memória utilizada depende apenas de `max_concorrencia`.
+    Por padrão os resultados são produzidos na ordem em que terminam, assim uma nota lenta não atrasa as demais.
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor e da empresa.
+        objetos (Iterable[ObjetoEmissaoNFSe] | AsyncIterable[ObjetoEmissaoNFSe]): Notas Fiscais de Serviço a serem emitidas.
+        max_concorrencia (int): Quantidade máxima de emissões em andamento ao mesmo tempo.
+        max_por_segundo (float, optional): Quantidade máxima de emissões iniciadas por segundo.
+        ordenado (bool): Caso verdadeiro, os resultados são produzidos na mesma ordem da entrada.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Returns:
+        AsyncIterator[ResultadoEmissaoNFSe]: Situação de cada nota (aprovada, em processamento, reprovada ou erro).
+    '''
+    client = get_client(client)
+
+    async def emitir_objeto(objetoNfse: ObjetoEmissaoNFSe) -> httpx.Response:
+        return await _emitir(credenciais, objetoNfse, client=client)
+
+    async for lote in executar_em_lote(emitir_objeto, objetos, max_concorrencia, max_por_segundo, ordenado):
+        if lote.erro is not None:
+            yield ResultadoEmissaoNFSe(indice=lote.indice, situacao='erro', motivo=str(lote.erro) or repr(lote.erro))
+        else:
+            yield _interpretar_emissao(lote.indice, lote.resultado)
+
+def _interpretar_emissao(indice: int, response: httpx.Response) -> ResultadoEmissaoNFSe:
+    '''Converte a resposta do endpoint de emissão em um `ResultadoEmissaoNFSe`.
+
+    Nunca levanta exceção: respostas que não podem ser interpretadas resultam em `erro`, para não interromper o lote.
+    '''
+    status_code = response.status_code
+
+    try:
+        dados = response.json()
+    except ValueError:
+        dados = None
+
+    if status_code != 200:
+        motivo = (dados.get('motivo') or dados.get('descricao')) if isinstance(dados, dict) else None
+        motivo = motivo or response.text
+
+        if status_code in ERROS_REQUISICAO:
+            motivo = f'{ERROS_REQUISICAO[status_code]} ({status_code}): {motivo}' if motivo else f'{ERROS_REQUISICAO[status_code]} ({status_code})'
+            return ResultadoEmissaoNFSe(indice=indice, situacao='erro', motivo=motivo, status_code=status_code)
+
+        return ResultadoEmissaoNFSe(indice=indice, situacao='reprovado' if status_code < 500 else 'erro', motivo=motivo, status_code=status_code)
+
+    # Algumas respostas vêm no envelope padrão da API (como em `completar`):
+    if isinstance(dados, dict) and isinstance(dados.get('dados'), dict):
+        dados = dados['dados']
+
+    if not isinstance(dados, dict):
+        return ResultadoEmissaoNFSe(indice=indice, situacao='erro', motivo=f'Resposta inesperada da API: {response.text}', status_code=status_code)
+
+    try:
+        nota = NotaFiscalServico.model_validate(dados)
+    except ValidationError as e:
+        return ResultadoEmissaoNFSe(indice=indice, situacao='erro', motivo=f'Resposta inesperada da API: {e}', status_code=status_code)
+
+    match (nota.status or '').lower():
+        case 'aprovado':
+            situacao = 'aprovado'
+        case 'reprovado' | 'cancelado':
+            situacao = 'reprovado'
+        case _:
+            situacao = 'processando'
+
+    return ResultadoEmissaoNFSe(indice=indice, situacao=situacao, motivo=nota.motivo, status_code=status_code, nota=nota)
+
 @validate_call
 async def recuperar_dados(token_emissor: str,
                     token_secret_emissor: str,
                     token_empresa:str,
                     token_secret_empresa:str,
                     id_nfse:int,
-                    *args, **kwargs) -> httpx.Response:
+                    *args,
+                    client: Optional[SisnoClient] = None,
+                    **kwargs) -> httpx.Response:
     # TODO: Cada NFSe possui um ID mesmo que de empresas diferentes ?
     # TODO: Essa função deveria estar atrelada as chaves de API, uma vez que será através delas que emitiremos as notas por uma empresa ou por outra ?
 
+    credenciais = Credenciais(
+        token_emissor        = token_emissor,
+        token_secret_emissor = token_secret_emissor,
+        token_empresa        = token_empresa,
+        token_secret_empresa = token_secret_empresa,
+    )
+
+    return await _recuperar_dados(credenciais, id_nfse, client=client)
+
+async def _recuperar_dados(credenciais: Credenciais,
+                           id_nfse: int,
+                           client: Optional[SisnoClient] = None) -> httpx.Response:
     if not isinstance(id_nfse, int):
         raise ValueError('Necessário informar um ID de NFSe válido.')
 
-    headers  = HEADERS.copy()
+    client   = get_client(client)
+    response = await client.get(client.url(f'nfse/{id_nfse}'), headers=credenciais.headers_empresa)
 
-    validate_tokens(token_emissor, token_secret_emissor)
-    headers['token-emissor']        = token_emissor
-    headers['token-secret-emissor'] = token_secret_emissor
+    # TODO: Retornar algo mais útil como uma instância de NotaFiscal por exemplo ?!
+    return response
 
-    validate_tokens(token_empresa, token_secret_empresa)
-    headers['token-empresa']        = token_empresa
-    headers['token-secret-empresa'] = token_secret_empresa
+async def completar(credenciais: Credenciais,
+                    nota: NotaFiscalServico,
+                    client: Optional[SisnoClient] = None) -> NotaFiscalServico:
+    '''Busca a nota completa (com `xml` e `json_objeto_nfse`) de uma nota obtida em modo leve.
 
-    url = f'{BASE_URL}/nfse/{id_nfse}'
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, headers=headers)
+    Utiliza o mesmo endpoint de `recuperar_dados`, que exige os tokens da empresa em `credenciais`. Notas que não são
+    `NotaFiscalServicoLeve` já estão completas e são retornadas sem nenhuma requisição.
 
-    # TODO: Retornar algo mais útil como uma instância de NotaFiscal por exemplo ?!
-    return response
+    Raises:
+        httpx.HTTPStatusError: Caso a consulta retorne erro.
+
+    Returns:
+        NotaFiscalServico: Nota completa.
+    '''
+    if not isinstance(nota, NotaFiscalServicoLeve):
+        return nota
+
+    response = await _recuperar_dados(credenciais, nota.id, client=client)
+    response.raise_for_status()
+
+    dados = response.json()
+    if isinstance(dados.get('dados'), dict):
+        dados = dados['dados']
+
+    return NotaFiscalServico(**dados)
 
 @validate_call
 async def retransmitir(token_emissor: str,
@@ -0,0 +1,329 @@
+'''
+    Módulo responsável pela sessão HTTP compartilhada com a plataforma SISNO.
+
+    Todas as funções dos módulos `nfe`, `nfse` e `misc` utilizam uma instância de `SisnoClient`, reaproveitando as
+    conexões (TCP + TLS) entre as requisições ao invés de abrir um novo `httpx.AsyncClient` a cada chamada.
+
+    Para utilizar uma sessão própria basta fazer:
+    ```
+    from pysisnoapi.sessao import SisnoClient
+
+    async with SisnoClient(max_conexoes=50) as client:
+        resultado = await client.nfe.emitir(...)
+    ```
+
+    Caso nenhuma sessão seja informada, as funções utilizam a sessão padrão retornada por `get_client()`.
+'''
+
+# ======================================================================================================================
+import asyncio
+import functools
+import httpx
+import inspect
+
+from types             import ModuleType
+from typing            import AsyncGenerator, Callable, Dict, Optional
+from pydantic_core     import core_schema
+
+from . import (
+    BASE_URL,
+    HEADERS,
+
+    Credenciais,
+)
+
+# ======================================================================================================================
+MAX_CONEXOES         = 100
+MAX_CONEXOES_OCIOSAS = 20
+EXPIRACAO_KEEPALIVE  = 30.0
+TIMEOUT              = 30.0
+
+# ======================================================================================================================
+def _is_operacao(funcao) -> bool:
+    return inspect.iscoroutinefunction(funcao) or inspect.isasyncgenfunction(funcao)
+
+def _operacao_com_credenciais(modulo: ModuleType, nome: str):
+    '''Retorna a versão da operação `nome` que recebe um objeto `Credenciais` como primeiro parâmetro.
+
+    As operações "clássicas" (que recebem os tokens) possuem uma implementação privada `_nome` que recebe as credenciais,
+    já as operações mais novas (ex.: `emitir_lote`) recebem as credenciais diretamente.
+    '''
+    for funcao in (getattr(modulo, f'_{nome}', None), getattr(modulo, nome, None)):
+        if _is_operacao(funcao):
+            parametros = list(inspect.signature(funcao).parameters)
+            if parametros and parametros[0] == 'credenciais':
+                return funcao
+    return None
+
+class _Operacoes:
+    '''Expõe as funções públicas de um módulo (`nfe`, `nfse` ou `misc`) já vinculadas a uma sessão.'''
+
+    def __init__(self, modulo: ModuleType, **vinculos):
+        self._modulo   = modulo
+        self._vinculos = vinculos
+
+    def __getattr__(self, nome: str):
+        funcao = getattr(self._modulo, nome, None)
+
+        if nome.startswith('_') or not _is_operacao(funcao):
+            raise AttributeError(f'"{self._modulo.__name__}" não possui a operação "{nome}"')
+
+        return functools.partial(funcao, **self._vinculos)
+
+    def __dir__(self):
+        return [n for n in dir(self._modulo) if not n.startswith('_') and _is_operacao(getattr(self._modulo, n))]
+
+class _OperacoesEmpresa(_Operacoes):
+    '''Expõe as operações de um módulo já vinculadas a uma sessão e a um objeto `Credenciais`.'''
+
+    def __init__(self, modulo: ModuleType, credenciais: Credenciais, client: 'SisnoClient'):
+        super().__init__(modulo, client=client)
+        self._credenciais = credenciais
+        self._cache       : Dict[tuple, Optional[Callable]] = {}
+
+    def __getattr__(self, nome: str):
+        chave = (self._modulo.__name__, nome)
+
+        if chave not in self._cache:
+            self._cache[chave] = None if nome.startswith('_') else _operacao_com_credenciais(self._modulo, nome)
+
+        funcao = self._cache[chave]
+        if funcao is None:
+            raise AttributeError(f'"{self._modulo.__name__}" não possui a operação "{nome}"')
+
+        return functools.partial(funcao, self._credenciais, **self._vinculos)
+
+    def __dir__(self):
+        return [n for n in super().__dir__() if _operacao_com_credenciais(self._modulo, n)]
+
+async def _encerrar_com_o_loop(http: httpx.AsyncClient) -> AsyncGenerator:
+    '''Gerador que fecha `http` quando o event loop em que foi criado é encerrado.
+
+    As conexões de um pool só podem ser fechadas no seu próprio loop. `asyncio.run` (assim como qualquer loop encerrado
+    com `loop.shutdown_asyncgens()`) fecha os geradores assíncronos abertos antes de fechar o loop, o que executa o
+    `finally` abaixo enquanto o loop ainda funciona.
+    '''
+    try:
+        yield
+    finally:
+        await http.aclose()
+
+def _encerrar_em_outro_loop(http: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]):
+    '''Fecha o cliente de um loop diferente do atual (ex.: um loop que roda em outra thread).
+
+    Caso o loop já tenha sido fechado sem `shutdown_asyncgens`, as conexões não podem mais ser fechadas e o pool é apenas
+    descartado: para evitar isso, chame `SisnoClient.aclose` antes de fechar um loop gerenciado manualmente.
+    '''
+    if loop is not None and not loop.is_closed():
+        asyncio.run_coroutine_threadsafe(http.aclose(), loop)
+
+class SisnoClient:
+    '''Sessão de longa duração com a plataforma SISNO.
+
+    Mantém um único `httpx.AsyncClient` com pool de conexões, de modo que requisições consecutivas reaproveitam a
+    mesma conexão TCP/TLS. As operações dos módulos ficam disponíveis em `client.nfe`, `client.nfse` e `client.misc`.
+
+    Args:
+        base_url (str): URL base da API.
+        max_conexoes (int): Quantidade máxima de conexões simultâneas no pool.
+        max_conexoes_ociosas (int): Quantidade máxima de conexões mantidas abertas (keep-alive).
+        expiracao_keepalive (float): Tempo, em segundos, que uma conexão ociosa é mantida aberta.
+        http2 (bool): Habilita HTTP/2 (necessário instalar `httpx[http2]`).
+        timeout (float): Tempo limite, em segundos, de cada requisição.
+        coalescer (bool): Compartilha uma única requisição entre GETs idênticos simultâneos (ver `SisnoClient.get`).
+        transport (httpx.AsyncBaseTransport, optional): Transporte alternativo, útil para testes.
+    '''
+
+    def __init__(self,
+                 base_url: str = BASE_URL,
+                 max_conexoes: int = MAX_CONEXOES,
+                 max_conexoes_ociosas: int = MAX_CONEXOES_OCIOSAS,
+                 expiracao_keepalive: float = EXPIRACAO_KEEPALIVE,
+                 http2: bool = False,
+                 timeout: float = TIMEOUT,
+                 coalescer: bool = True,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url   = base_url.rstrip('/')
+        self.limits     = httpx.Limits(
+            max_connections           = max_conexoes,
+            max_keepalive_connections = max_conexoes_ociosas,
+            keepalive_expiry          = expiracao_keepalive,
+        )
+        self.http2      = http2
+        self.timeout    = httpx.Timeout(timeout)
+        self.coalescer  = coalescer
+        self._transport = transport
+
+        self._http    : Optional[httpx.AsyncClient]         = None
+        self._loop    : Optional[asyncio.AbstractEventLoop] = None
+        self._guardiao: Optional[AsyncGenerator]            = None
+
+        self._em_andamento: Dict[tuple, asyncio.Future] = {}
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Permite receber a sessão como parâmetro de funções decoradas com `@validate_call`.
+        return core_schema.is_instance_schema(cls)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @property
+    def http(self) -> httpx.AsyncClient:
+        '''O `httpx.AsyncClient` compartilhado, criado sob demanda.
+
+        As conexões de um pool pertencem ao event loop em que foram abertas, por isso um novo cliente é criado caso a
+        sessão seja utilizada a partir de outro loop (ex.: chamadas consecutivas de `asyncio.run`).
+        '''
+        loop = asyncio.get_running_loop()
+
+        if self._http is None or self._http.is_closed or self._loop is not loop:
+            if self._http is not None and not self._http.is_closed:
+                _encerrar_em_outro_loop(self._http, self._loop)
+
+            self._http = httpx.AsyncClient(
+                headers   = HEADERS,
+                limits    = self.limits,
+                http2     = self.http2,
+                timeout   = self.timeout,
+                transport = self._transport,
+            )
+            self._loop = loop
+
+            # Fecha o cliente (ainda no seu loop) quando o loop for encerrado, ver `_encerrar_com_o_loop`:
+            self._guardiao = _encerrar_com_o_loop(self._http)
+            asyncio.ensure_future(self._guardiao.__anext__())
+
+        return self._http
+
+    def url(self, caminho: str) -> str:
+        return f'{self.base_url}/{caminho.lstrip("/")}'
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        '''Faz um GET, compartilhando a requisição com GETs idênticos que já estejam em andamento.
+
+        Dois GETs são idênticos quando possuem a mesma URL (com os parâmetros) e os mesmos cabeçalhos, portanto
+        requisições de empresas diferentes nunca são compartilhadas. Todos os chamadores recebem a mesma resposta, ou a
+        mesma exceção. Apenas requisições simultâneas são compartilhadas, nada é guardado após a resposta.
+        '''
+        if not self.coalescer:
+            return await self.http.get(url, **kwargs)
+
+        request = self.http.build_request('GET', url, **kwargs)
+        chave   = (str(request.url), tuple(sorted(request.headers.multi_items())))
+        tarefa  = self._em_andamento.get(chave)
+
+        if tarefa is None or tarefa.get_loop() is not self._loop:
+            tarefa = asyncio.ensure_future(self.http.send(request))
+            tarefa.add_done_callback(functools.partial(self._finalizar_get, chave))
+            self._em_andamento[chave] = tarefa
+
+        # `shield` impede que o cancelamento de um dos chamadores cancele a requisição dos demais:
+        return await asyncio.shield(tarefa)
+
+    def stream(self, metodo: str, url: str, **kwargs):
+        '''Abre uma requisição cujo corpo é lido aos poucos (`async with client.stream('GET', url) as response`).
+
+        Requisições em streaming nunca são compartilhadas, já que o corpo só pode ser lido uma vez.
+        '''
+        return self.http.stream(metodo, url, **kwargs)
+
+    def _finalizar_get(self, chave: tuple, tarefa: asyncio.Future):
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+
+        # Evita o aviso "exception was never retrieved" quando todos os chamadores foram cancelados:
+        if not tarefa.cancelled():
+            tarefa.exception()
+
+    async def aclose(self):
+        '''Encerra todas as conexões do pool.'''
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http = None
+        self._loop = None
+
+    # ------------------------------------------------------------------------------------------------------------------
+    @property
+    def nfe(self) -> _Operacoes:
+        from . import nfe
+        return _Operacoes(nfe, client=self)
+
+    @property
+    def nfse(self) -> _Operacoes:
+        from . import nfse
+        return _Operacoes(nfse, client=self)
+
+    @property
+    def misc(self) -> _Operacoes:
+        from . import misc
+        return _Operacoes(misc, client=self)
+
+    def sessao(self, credenciais: Credenciais) -> 'SessaoEmpresa':
+        '''Cria uma `SessaoEmpresa` que utiliza este pool de conexões.'''
+        return SessaoEmpresa(credenciais, client=self)
+
+class SessaoEmpresa:
+    '''Sessão vinculada às credenciais de uma empresa.
+
+    Os tokens são validados e os cabeçalhos de autenticação são montados uma única vez, em `Credenciais`, de modo que as
+    operações não precisam recebê-los a cada chamada:
+    ```
+    credenciais = Credenciais(token_emissor=..., token_secret_emissor=..., token_empresa=..., token_secret_empresa=...)
+    sessao      = SessaoEmpresa(credenciais)
+
+    resultado   = await sessao.nfe.emitir(objetoNfe, tipo_emissao='1')
+    ```
+
+    Várias sessões (uma por empresa) podem compartilhar o mesmo `SisnoClient`.
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor e da empresa.
+        client (SisnoClient, optional): Sessão HTTP a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+    '''
+
+    def __init__(self, credenciais: Credenciais, client: Optional[SisnoClient] = None):
+        self.credenciais = credenciais
+        self.client      = get_client(client)
+
+    @functools.cached_property
+    def nfe(self) -> _OperacoesEmpresa:
+        from . import nfe
+        return _OperacoesEmpresa(nfe, self.credenciais, self.client)
+
+    @functools.cached_property
+    def nfse(self) -> _OperacoesEmpresa:
+        from . import nfse
+        return _OperacoesEmpresa(nfse, self.credenciais, self.client)
+
+    @functools.cached_property
+    def misc(self) -> _OperacoesEmpresa:
+        from . import misc
+        return _OperacoesEmpresa(misc, self.credenciais, self.client)
+
+# ======================================================================================================================
+_client_padrao: Optional[SisnoClient] = None
+
+def get_client(client: Optional[SisnoClient] = None) -> SisnoClient:
+    '''Retorna a sessão informada ou, caso nenhuma seja informada, a sessão padrão compartilhada.'''
+    global _client_padrao
+
+    if client is not None:
+        return client
+
+    if _client_padrao is None:
+        _client_padrao = SisnoClient()
+
+    return _client_padrao
+
+def set_client(client: Optional[SisnoClient]):
+    '''Substitui a sessão padrão utilizada pelas funções dos módulos.'''
+    global _client_padrao
+    _client_padrao = client
+
+# ======================================================================================================================
@@ -0,0 +1,237 @@
+'''
+    Módulo responsável pela sincronização incremental das notas fiscais.
+
+    Ao invés de baixar todas as notas a cada execução, a sincronização guarda em um arquivo (checkpoint) a maior
+    `data_emissao` já vista e os ids das notas com exatamente essa data. A execução seguinte busca apenas as notas a
+    partir dessa data, de modo que o custo de cada execução é proporcional à quantidade de notas novas.
+    ```
+    from pysisnoapi import sincronizacao
+
+    async for nota in sincronizacao.sincronizar_nfse(credenciais, 'nfse.checkpoint.json'):
+        salvar(nota)
+    ```
+
+    O checkpoint só é gravado quando a sincronização termina sem erros, portanto uma execução interrompida é refeita
+    por completo na próxima vez.
+'''
+
+# ======================================================================================================================
+import math
+import os
+
+from datetime          import datetime, timedelta
+from pathlib           import Path
+from typing            import AsyncIterator, List, Optional, Set, Union
+from typing_extensions import Annotated
+from pydantic          import BaseModel, Field
+
+from . import (
+    AmbientesEnum,
+
+    Credenciais,
+    NotaFiscal,
+)
+from .concorrencia import para_inteiro
+from .datas        import converter_data   # Reexportado: antes era definido neste módulo
+from .sessao       import SisnoClient, get_client
+from .             import nfe, nfse
+
+# ======================================================================================================================
+class ArquivoCheckpoint(BaseModel):
+    '''Base dos checkpoints gravados em arquivo JSON (ver `Checkpoint` e `exportacao.CheckpointExportacao`).'''
+
+    @classmethod
+    def carregar(cls, caminho: Union[str, Path]):
+        '''Lê o checkpoint do arquivo ou retorna um checkpoint vazio caso o arquivo não exista.'''
+        caminho = Path(caminho)
+
+        if not caminho.exists():
+            return cls()
+
+        return cls.model_validate_json(caminho.read_text(encoding='utf-8'))
+
+    def salvar(self, caminho: Union[str, Path]):
+        '''Grava o checkpoint de forma atômica (arquivo temporário + renomear).'''
+        caminho    = Path(caminho)
+        temporario = caminho.with_name(caminho.name + '.tmp')
+
+        temporario.write_text(self.model_dump_json(indent=2), encoding='utf-8')
+        os.replace(temporario, caminho)
+
+class Checkpoint(ArquivoCheckpoint):
+    '''Marca d'água de uma sincronização.
+
+    Attributes:
+        data_emissao (datetime): Maior data de emissão já sincronizada.
+        ids (List[str]): Identificadores das notas emitidas exatamente em `data_emissao`, necessários para não repetir
+            as notas do limite na próxima execução.
+        atualizado_em (datetime): Momento em que o checkpoint foi gravado.
+    '''
+    data_emissao : Optional[Annotated[datetime, Field()]] = None
+    ids          : Annotated[List[str], Field()]          = []
+    atualizado_em: Optional[Annotated[datetime, Field()]] = None
+
+    def ja_sincronizada(self, data_emissao: Optional[datetime], id) -> bool:
+        '''Indica se a nota já foi entregue por uma execução anterior.'''
+        if self.data_emissao is None or data_emissao is None:
+            return False
+
+        if data_emissao < self.data_emissao:
+            return True
+
+        return data_emissao == self.data_emissao and str(id) in self.ids
+
+class _MarcaDagua:
+    '''Acompanha a maior data de emissão (e os ids nela) durante uma execução.'''
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.data_emissao: Optional[datetime] = checkpoint.data_emissao
+        self.ids         : Set[str]           = set(checkpoint.ids)
+
+    def registrar(self, data_emissao: Optional[datetime], id):
+        if data_emissao is None or id is None:
+            return
+
+        if self.data_emissao is None or data_emissao > self.data_emissao:
+            self.data_emissao = data_emissao
+            self.ids          = {str(id)}
+        elif data_emissao == self.data_emissao:
+            self.ids.add(str(id))
+
+    def checkpoint(self) -> Checkpoint:
+        return Checkpoint(data_emissao=self.data_emissao, ids=sorted(self.ids), atualizado_em=datetime.now())
+
+# ======================================================================================================================
+async def sincronizar_nfe(credenciais: Credenciais,
+                          caminho_checkpoint: Union[str, Path],
+                          qtd_por_pagina: int = None,
+                          janela_revisao: timedelta = timedelta(0),
+                          client: Optional[SisnoClient] = None) -> AsyncIterator[NotaFiscal]:
+    '''Produz apenas as notas fiscais emitidas (ou revisadas) desde a última sincronização.
+
+    O endpoint de listagem das NFe não possui filtro de data, mas retorna as notas mais recentes primeiro. Por isso as
+    páginas são percorridas até encontrar uma página sem nenhuma nota nova.
+
+    A paginação é por deslocamento: uma nota emitida durante a leitura empurra a última nota de uma página para o início
+    da seguinte. Por isso os ids já produzidos na execução são guardados e uma nota nunca é produzida duas vezes na
+    mesma execução (a nota emitida durante a leitura fica para a próxima sincronização).
+
+    Uma nota já sincronizada não é produzida novamente, mesmo que o seu status mude depois (ex.: "processando" para
+    "autorizado"). Para acompanhar essas mudanças informe `janela_revisao`: todas as notas emitidas nesse intervalo
+    antes da marca d'água são produzidas novamente, como em `sincronizar_nfse`.
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        caminho_checkpoint (str | Path): Arquivo onde o checkpoint é lido e gravado.
+        qtd_por_pagina (int, optional): Quantidade de notas por página.
+        janela_revisao (timedelta): Intervalo, antes da marca d'água, que é produzido novamente.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+
+    Returns:
+        AsyncIterator[NotaFiscal]: Notas fiscais novas ou revisadas.
+    '''
+    checkpoint = Checkpoint.carregar(caminho_checkpoint)
+    marca      = _MarcaDagua(checkpoint)
+    revisar    = checkpoint.data_emissao - janela_revisao if checkpoint.data_emissao and janela_revisao else None
+    client     = get_client(client)
+    numero     = nfe.PRIMEIRA_PAGINA
+    buscadas   = 0
+    entregues  : Set[int] = set()
+
+    def entregar(nota: NotaFiscal) -> bool:
+        if revisar is not None and nota.data_emissao is not None and nota.data_emissao >= revisar:
+            return True
+        return not checkpoint.ja_sincronizada(nota.data_emissao, nota.id)
+
+    while True:
+        response, pagina = await nfe._listar_pagina(credenciais, qtd_por_pagina, numero, client=client)
+        if pagina is None:
+            response.raise_for_status()
+            raise Exception(f'Resposta inesperada ao listar as notas fiscais ({response.status_code})')
+        buscadas += 1
+
+        novas = [n for n in pagina.itens or [] if entregar(n)]
+        for nota in novas:
+            if nota.id in entregues:
+                continue  # Deslocada para esta página por uma nota emitida durante a leitura
+            entregues.add(nota.id)
+
+            marca.registrar(nota.data_emissao, nota.id)
+            yield nota
+
+        if not novas or not pagina.itens:
+            break
+
+        numero          += 1
+        total            = para_inteiro(pagina.total)
+        itens_por_pagina = para_inteiro(pagina.itens_por_pagina)
+        if total and itens_por_pagina and buscadas >= math.ceil(total / itens_por_pagina):
+            break
+
+    marca.checkpoint().salvar(caminho_checkpoint)
+
+async def sincronizar_nfse(credenciais: Credenciais,
+                           caminho_checkpoint: Union[str, Path],
+                           cnpjEmpresa: list = None,
+                           ambiente: AmbientesEnum = None,
+                           janela_revisao: timedelta = timedelta(0),
+                           qtd_por_pagina: int = None,
+                           max_concorrencia: int = 4,
+                           client: Optional[SisnoClient] = None) -> AsyncIterator[nfse.NotaFiscalServico]:
+    '''Produz apenas as notas fiscais de serviço emitidas (ou revisadas) desde a última sincronização.
+
+    As notas são buscadas com `data_inicio` igual à marca d'água do checkpoint, `data_fim` igual ao momento em que a
+    sincronização começa e ordenadas por `data_emissao` (crescente). Assim uma nota emitida durante a leitura fica fora
+    do intervalo e não desloca as páginas seguintes (o que faria outra nota nunca ser retornada, ficando para trás da
+    marca d'água); ela é produzida na próxima sincronização. Notas que ainda podem mudar de status
+    (ex.: "processando") são reconsultadas informando `janela_revisao`: todas as notas emitidas nesse intervalo antes da
+    marca são produzidas novamente, para que o consumidor atualize o status.
+
+    Args:
+        credenciais (Credenciais): Tokens do emissor.
+        caminho_checkpoint (str | Path): Arquivo onde o checkpoint é lido e gravado.
+        janela_revisao (timedelta): Intervalo, antes da marca d'água, que é consultado novamente.
+        qtd_por_pagina (int, optional): Quantidade de notas por página.
+        max_concorrencia (int): Quantidade máxima de páginas buscadas ao mesmo tempo.
+        client (SisnoClient, optional): Sessão a ser utilizada. Caso não seja informada, utiliza a sessão padrão.
+
+        Os demais parâmetros são os mesmos filtros de `nfse.buscar_notas`.
+
+    Raises:
+        httpx.HTTPStatusError: Caso alguma página retorne erro.
+
+    Returns:
+        AsyncIterator[NotaFiscalServico]: Notas fiscais de serviço novas ou revisadas.
+    '''
+    checkpoint  = Checkpoint.carregar(caminho_checkpoint)
+    marca       = _MarcaDagua(checkpoint)
+    data_inicio = checkpoint.data_emissao - janela_revisao if checkpoint.data_emissao else None
+    data_fim    = datetime.now()
+
+    notas = nfse.iterar_notas(credenciais,
+                              cnpjEmpresa      = cnpjEmpresa,
+                              data_inicio      = data_inicio,
+                              data_fim         = data_fim,
+                              ambiente         = ambiente,
+                              ordencao         = 'data_emissao',
+                              tipo_ordenacao   = 'asc',
+                              qtd_por_pagina   = qtd_por_pagina,
+                              max_concorrencia = max_concorrencia,
+                              ordenado         = False,
+                              client           = client)
+
+    async for nota in notas:
+        data_emissao = converter_data(nota.data_emissao)
+
+        if not janela_revisao and checkpoint.ja_sincronizada(data_emissao, nota.uuid or nota.id):
+            continue
+
+        marca.registrar(data_emissao, nota.uuid or nota.id)
+        yield nota
+
+    marca.checkpoint().salvar(caminho_checkpoint)
+
+# ======================================================================================================================
@@ -0,0 +1,271 @@
+'''
+    Módulo com a validação local (offline) das notas fiscais.
+
+    As regras que mais reprovam notas (totais, pagamentos, CFOP, CST x alíquota e dígitos de CPF/CNPJ) são verificadas
+    localmente, antes de qualquer requisição. Uma nota com erros falha imediatamente, sem gastar uma requisição de
+    `nfe.validar` ou `nfe.emitir`:
+    ```
+    from pysisnoapi import validacao
+
+    erros = validacao.validar_nfe(objetoNfe)
+    for erro in erros:
+        print(erro.campo, erro.mensagem)
+    ```
+'''
+
+# ======================================================================================================================
+import re
+
+from decimal           import Decimal
+from typing            import Callable, Iterator, List, Optional
+from typing_extensions import Annotated
+from pydantic          import BaseModel, Field
+
+from .dinheiro import centavos, para_decimal, somar
+from .nfe      import ObjetoEmissaoNFe, Produto, conferir_totais
+
+# ======================================================================================================================
+PAIS_BRASIL = '1058'
+
+# CFOPs iniciados em 1, 2 e 3 são de entrada; em 5, 6 e 7 de saída:
+CFOP_ENTRADA  = ('1', '2', '3')
+CFOP_SAIDA    = ('5', '6', '7')
+CFOP_EXTERIOR = ('3', '7')
+
+# Situações tributárias que exigem alíquota maior que zero e as que não admitem alíquota:
+ICMS_TRIBUTADO          = {'00', '10', '20', '70'}
+ICMS_SEM_ALIQUOTA       = {'30', '40', '41', '50', '60', '102', '103', '300', '400', '500'}
+ICMS_COM_ST             = {'10', '30', '70', '201', '202', '203'}
+ICMS_COM_REDUCAO_BC     = {'20', '70'}
+IPI_TRIBUTADO           = {'00', '50'}
+IPI_SEM_ALIQUOTA        = {'01', '02', '03', '04', '05', '51', '52', '53', '54', '55'}
+PIS_COFINS_TRIBUTADO    = {'01', '02'}
+PIS_COFINS_SEM_ALIQUOTA = {'04', '06', '07', '08', '09'}
+
+MEIO_SEM_PAGAMENTO = '90'
+
+# ======================================================================================================================
+class ErroValidacao(BaseModel):
+    '''Erro encontrado na validação local.
+
+    Attributes:
+        campo (str): Caminho do campo com erro, ex.: "produtos[0].total".
+        regra (str): Identificador da regra violada, ex.: "total_produto".
+        mensagem (str): Descrição do erro.
+    '''
+    campo   : Annotated[str, Field()]
+    regra   : Annotated[str, Field()]
+    mensagem: Annotated[str, Field()]
+
+    def __str__(self):
+        return f'{self.campo}: {self.mensagem}'
+
+class NotaInvalida(ValueError):
+    '''Levantada quando uma nota não passa na validação local.'''
+
+    def __init__(self, erros: List[ErroValidacao]):
+        self.erros = erros
+        super().__init__('; '.join(str(e) for e in erros))
+
+# ======================================================================================================================
+def _digitos(documento: Optional[str]) -> str:
+    return re.sub(r'\D', '', documento or '')
+
+def validar_cpf(cpf: Optional[str]) -> bool:
+    '''Verifica os dígitos verificadores de um CPF (com ou sem pontuação).'''
+    numeros = [int(d) for d in _digitos(cpf)]
+
+    if len(numeros) != 11 or len(set(numeros)) == 1:
+        return False
+
+    for posicao in (9, 10):
+        soma   = sum(n * (posicao + 1 - i) for i, n in enumerate(numeros[:posicao]))
+        digito = soma * 10 % 11 % 10
+        if digito != numeros[posicao]:
+            return False
+
+    return True
+
+def validar_cnpj(cnpj: Optional[str]) -> bool:
+    '''Verifica os dígitos verificadores de um CNPJ (com ou sem pontuação).'''
+    numeros = [int(d) for d in _digitos(cnpj)]
+
+    if len(numeros) != 14 or len(set(numeros)) == 1:
+        return False
+
+    for posicao in (12, 13):
+        pesos  = list(range(posicao - 7, 1, -1)) + list(range(9, 1, -1))
+        resto  = sum(n * p for n, p in zip(numeros[:posicao], pesos)) % 11
+        digito = 0 if resto < 2 else 11 - resto
+        if digito != numeros[posicao]:
+            return False
+
+    return True
+
+# ======================================================================================================================
+# Regras: cada regra recebe o objeto de emissão e produz os erros encontrados.
+def _regra_totais_produtos(objeto: ObjetoEmissaoNFe) -> Iterator[ErroValidacao]:
+    for i, produto in enumerate(objeto.produtos):
+        campo = f'produtos[{i}]'
+
+        if produto.item != str(i + 1):
+            yield ErroValidacao(campo=f'{campo}.item', regra='sequencia_item', mensagem=f'Item deveria ser "{i + 1}" e não "{produto.item}"')
+
+        for nome in ('quantidade', 'subtotal', 'total'):
+            if produto.decimal(nome) is None:
+                yield ErroValidacao(campo=f'{campo}.{nome}', regra='valor_numerico', mensagem=f'Valor "{getattr(produto, nome)}" não é numérico')
+
+    for i, total, calculado in conferir_totais(objeto.produtos).divergentes:
+        produto = objeto.produtos[i]
+        yield ErroValidacao(campo=f'produtos[{i}].total', regra='total_produto', mensagem=f'Total {total} é diferente de quantidade {produto.decimal("quantidade")} * subtotal {produto.decimal("subtotal")} = {calculado}')
+
+def _regra_pagamentos(objeto: ObjetoEmissaoNFe) -> Iterator[ErroValidacao]:
+    formas = objeto.pedido.pagamento.formas_pagamento
+
+    if not formas:
+        yield ErroValidacao(campo='pedido.pagamento.formas_pagamento', regra='pagamento_obrigatorio', mensagem='Informe ao menos uma forma de pagamento')
+        return
+
+    if all(f.meio_pagamento == MEIO_SEM_PAGAMENTO for f in formas):
+        return
+
+    valores = [f.decimal('valor_pagamento') for f in formas]
+    for i, valor in enumerate(valores):
+        if valor is None or valor <= 0:
+            yield ErroValidacao(campo=f'pedido.pagamento.formas_pagamento[{i}].valor_pagamento', regra='valor_pagamento', mensagem='O valor do pagamento deve ser maior que zero')
+    if None in valores:
+        return
+
+    # Sem o total do pedido, os pagamentos devem cobrir a soma dos produtos:
+    total = objeto.pedido.decimal('total')
+    if total is not None:
+        campo = 'pedido.total'
+    else:
+        conferencia = conferir_totais(objeto.produtos)
+        if conferencia.invalidos:
+            return
+        total = conferencia.total_produtos
+        campo = 'produtos'
+
+    pago = somar(valores)
+    if centavos(pago) < centavos(total):
+        yield ErroValidacao(campo='pedido.pagamento', regra='pagamento_total', mensagem=f'Soma dos pagamentos {centavos(pago)} é menor que o total ({campo}) {centavos(total)}')
+
+def _regra_cfop(objeto: ObjetoEmissaoNFe) -> Iterator[ErroValidacao]:
+    esperados = CFOP_ENTRADA if objeto.operacao == '0' else CFOP_SAIDA
+    exterior  = (objeto.cliente.endereco.codigo_pais or PAIS_BRASIL) != PAIS_BRASIL
+
+    for i, produto in enumerate(objeto.produtos):
+        campo = f'produtos[{i}].cfop'
+        cfop  = produto.cfop
+
+        if not re.fullmatch(r'\d{4}', cfop or ''):
+            yield ErroValidacao(campo=campo, regra='cfop_formato', mensagem=f'CFOP "{cfop}" deve possuir 4 dígitos')
+            continue
+
+        if not cfop.startswith(esperados):
+            tipo = 'entrada' if objeto.operacao == '0' else 'saída'
+            yield ErroValidacao(campo=campo, regra='cfop_operacao', mensagem=f'CFOP {cfop} não é de {tipo} (deveria iniciar com {", ".join(esperados)})')
+        elif exterior != cfop.startswith(CFOP_EXTERIOR):
+            destino = 'exterior' if exterior else 'Brasil'
+            yield ErroValidacao(campo=campo, regra='cfop_destino', mensagem=f'CFOP {cfop} não corresponde a um destinatário no {destino}')
+
+def _regra_situacoes_tributarias(objeto: ObjetoEmissaoNFe) -> Iterator[ErroValidacao]:
+    regimes = set()
+
+    for i, produto in enumerate(objeto.produtos):
+        yield from _situacoes_tributarias_produto(f'produtos[{i}].impostos', produto)
+
+        icms = getattr(produto.impostos, 'icms', None)
+        if icms is not None:
+            regimes.add(len(str(icms.situacao_tributaria)))
+
+    if len(regimes) > 1:
+        yield ErroValidacao(campo='produtos', regra='icms_regime', mensagem='Não misture CST (regime normal) e CSOSN (Simples Nacional) na mesma nota')
+
+def _situacoes_tributarias_produto(campo: str, produto: Produto) -> Iterator[ErroValidacao]:
+    def verificar(nome: str, situacao: str, aliquota: Optional[str], tributados: set, sem_aliquota: set):
+        valor = para_decimal(aliquota) or Decimal(0)
+        if situacao in tributados and valor <= 0:
+            yield ErroValidacao(campo=f'{campo}.{nome}', regra='aliquota_obrigatoria', mensagem=f'Situação tributária {situacao} exige alíquota maior que zero')
+        if situacao in sem_aliquota and valor > 0:
+            yield ErroValidacao(campo=f'{campo}.{nome}', regra='aliquota_indevida', mensagem=f'Situação tributária {situacao} não admite alíquota ({aliquota})')
+
+    impostos = produto.impostos
+    yield from verificar('pis.aliquota',    str(impostos.pis.situacao_tributaria),    impostos.pis.aliquota,    PIS_COFINS_TRIBUTADO, PIS_COFINS_SEM_ALIQUOTA)
+    yield from verificar('cofins.aliquota', str(impostos.cofins.situacao_tributaria), impostos.cofins.aliquota, PIS_COFINS_TRIBUTADO, PIS_COFINS_SEM_ALIQUOTA)
+
+    ipi = getattr(impostos, 'ipi', None)
+    if ipi is not None:
+        yield from verificar('ipi.aliquota', str(ipi.situacao_tributaria), ipi.aliquota, IPI_TRIBUTADO, IPI_SEM_ALIQUOTA)
+
+    icms = getattr(impostos, 'icms', None)
+    if icms is not None:
+        situacao = str(icms.situacao_tributaria)
+        yield from verificar('icms.aliquota_icms', situacao, icms.aliquota_icms, ICMS_TRIBUTADO, ICMS_SEM_ALIQUOTA)
+
+        if situacao in ICMS_COM_ST and not (para_decimal(icms.aliquota_icms_st) or 0) > 0:
+            yield ErroValidacao(campo=f'{campo}.icms.aliquota_icms_st', regra='aliquota_st_obrigatoria', mensagem=f'Situação tributária {situacao} exige alíquota do ICMS ST')
+        if situacao in ICMS_COM_REDUCAO_BC and not (para_decimal(icms.percentual_reducao_bc_icms) or 0) > 0:
+            yield ErroValidacao(campo=f'{campo}.icms.percentual_reducao_bc_icms', regra='reducao_bc_obrigatoria', mensagem=f'Situação tributária {situacao} exige percentual de redução da base de cálculo')
+
+def _regra_documentos(objeto: ObjetoEmissaoNFe) -> Iterator[ErroValidacao]:
+    documentos = []
+
+    if objeto.cliente.pessoa_fisica and objeto.cliente.pessoa_fisica.cpf:
+        documentos.append(('cliente.pessoa_fisica.cpf', objeto.cliente.pessoa_fisica.cpf, validar_cpf))
+    if objeto.cliente.pessoa_juridica:
+        documentos.append(('cliente.pessoa_juridica.cnpj', objeto.cliente.pessoa_juridica.cnpj, validar_cnpj))
+
+    for nome in ('retirada', 'entrega'):
+        local = getattr(objeto, nome)
+        if local is not None:
+            if local.cpf:
+                documentos.append((f'{nome}.cpf', local.cpf, validar_cpf))
+            if local.cnpj:
+                documentos.append((f'{nome}.cnpj', local.cnpj, validar_cnpj))
+
+    for i, forma in enumerate(objeto.pedido.pagamento.formas_pagamento):
+        if forma.cnpj_credenciadora:
+            documentos.append((f'pedido.pagamento.formas_pagamento[{i}].cnpj_credenciadora', forma.cnpj_credenciadora, validar_cnpj))
+
+    for i, produto in enumerate(objeto.produtos):
+        if produto.cnpj_fabricante:
+            documentos.append((f'produtos[{i}].cnpj_fabricante', produto.cnpj_fabricante, validar_cnpj))
+
+    if objeto.informacao_intermediador and objeto.informacao_intermediador.cnpj:
+        documentos.append(('informacao_intermediador.cnpj', objeto.informacao_intermediador.cnpj, validar_cnpj))
+
+    for campo, documento, validar in documentos:
+        if not validar(documento):
+            tipo = 'CPF' if validar is validar_cpf else 'CNPJ'
+            yield ErroValidacao(campo=campo, regra=f'{tipo.lower()}_invalido', mensagem=f'{tipo} "{documento}" inválido')
+
+REGRAS_NFE: List[Callable[[ObjetoEmissaoNFe], Iterator[ErroValidacao]]] = [
+    _regra_totais_produtos,
+    _regra_pagamentos,
+    _regra_cfop,
+    _regra_situacoes_tributarias,
+    _regra_documentos,
+]
+
+# ======================================================================================================================
+def validar_nfe(objeto: ObjetoEmissaoNFe) -> List[ErroValidacao]:
+    '''Valida localmente a nota fiscal, sem nenhuma requisição.
+
+    Verifica:
+        - Total de cada produto (quantidade * subtotal) e numeração dos itens;
+        - Soma dos pagamentos x total do pedido (ou soma dos produtos);
+        - CFOP x operação (entrada/saída) e x destinatário no exterior;
+        - Situação tributária (CST/CSOSN) x alíquotas do ICMS, IPI, PIS e COFINS;
+        - Dígitos verificadores dos CPFs e CNPJs.
+
+    Args:
+        objeto (ObjetoEmissaoNFe): Nota fiscal a ser validada.
+
+    Returns:
+        List[ErroValidacao]: Erros encontrados (lista vazia caso a nota seja válida).
+    '''
+    return [erro for regra in REGRAS_NFE for erro in regra(objeto)]
+
+# ======================================================================================================================
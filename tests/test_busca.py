@@ -0,0 +1,71 @@
+# =================================================================
+import json
+import unittest
+
+from pysisnoapi       import nfse, NotaFiscal, normalizar_texto
+from pysisnoapi.busca import IndiceBusca, tokenizar
+
+# =================================================================
+class IndiceBuscaTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        objeto = json.dumps({'servico': {'discriminacao': 'Manutenção de ar-condicionado'}})
+
+        self.notas = [
+            nfse.NotaFiscalServico(uuid='a', nome_destinatario='João da Silva',  cpf_cnpj_destinatario='123.456.789-09', numero_nota='15', json_objeto_nfse=objeto),
+            nfse.NotaFiscalServico(uuid='b', nome_destinatario='JOÃO SILVEIRA',  cpf_cnpj_destinatario='98765432100',    numero_nota='16'),
+            NotaFiscal(id=7,                 nome_destinatario='Maria Conceição', cpf_cnpj_destinatario='11222333000181', numero_nota='1500'),
+        ]
+        self.indice = IndiceBusca(self.notas)
+
+    def test_normalizar_texto(self):
+        self.assertEqual(normalizar_texto('Ação ÇÃO'), 'acao cao')
+        self.assertEqual(normalizar_texto(None), '')
+        self.assertEqual(tokenizar('Ar-Condicionado, São Paulo'), ['ar', 'condicionado', 'sao', 'paulo'])
+
+    def test_acentos_maiusculas_e_prefixos(self):
+        self.assertEqual([n.uuid for n in self.indice.buscar('joao sil')], ['a', 'b'])
+        self.assertEqual([n.uuid for n in self.indice.buscar('SILVE')], ['b'])
+        self.assertEqual([n.id for n in self.indice.buscar('conceicao')], [7])
+        self.assertEqual(self.indice.buscar('joao conceicao'), [])
+        self.assertEqual(self.indice.buscar(''), [])
+
+    def test_documento_numero_e_discriminacao(self):
+        self.assertEqual([n.uuid for n in self.indice.buscar('12345678909')], ['a'])
+        self.assertEqual([n.uuid for n in self.indice.buscar('123.456')], ['a'])
+        self.assertEqual(len(self.indice.buscar('15')), 2)
+        self.assertEqual(len(self.indice.buscar('15', limite=1)), 1)
+        self.assertEqual([n.uuid for n in self.indice.buscar('manutencao')], ['a'])
+
+    async def test_reindexar(self):
+        atualizada = self.notas[0].model_copy(update={'nome_destinatario': 'Pedro Álvares'})
+        quantidade = await self.indice.indexar([atualizada])
+
+        self.assertEqual(quantidade, 1)
+        self.assertEqual(len(self.indice), 3)
+        self.assertEqual([n.uuid for n in self.indice.buscar('joao')], ['b'])
+        self.assertEqual([n.uuid for n in self.indice.buscar('alvares')], ['a'])
+
+        self.indice.remover(('nfe', 7))
+        self.assertNotIn(self.notas[2], self.indice)
+        self.assertEqual(self.indice.buscar('maria'), [])
+
+    def test_lista_ordenada_atualizada_no_lugar(self):
+        self.indice.buscar('joao')
+        ordenadas = self.indice._ordenadas
+
+        self.indice.adicionar([NotaFiscal(id=8, nome_destinatario='Zélia Andrade')])
+        self.indice.adicionar([NotaFiscal(id=100 + i, nome_destinatario=f'Cliente{i:03}') for i in range(50)])
+        self.indice.adicionar([NotaFiscal(id=9, nome_destinatario='Temporário'), NotaFiscal(id=9, nome_destinatario='Definitivo')])
+        self.indice.remover(('nfe', 8))
+
+        self.assertIs(self.indice._ordenadas, ordenadas)
+        self.assertEqual(ordenadas, sorted(self.indice._postings))
+        self.assertEqual(len(self.indice.buscar('cliente0')), 50)
+        self.assertEqual([n.id for n in self.indice.buscar('defin')], [9])
+        self.assertEqual(self.indice.buscar('tempor'), [])
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
@@ -0,0 +1,139 @@
+# =================================================================
+import asyncio
+import httpx
+import tempfile
+import unittest
+
+from pathlib import Path
+
+from pysisnoapi       import misc, Cfop, Credenciais, SisnoClient
+from pysisnoapi.cache import CacheTTL
+
+# =================================================================
+class CacheTTLTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.chamadas = 0
+
+    async def carregar(self):
+        self.chamadas += 1
+        await asyncio.sleep(0.01)
+        return [self.chamadas]
+
+    async def test_single_flight(self):
+        cache      = CacheTTL(self.carregar, ttl=60)
+        resultados = await asyncio.gather(*[cache.obter() for _ in range(10)])
+
+        self.assertEqual(self.chamadas, 1)
+        self.assertTrue(all(r == [1] for r in resultados))
+        self.assertEqual(await cache.obter(), [1])
+        self.assertEqual(await cache.obter(forcar=True), [2])
+
+    async def test_expiracao(self):
+        cache = CacheTTL(self.carregar, ttl=0)
+
+        await cache.obter()
+        await cache.obter()
+
+        self.assertEqual(self.chamadas, 2)
+
+    async def test_falha_mantem_valor_anterior(self):
+        cache = CacheTTL(self.carregar, ttl=60)
+        await cache.obter()
+
+        async def falhar():
+            raise Exception('Servidor fora do ar')
+
+        cache.carregar = falhar
+        cache.invalidar()
+        self.assertEqual(await cache.obter(), [1])
+
+        with self.assertRaises(Exception):
+            await CacheTTL(falhar, ttl=60).obter()
+
+    async def test_espera_apos_falha(self):
+        cache = CacheTTL(self.carregar, ttl=0, espera_apos_falha=60)
+        await cache.obter()
+
+        tentativas = 0
+        async def falhar():
+            nonlocal tentativas
+            tentativas += 1
+            raise Exception('Servidor fora do ar')
+
+        # Após a falha o valor anterior é retornado sem novas requisições, até que a espera termine:
+        cache.carregar = falhar
+        self.assertEqual([await cache.obter() for _ in range(5)], [[1]] * 5)
+        self.assertEqual(tentativas, 1)
+        self.assertTrue(cache.em_espera)
+
+        cache.espera_apos_falha = 0
+        await cache.obter()
+        self.assertEqual(tentativas, 2)
+
+        cache.carregar = self.carregar
+        self.assertEqual(await cache.obter(), [2])
+        self.assertFalse(cache.em_espera)
+
+    async def test_espera_apos_falha_sem_valor(self):
+        tentativas = 0
+        async def falhar():
+            nonlocal tentativas
+            tentativas += 1
+            raise ValueError('Servidor fora do ar')
+
+        cache = CacheTTL(falhar, ttl=60)
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                await cache.obter()
+        self.assertEqual(tentativas, 1)
+
+        cache.invalidar()
+        with self.assertRaises(ValueError):
+            await cache.obter()
+        self.assertEqual(tentativas, 2)
+
+    async def test_disco(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'cache.json'
+
+            await CacheTTL(self.carregar, ttl=60, caminho=caminho).obter()
+            self.assertEqual(await CacheTTL(self.carregar, ttl=60, caminho=caminho).obter(), [1])
+            self.assertEqual(self.chamadas, 1)
+
+            caminho.write_text('corrompido')
+            self.assertEqual(await CacheTTL(self.carregar, ttl=60, caminho=caminho).obter(), [2])
+
+class CacheCfopsTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.requisicoes = 0
+
+        async def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes += 1
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': [{'codigo': '5102', 'descricao': 'Venda de mercadoria', 'aplicacao': ''}]})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_cache_cfops(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'cfops.json'
+            cache   = misc.cache_cfops(self.credenciais, caminho=caminho, client=self.client)
+
+            resultados = await asyncio.gather(*[cache.obter() for _ in range(5)])
+            self.assertEqual(self.requisicoes, 1)
+            self.assertIsInstance(resultados[0][0], Cfop)
+
+            # Um novo processo carrega a lista do disco:
+            cfops = await misc.cache_cfops(self.credenciais, caminho=caminho, client=self.client).obter()
+            self.assertEqual(cfops[0].codigo, '5102')
+            self.assertEqual(self.requisicoes, 1)
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
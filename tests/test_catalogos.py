@@ -0,0 +1,188 @@
+# =================================================================
+import asyncio
+import httpx
+import tempfile
+import unittest
+
+from datetime import datetime, timedelta
+from pathlib  import Path
+
+from pysisnoapi           import misc, Credenciais, Ibpt, Municipio, SisnoClient, UNIDADES_FEDERATIVAS
+from pysisnoapi.catalogos import CatalogoIbpt, CatalogoMunicipios, _Trie
+
+# =================================================================
+MUNICIPIOS = {
+    'DF': [{'codigo_ibge': 5300108, 'descricao': 'Brasília'}],
+    'MG': [{'codigo_ibge': 3106200, 'descricao': 'Belo Horizonte'}, {'codigo_ibge': 3118601, 'descricao': 'Contagem'}],
+    'SP': [{'codigo_ibge': 3550308, 'descricao': 'São Paulo'}],
+}
+
+class CatalogoMunicipiosTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.ufs = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            uf = request.url.path.split('/')[-2]
+            self.ufs.append(uf)
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': MUNICIPIOS.get(uf, [])})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_carregar_todas_as_ufs(self):
+        catalogo = await CatalogoMunicipios.carregar(self.credenciais, client=self.client)
+
+        self.assertEqual(sorted(self.ufs), sorted(UNIDADES_FEDERATIVAS))
+        self.assertEqual(len(catalogo), 4)
+        self.assertEqual(catalogo.por_codigo('3550308').descricao, 'São Paulo')
+        self.assertEqual(catalogo.uf(3118601), 'MG')
+        self.assertEqual(catalogo.buscar('sp', 'SAO PAULO').codigo_ibge, 3550308)
+        self.assertEqual(catalogo.buscar('DF', ' brasilia ').codigo_ibge, 5300108)
+        self.assertIsNone(catalogo.buscar('GO', 'Brasília'))
+        self.assertIsNone(catalogo.por_codigo('abc'))
+        self.assertEqual(len(catalogo.municipios('mg')), 2)
+        self.assertIn(5300108, catalogo)
+
+    async def test_persistencia(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'municipios.json'
+
+            await CatalogoMunicipios.carregar(self.credenciais, ufs=['DF', 'MG'], caminho=caminho, client=self.client)
+            catalogo = await CatalogoMunicipios.carregar(self.credenciais, ufs=['DF', 'MG'], caminho=caminho, client=self.client)
+
+            self.assertEqual(sorted(self.ufs), ['DF', 'MG'])
+            self.assertIsInstance(catalogo.por_codigo(3106200), Municipio)
+
+            # Outras UFs invalidam o arquivo:
+            await CatalogoMunicipios.carregar(self.credenciais, ufs=['SP'], caminho=caminho, client=self.client)
+            self.assertEqual(self.ufs[-1], 'SP')
+
+    async def test_falha_ao_atualizar_com_outras_ufs(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'municipios.json'
+            await CatalogoMunicipios.carregar(self.credenciais, ufs=['DF', 'MG'], caminho=caminho, client=self.client)
+
+            # O arquivo não possui SP, então não pode substituir a atualização:
+            with self.assertRaises(Exception):
+                await CatalogoMunicipios.carregar(self.credenciais, ufs=['SP'], caminho=caminho, client=client)
+
+            # O arquivo possui DF, que é utilizado com um aviso e sem as demais UFs:
+            with self.assertWarns(RuntimeWarning):
+                catalogo = await CatalogoMunicipios.carregar(self.credenciais, ufs=['DF'], caminho=caminho, client=client)
+
+            self.assertEqual(catalogo.uf(5300108), 'DF')
+            self.assertIsNone(catalogo.por_codigo(3106200))
+
+        await client.aclose()
+
+    async def test_falha_em_uma_uf(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(500)))
+
+        with self.assertRaises(Exception):
+            await CatalogoMunicipios.carregar(self.credenciais, ufs=['DF'], client=client)
+
+        await client.aclose()
+
+class CatalogoIbptTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.consultas    = []
+        self.vigencia_fim = (datetime.now() + timedelta(days=30)).strftime('%d/%m/%Y')
+        self.expirado     = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.vigencia_1   = None    # Vigência do primeiro IBPT, caso seja diferente dos demais
+
+        async def responder(request: httpx.Request) -> httpx.Response:
+            self.consultas.append((request.headers['codigo-ou-descricao'], request.headers['uf']))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': [
+                {'codigo': '2202.10.00', 'ex': '', 'tipo': '0', 'descricao': 'Águas minerais com adição de açúcar', 'vigencia_fim': self.vigencia_1 or self.vigencia_fim},
+                {'codigo': '2201.10.00', 'ex': '', 'tipo': '0', 'descricao': 'Águas minerais e gaseificadas',        'vigencia_fim': self.vigencia_fim},
+            ]})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+        self.catalogo    = CatalogoIbpt(self.credenciais, client=self.client)
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_get_ibpts(self):
+        ibpts = await misc.get_ibpts(token_emissor='token', token_secret_emissor='token-secret', cod_desc='agua', uf='DF', client=self.client)
+
+        self.assertIsInstance(ibpts[0], Ibpt)
+        self.assertEqual(ibpts[0].codigo, '2202.10.00')
+
+    async def test_cache_e_single_flight(self):
+        resultados = await asyncio.gather(*[self.catalogo.consultar('Agua', 'df') for _ in range(5)])
+        await self.catalogo.consultar('ÁGUA', 'DF')
+
+        self.assertEqual(self.consultas, [('Agua', 'DF')])
+        self.assertEqual(len(resultados[0]), 2)
+
+        await self.catalogo.consultar('agua', 'SP')
+        self.assertEqual(len(self.consultas), 2)
+
+    async def test_expiracao_pela_vigencia(self):
+        self.vigencia_fim = self.expirado
+
+        # Os IBPTs com a vigência encerrada não são retornados, nem fazem a consulta expirar imediatamente:
+        self.assertEqual(await self.catalogo.consultar('agua', 'DF'), [])
+        self.assertEqual(await self.catalogo.consultar('agua', 'DF'), [])
+
+        self.assertEqual(len(self.consultas), 1)
+        self.assertEqual(self.catalogo.sugerir('agua', 'DF'), [])
+
+        # Os IBPTs expirados também são removidos da árvore de prefixos:
+        self.assertEqual(self.catalogo._tries['DF']._raiz, {})
+
+    async def test_vigencia_encerrada_na_resposta(self):
+        self.vigencia_1 = self.expirado
+
+        # A primeira consulta (API) e a segunda (cache) retornam os mesmos IBPTs:
+        primeira = await self.catalogo.consultar('agua', 'DF')
+        segunda  = await self.catalogo.consultar('agua', 'DF')
+
+        self.assertEqual([i.codigo for i in primeira], ['2201.10.00'])
+        self.assertEqual(primeira, segunda)
+        self.assertEqual(len(self.consultas), 1)
+
+    async def test_sugerir_por_prefixo(self):
+        self.assertEqual(self.catalogo.sugerir('agua', 'DF'), [])
+
+        await self.catalogo.consultar('agua', 'DF')
+
+        self.assertEqual([i.codigo for i in self.catalogo.sugerir('2202', 'DF')], ['2202.10.00'])
+        self.assertEqual([i.codigo for i in self.catalogo.sugerir('220110', 'DF')], ['2201.10.00'])
+        self.assertEqual([i.codigo for i in self.catalogo.sugerir('AGUA MIN', 'df')], ['2201.10.00', '2202.10.00'])
+        self.assertEqual([i.codigo for i in self.catalogo.sugerir('min acuc', 'DF')], ['2202.10.00'])
+        self.assertEqual(self.catalogo.sugerir('agua', 'SP'), [])
+
+    def test_trie_remover(self):
+        trie = _Trie()
+        for palavra in ('agua', 'aguardente'):
+            trie.inserir(palavra, 1)
+        trie.inserir('agua', 2)
+
+        trie.remover({'agua', 'aguardente'}, 1)
+
+        self.assertEqual(trie.prefixo('agu'), {2})
+        self.assertEqual(trie.prefixo('aguar'), set())
+        self.assertNotIn('r', trie._raiz['a']['g']['u']['a'])
+
+    async def test_buscar(self):
+        self.assertEqual(await self.catalogo.buscar('agu', 'DF'), [])
+        self.assertEqual(self.consultas, [])
+
+        self.assertEqual(len(await self.catalogo.buscar('agua gas', 'DF')), 1)
+        self.assertEqual(len(await self.catalogo.buscar('agua', 'DF')), 2)
+        self.assertEqual(len(self.consultas), 1)
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
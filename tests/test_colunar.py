@@ -0,0 +1,96 @@
+# =================================================================
+import httpx
+import tempfile
+import unittest
+
+from datetime import datetime
+from decimal  import Decimal
+from pathlib  import Path
+from unittest import mock
+
+from pysisnoapi import colunar, Credenciais, NotaFiscal, SisnoClient
+from pysisnoapi.nfse import NotaFiscalServico
+
+# =================================================================
+class ExtrairColunasTestCase(unittest.TestCase):
+    def test_nfe(self):
+        notas   = [NotaFiscal(id=1, valor_total='10.5', data_emissao=datetime(2023, 6, 1, 12), empresa={'cnpj': '1234'}), NotaFiscal(id=2)]
+        valores = colunar.extrair_colunas(notas, ['id', 'valor_total', 'data_emissao', 'empresa.cnpj'])
+
+        self.assertEqual(valores['id'], [1, 2])
+        self.assertEqual(valores['valor_total'], [Decimal('10.50'), None])
+        self.assertEqual(valores['data_emissao'], [datetime(2023, 6, 1, 12), None])
+        self.assertEqual(valores['empresa.cnpj'], ['1234', None])
+
+    def test_nfse(self):
+        notas   = [NotaFiscalServico(id=1, data_emissao='02/06/2023 17:25:57', data_competencia='2023-06-01T00:00:00-03:00', municipio_prestacao={'codigo_ibge': 3550308})]
+        valores = colunar.extrair_colunas(notas, colunar.COLUNAS_NFSE)
+
+        self.assertEqual(list(valores), list(colunar.COLUNAS_NFSE))
+        self.assertEqual(valores['data_emissao'], [datetime(2023, 6, 2, 17, 25, 57)])
+        self.assertEqual(valores['data_competencia'], [datetime(2023, 6, 1, 3)])  # Convertida para UTC
+        self.assertEqual(valores['municipio_prestacao.codigo_ibge'], [3550308])
+
+    def test_valor_invalido(self):
+        with self.assertRaises(ValueError):
+            colunar.extrair_colunas([NotaFiscal(valor_total='abc')], ['valor_total'])
+
+class DependenciasTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_sem_pyarrow(self):
+        with mock.patch.object(colunar, 'pa', None), mock.patch.object(colunar, 'np', None):
+            with self.assertRaises(ImportError):
+                await colunar.exportar([NotaFiscal(id=1)], 'notas.parquet')
+            with self.assertRaises(ImportError):
+                await colunar.carregar([NotaFiscal(id=1)])
+
+    @unittest.skipUnless(colunar.np is not None, 'numpy não instalado')
+    async def test_numpy(self):
+        with mock.patch.object(colunar, 'pa', None):
+            arrays = await colunar.carregar([NotaFiscal(id=1, valor_total='1.00', data_emissao=datetime(2023, 6, 1)), NotaFiscal()], ['id', 'valor_total', 'data_emissao'], tamanho_lote=1)
+
+        self.assertEqual(arrays['id'].mask.tolist(), [False, True])
+        self.assertEqual(arrays['valor_total'].tolist(), [Decimal('1.00'), None])
+        self.assertEqual(str(arrays['data_emissao'].dtype), 'datetime64[us]')
+
+@unittest.skipUnless(colunar.pa is not None, 'pyarrow não instalado')
+class ArrowTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.pasta = tempfile.TemporaryDirectory()
+        notas      = [{'id': i, 'status': 'autorizado', 'valor_total': f'{i}.10', 'data_emissao': f'2023-06-01T{i:02d}:00:00'} for i in range(5)]
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': {'total': len(notas), 'itens_por_pagina': 100, 'pagina_atual': 0, 'itens': notas}})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        self.pasta.cleanup()
+
+    def test_esquema(self):
+        esquema = colunar.esquema_arrow(['id', 'valor_total', 'data_emissao', 'status'])
+        self.assertEqual([str(t) for t in esquema.types], ['int64', 'decimal128(18, 2)', 'timestamp[us]', 'string'])
+
+    async def test_exportar_parquet(self):
+        caminho = Path(self.pasta.name) / 'notas.parquet'
+        linhas  = await colunar.exportar_nfe(self.credenciais, caminho, tamanho_lote=2, client=self.client)
+
+        tabela = colunar.pq.read_table(caminho)
+        self.assertEqual(linhas, 5)
+        self.assertEqual(tabela.column('valor_total').to_pylist()[1], Decimal('1.10'))
+        self.assertEqual(tabela.column('data_emissao').to_pylist()[2], datetime(2023, 6, 1, 2))
+
+    async def test_exportar_arrow(self):
+        caminho = Path(self.pasta.name) / 'notas.arrow'
+        await colunar.exportar_nfe(self.credenciais, caminho, tamanho_lote=2, client=self.client)
+
+        with colunar.pa.ipc.open_file(str(caminho)) as leitor:
+            self.assertEqual(leitor.num_record_batches, 3)
+            self.assertEqual(leitor.read_all().column('id').to_pylist(), [0, 1, 2, 3, 4])
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
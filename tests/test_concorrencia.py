@@ -0,0 +1,161 @@
+# =================================================================
+import asyncio
+import unittest
+
+from types import SimpleNamespace
+
+from pysisnoapi.concorrencia import LimitadorTaxa, ResultadoLote, executar_em_lote, paginar
+
+# =================================================================
+class ExecutarEmLoteTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_respeita_max_concorrencia(self):
+        em_andamento = 0
+        maximo       = 0
+
+        async def funcao(item):
+            nonlocal em_andamento, maximo
+            em_andamento += 1
+            maximo        = max(maximo, em_andamento)
+            await asyncio.sleep(0.001)
+            em_andamento -= 1
+            return item * 2
+
+        resultados = [r async for r in executar_em_lote(funcao, range(20), max_concorrencia=3)]
+
+        self.assertEqual(len(resultados), 20)
+        self.assertLessEqual(maximo, 3)
+        self.assertEqual(sorted(r.resultado for r in resultados), [i * 2 for i in range(20)])
+
+    async def test_encerrar_aguarda_cancelamento(self):
+        em_andamento = 0
+
+        async def funcao(item):
+            nonlocal em_andamento
+            em_andamento += 1
+            try:
+                await asyncio.sleep(0 if item == 0 else 10)
+            finally:
+                em_andamento -= 1
+
+        lote = executar_em_lote(funcao, range(5), max_concorrencia=5)
+        await anext(lote)
+        await lote.aclose()
+
+        # Nenhuma operação continua em andamento depois que o consumidor para:
+        self.assertEqual(em_andamento, 0)
+
+    async def test_consome_entrada_sob_demanda(self):
+        lidos = []
+
+        def entrada():
+            for i in range(100):
+                lidos.append(i)
+                yield i
+
+        async def funcao(item):
+            return item
+
+        lote = executar_em_lote(funcao, entrada(), max_concorrencia=2)
+        await lote.__anext__()
+        await lote.aclose()
+
+        self.assertLessEqual(len(lidos), 3)
+
+    async def test_modo_ordenado(self):
+        async def funcao(item):
+            await asyncio.sleep(0.001 * (5 - item))
+            return item
+
+        resultados = [r.indice async for r in executar_em_lote(funcao, range(5), max_concorrencia=5, ordenado=True)]
+
+        self.assertEqual(resultados, [0, 1, 2, 3, 4])
+
+    async def test_entrada_assincrona_e_erros(self):
+        async def entrada():
+            for i in range(3):
+                yield i
+
+        async def funcao(item):
+            if item == 1:
+                raise ValueError('Falhou')
+            return item
+
+        resultados = {r.indice: r async for r in executar_em_lote(funcao, entrada())}
+
+        self.assertIsInstance(resultados[1].erro, ValueError)
+        self.assertEqual(resultados[2], ResultadoLote(2, 2, None))
+
+    async def test_limitador_taxa(self):
+        limitador = LimitadorTaxa(max_por_segundo=100)
+        loop      = asyncio.get_running_loop()
+
+        inicio = loop.time()
+        for _ in range(5):
+            await limitador.aguardar()
+
+        self.assertGreaterEqual(loop.time() - inicio, 0.035)
+
+    def test_limitador_taxa_invalido(self):
+        with self.assertRaises(ValueError):
+            LimitadorTaxa(max_por_segundo=0)
+
+class PaginarTestCase(unittest.IsolatedAsyncioTestCase):
+    def pagina(self, numero, total=10, itens_por_pagina=3):
+        itens = list(range(numero * itens_por_pagina, min((numero + 1) * itens_por_pagina, total)))
+        return SimpleNamespace(total=total, itens_por_pagina=itens_por_pagina, pagina_atual=numero, itens=itens)
+
+    async def test_paginar_fora_de_ordem(self):
+        async def buscar_pagina(numero):
+            await asyncio.sleep(0.001 * (5 - numero))
+            return self.pagina(numero)
+
+        itens = [i async for i in paginar(buscar_pagina, max_concorrencia=3, ordenado=False)]
+
+        self.assertEqual(sorted(itens), list(range(10)))
+
+    async def test_paginar_sem_total(self):
+        buscadas = []
+
+        async def buscar_pagina(numero):
+            buscadas.append(numero)
+            pagina = self.pagina(numero)
+            return SimpleNamespace(total=None, itens_por_pagina=None, pagina_atual=None, itens=pagina.itens)
+
+        itens = [i async for i in paginar(buscar_pagina)]
+
+        self.assertEqual(itens, list(range(10)))
+        self.assertEqual(buscadas, [0, 1, 2, 3, 4])
+
+    async def test_paginar_contadores_como_texto(self):
+        async def buscar_pagina(numero):
+            pagina = self.pagina(numero - 1)
+            return SimpleNamespace(total='10', itens_por_pagina='3', pagina_atual=str(numero), itens=pagina.itens)
+
+        itens = [i async for i in paginar(buscar_pagina, primeira_pagina=1)]
+
+        self.assertEqual(itens, list(range(10)))
+
+    async def test_paginar_pagina_inicial(self):
+        buscadas = []
+
+        async def buscar_pagina(numero):
+            buscadas.append(numero)
+            return self.pagina(numero)
+
+        itens = [i async for i in paginar(buscar_pagina, pagina_inicial=self.pagina(0))]
+
+        self.assertEqual(itens, list(range(10)))
+        self.assertEqual(buscadas, [1, 2, 3])
+
+    async def test_paginar_numeracao_diferente(self):
+        async def buscar_pagina(numero):
+            return self.pagina(max(numero, 1))  # A API ignora a página 0 e retorna a página 1
+
+        with self.assertRaises(ValueError):
+            [i async for i in paginar(buscar_pagina, primeira_pagina=0)]
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
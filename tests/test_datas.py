@@ -0,0 +1,23 @@
+# =================================================================
+import unittest
+
+from datetime import datetime
+
+from pysisnoapi import datas, sincronizacao
+
+# =================================================================
+class DatasTestCase(unittest.TestCase):
+    def test_converter_data(self):
+        self.assertEqual(datas.converter_data('2023-06-02T17:25:57'), datetime(2023, 6, 2, 17, 25, 57))
+        self.assertEqual(datas.converter_data('02/06/2023 17:25:57'), datetime(2023, 6, 2, 17, 25, 57))
+        self.assertEqual(datas.converter_data(datetime(2023, 6, 2)) , datetime(2023, 6, 2))
+        self.assertIsNone(datas.converter_data(None))
+
+    def test_reexportado_pela_sincronizacao(self):
+        self.assertIs(sincronizacao.converter_data, datas.converter_data)
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
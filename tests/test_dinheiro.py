@@ -0,0 +1,43 @@
+# =================================================================
+import unittest
+
+from decimal import Decimal
+
+from pysisnoapi import dinheiro, nfe
+
+# =================================================================
+class DinheiroTestCase(unittest.TestCase):
+    def test_para_decimal(self):
+        self.assertEqual(dinheiro.para_decimal('10.50')       , Decimal('10.50'))
+        self.assertEqual(dinheiro.para_decimal(' 3 ')         , Decimal('3'))
+        self.assertEqual(dinheiro.para_decimal(0.1)           , Decimal('0.1'))
+        self.assertEqual(dinheiro.para_decimal(Decimal('2.5')), Decimal('2.5'))
+        self.assertIsNone(dinheiro.para_decimal(None))
+        self.assertIsNone(dinheiro.para_decimal(''))
+        self.assertIsNone(dinheiro.para_decimal('abc'))
+        self.assertIsNone(dinheiro.para_decimal('NaN'))
+        self.assertIsNone(dinheiro.para_decimal(float('inf')))
+
+    def test_centavos_arredonda_meio_centavo_para_cima(self):
+        self.assertEqual(dinheiro.centavos(Decimal('1.005')), Decimal('1.01'))
+        self.assertEqual(dinheiro.centavos(Decimal('1.015')), Decimal('1.02'))
+        self.assertEqual(dinheiro.centavos(Decimal('1.004')), Decimal('1.00'))
+
+    def test_somar_e_formatar(self):
+        total = dinheiro.somar(['0.10', '0.20', None, '', 0.3])
+
+        self.assertEqual(total, Decimal('0.60'))
+        self.assertEqual(dinheiro.formatar(total), '0.60')
+
+    def test_valores_monetarios(self):
+        parcela = nfe.Parcela(vencimento='2024-01-01', valor='33.335')
+
+        self.assertEqual(parcela.decimal('valor')   , Decimal('33.335'))
+        self.assertEqual(parcela.centavos('valor')  , Decimal('33.34'))
+        self.assertEqual(parcela.valor              , '33.335')
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
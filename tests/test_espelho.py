@@ -0,0 +1,105 @@
+# =================================================================
+import tempfile
+import threading
+import unittest
+
+from datetime import datetime
+from pathlib  import Path
+
+from pysisnoapi         import nfse, Empresa, NotaFiscal
+from pysisnoapi.espelho import EspelhoNotas
+
+# =================================================================
+class EspelhoNotasTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.espelho = EspelhoNotas()
+        self.nfses   = [
+            nfse.NotaFiscalServico(id=1, uuid='a', status='aprovado',  ambiente='1', empresa=Empresa(cnpj='111'), nome_destinatario='Maria', cpf_cnpj_destinatario='123', valor_total='10.50', data_emissao='2023-06-01T10:00:00'),
+            nfse.NotaFiscalServico(id=2, uuid='b', status='reprovado', ambiente='1', empresa=Empresa(cnpj='222'), nome_destinatario='João',  cpf_cnpj_destinatario='456', valor_total='9.00',  data_emissao='02/06/2023 10:00:00'),
+            nfse.NotaFiscalServico(id=3, uuid='c', status='aprovado',  ambiente='2', empresa=Empresa(cnpj='111'), nome_destinatario='Mário', cpf_cnpj_destinatario='789', valor_total='100',   data_emissao='2023-06-03T10:00:00'),
+        ]
+
+    def tearDown(self) -> None:
+        self.espelho.fechar()
+
+    async def test_espelhar_e_consultar(self):
+        total = await self.espelho.espelhar(self.nfses, tamanho_lote=2)
+
+        self.assertEqual(total, 3)
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(status='aprovado')], ['a', 'c'])
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(cnpjEmpresa=['222'])], ['b'])
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(data_inicio=datetime(2023, 6, 2), data_fim=datetime(2023, 6, 2, 23))], ['b'])
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(texto='RI')], ['a', 'c'])
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(ordencao='valor_total', tipo_ordenacao='desc')], ['c', 'a', 'b'])
+        self.assertEqual([n.uuid for n in self.espelho.buscar_notas(ordencao='data_emissao', pagina=2, qtd_por_pagina=2)], ['c'])
+        self.assertEqual(self.espelho.get_nfse('b').nome_destinatario, 'João')
+        self.assertIsNone(self.espelho.get_nfse('z'))
+
+    async def test_espelhar_fora_do_loop(self):
+        threads = []
+        salvar  = self.espelho.salvar_nfse
+
+        def registrar(notas):
+            threads.append(threading.current_thread())
+            return salvar(notas)
+
+        self.espelho.salvar_nfse = registrar
+        await self.espelho.espelhar(self.nfses, tamanho_lote=2)
+
+        self.assertEqual(len(threads), 2)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    async def test_upsert(self):
+        self.espelho.salvar_nfse(self.nfses)
+        self.espelho.salvar_nfse([self.nfses[1].model_copy(update={'status': 'aprovado'})])
+
+        self.assertEqual(len(self.espelho.buscar_notas()), 3)
+        self.assertEqual(self.espelho.get_nfse('b').status, 'aprovado')
+
+    def test_uuid_recebido_depois(self):
+        self.espelho.salvar_nfse([nfse.NotaFiscalServico(id=4, status='processando')])
+        self.espelho.salvar_nfse([nfse.NotaFiscalServico(id=4, uuid='d', status='aprovado')])
+
+        self.assertEqual([(n.id, n.uuid) for n in self.espelho.buscar_notas()], [(4, 'd')])
+        self.assertEqual(self.espelho.get_nfse('d').status, 'aprovado')
+
+    def test_atualizacao_parcial(self):
+        self.espelho.salvar_nfse([self.nfses[0].model_copy(update={'xml': '<nfse/>'})])
+        self.espelho.salvar_nfse([nfse.NotaFiscalServico(id=1, status='cancelado')])   # Ex.: nota do modo leve
+
+        nota = self.espelho.get_nfse('a')
+        self.assertEqual((nota.status, nota.xml, nota.nome_destinatario, nota.empresa.cnpj), ('cancelado', '<nfse/>', 'Maria', '111'))
+        self.assertEqual(len(self.espelho.buscar_notas(cpf_cnpj_destinatario='123')), 1)
+
+    def test_nota_sem_id(self):
+        with self.assertRaises(ValueError):
+            self.espelho.salvar_nfse([nfse.NotaFiscalServico(uuid='e')])
+
+    def test_nfe(self):
+        self.espelho.salvar_nfe([
+            NotaFiscal(id=1, chave_acesso='5323', status='Autorizada', data_emissao=datetime(2023, 6, 1)),
+            NotaFiscal(id=2, chave_acesso='5324', status='Cancelada',  data_emissao=datetime(2023, 6, 2)),
+        ])
+
+        self.assertEqual(self.espelho.get_nfe('5324').id, 2)
+        self.assertEqual([n.id for n in self.espelho.listar_nfe(status='Autorizada')], [1])
+
+    def test_ordenacao_invalida(self):
+        with self.assertRaises(ValueError):
+            self.espelho.buscar_notas(ordencao='id; DROP TABLE nfse')
+
+    def test_persistencia(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / 'notas.db'
+
+            with EspelhoNotas(caminho) as espelho:
+                espelho.salvar_nfse(self.nfses)
+
+            with EspelhoNotas(caminho) as espelho:
+                self.assertEqual(len(espelho.buscar_notas(ambiente='1')), 2)
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
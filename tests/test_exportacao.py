@@ -0,0 +1,189 @@
+# =================================================================
+import csv
+import gzip
+import httpx
+import json
+import tempfile
+import unittest
+
+from datetime import datetime, timedelta
+from pathlib  import Path
+
+from pysisnoapi import exportacao, Credenciais, NotaFiscal, SisnoClient
+from pysisnoapi.exportacao import CheckpointExportacao, Exportador
+
+# =================================================================
+class ExportadorTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.pasta = tempfile.TemporaryDirectory()
+        self.notas = [NotaFiscal(id=i, status='autorizado', valor_total='10.50', data_emissao=datetime(2023, 6, 1, i), empresa={'cnpj': '1234'} if i % 2 else None) for i in range(3)]
+
+    def tearDown(self) -> None:
+        self.pasta.cleanup()
+
+    def test_csv(self):
+        caminho = Path(self.pasta.name) / 'notas.csv'
+        with Exportador(caminho, ['id', 'data_emissao', 'empresa.cnpj'], delimitador=';') as exportador:
+            for nota in self.notas:
+                exportador.escrever(nota)
+
+        self.assertEqual(caminho.read_text(encoding='utf-8').splitlines(), [
+            'id;data_emissao;empresa.cnpj',
+            '0;2023-06-01T00:00:00;',
+            '1;2023-06-01T01:00:00;1234',
+            '2;2023-06-01T02:00:00;',
+        ])
+
+    def test_jsonl_compactado(self):
+        caminho = Path(self.pasta.name) / 'notas.jsonl.gz'
+        with Exportador(caminho, ['id', 'valor_total', 'empresa.cnpj']) as exportador:
+            exportador.escrever(self.notas[0])
+            exportador.marcar()
+            exportador.escrever(self.notas[1])
+
+        with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+            linhas = [json.loads(linha) for linha in arquivo]
+
+        self.assertEqual(linhas, [
+            {'id': 0, 'valor_total': '10.50', 'empresa.cnpj': None},
+            {'id': 1, 'valor_total': '10.50', 'empresa.cnpj': '1234'},
+        ])
+
+    def test_continuar_da_posicao(self):
+        caminho = Path(self.pasta.name) / 'notas.csv.gz'
+        with Exportador(caminho, ['id']) as exportador:
+            exportador.escrever(self.notas[0])
+            posicao = exportador.marcar()
+            exportador.escrever(self.notas[1])  # Trecho descartado ao continuar
+
+        with Exportador(caminho, ['id'], posicao=posicao) as exportador:
+            exportador.escrever(self.notas[2])
+
+        with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+            self.assertEqual(arquivo.read().splitlines(), ['id', '0', '2'])
+
+    def test_formato_desconhecido(self):
+        with self.assertRaises(ValueError):
+            Exportador(Path(self.pasta.name) / 'notas.txt', ['id'])
+
+class ExportacaoTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.pasta       = tempfile.TemporaryDirectory()
+        self.caminho     = Path(self.pasta.name) / 'notas.csv.gz'
+        self.checkpoint  = Path(self.pasta.name) / 'exportacao.json'
+        self.notas       = [{'id': i, 'uuid': f'nfse-{i}', 'status': 'autorizado', 'valor_total': f'{i}.00', 'xml': '<nfe/>' * 100,
+                             'data_emissao': (datetime(2023, 6, 1) + timedelta(hours=i)).isoformat()} for i in range(10)]
+        self.falhar_em   = None
+        self.limite      = None
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            params = request.url.params
+            qtd    = int(params.get('qtd', params.get('qtdPorPagina')))
+            pagina = int(params['pagina'])
+            base   = 1 if request.url.path.endswith('/nfse') else 0  # NFSe: páginas a partir de 1
+
+            if pagina == self.falhar_em:
+                self.falhar_em = None
+                return httpx.Response(500, text='Erro')
+
+            qtd   = min(qtd, self.limite or qtd)
+            itens = self.notas[(pagina - base) * qtd:(pagina - base + 1) * qtd]
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': {'total': len(self.notas), 'itens_por_pagina': qtd, 'pagina_atual': pagina, 'itens': itens}})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        self.pasta.cleanup()
+
+    def ler(self):
+        with gzip.open(self.caminho, 'rt', encoding='utf-8', newline='') as arquivo:
+            return list(csv.DictReader(arquivo))
+
+    async def test_exportar_nfe(self):
+        linhas = await exportacao.exportar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)
+        self.assertEqual(linhas, 10)
+
+        registros = self.ler()
+        self.assertEqual(list(registros[0]), list(exportacao.COLUNAS_NFE))
+        self.assertEqual([r['id'] for r in registros], [str(i) for i in range(10)])
+        self.assertEqual(registros[9]['valor_total'], '9.00')
+        self.assertEqual(registros[1]['data_emissao'], '2023-06-01T01:00:00')
+        self.assertEqual([r.url.params['pagina'] for r in self.requisicoes], ['0', '1', '2', '3'])
+
+    async def test_exportar_nfse(self):
+        linhas = await exportacao.exportar_nfse(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)
+
+        self.assertEqual(linhas, 10)
+        self.assertEqual([r['uuid'] for r in self.ler()], [f'nfse-{i}' for i in range(10)])
+        self.assertEqual([r.url.params['pagina'] for r in self.requisicoes], ['1', '2', '3', '4'])
+
+    async def test_pagina_limitada_pela_api(self):
+        # A API devolve menos notas que as solicitadas, sem que seja a última página:
+        self.limite = 2
+
+        linhas = await exportacao.exportar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)
+
+        self.assertEqual(linhas, 10)
+        self.assertEqual([r['id'] for r in self.ler()], [str(i) for i in range(10)])
+        self.assertEqual([r.url.params['pagina'] for r in self.requisicoes], ['0', '1', '2', '3', '4'])
+
+    async def test_sem_contadores(self):
+        async def buscar_pagina(numero: int, contadores: dict):
+            for i in range(3 if numero < 3 else 0):
+                yield NotaFiscal(id=numero * 3 + i)
+
+        linhas = await exportacao.exportar_paginas(buscar_pagina, self.caminho, ['id'])
+        self.assertEqual(linhas, 9)
+
+    async def test_numeracao_diferente(self):
+        async def buscar_pagina(numero: int, contadores: dict):
+            contadores.update(total=10, itens_por_pagina=3, pagina_atual=numero + 1)
+            yield NotaFiscal(id=numero)
+
+        with self.assertRaises(ValueError):
+            await exportacao.exportar_paginas(buscar_pagina, self.caminho, ['id'])
+
+    async def test_retomar_nfse(self):
+        self.falhar_em = 3
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await exportacao.exportar_nfse(self.credenciais, self.caminho, self.checkpoint, qtd_por_pagina=3, client=self.client)
+
+        checkpoint = CheckpointExportacao.carregar(self.checkpoint)
+        self.assertEqual((checkpoint.pagina, checkpoint.linhas), (3, 6))
+        self.assertEqual(checkpoint.posicao, self.caminho.stat().st_size)
+
+        # A segunda execução busca apenas as páginas que faltam:
+        self.requisicoes.clear()
+        linhas = await exportacao.exportar_nfse(self.credenciais, self.caminho, self.checkpoint, qtd_por_pagina=3, client=self.client)
+
+        self.assertEqual(linhas, 10)
+        self.assertEqual([r.url.params['pagina'] for r in self.requisicoes], ['3', '4'])
+        self.assertEqual([r['uuid'] for r in self.ler()], [f'nfse-{i}' for i in range(10)])
+        self.assertFalse(self.checkpoint.exists())
+
+    async def test_retomar_com_outras_colunas(self):
+        self.falhar_em = 2
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            await exportacao.exportar_nfse(self.credenciais, self.caminho, self.checkpoint, qtd_por_pagina=3, client=self.client)
+
+        with self.assertRaises(ValueError):
+            await exportacao.exportar_nfse(self.credenciais, self.caminho, self.checkpoint, colunas=['uuid'], qtd_por_pagina=3, client=self.client)
+
+    async def test_exportar_iteravel(self):
+        caminho = Path(self.pasta.name) / 'notas.ndjson'
+        linhas  = await exportacao.exportar([NotaFiscal(id=1, status='autorizado')], caminho, ['id', 'status'])
+
+        self.assertEqual(linhas, 1)
+        self.assertEqual(json.loads(caminho.read_text(encoding='utf-8')), {'id': 1, 'status': 'autorizado'})
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
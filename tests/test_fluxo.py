@@ -0,0 +1,122 @@
+# =================================================================
+import httpx
+import json
+import unittest
+
+from pysisnoapi import nfe, nfse, Credenciais, NotaFiscal, SisnoClient
+from pysisnoapi.fluxo import ExtratorItens
+
+# =================================================================
+class ExtratorItensTestCase(unittest.TestCase):
+    ITENS = [{'id': i, 'texto': 'a"b\\c{[}],' * (i % 3), 'aninhado': {'lista': [1, {'x': '}'}]}, 'acento': 'ção'} for i in range(200)]
+
+    def corpo(self) -> bytes:
+        return json.dumps({
+            'status': 'Sucesso',
+            'outro' : {'itens': [{'id': -1}]},
+            'dados' : {'total': len(self.ITENS), 'itens': self.ITENS, 'depois': [{'id': -2}]},
+            'itens' : [{'id': -3}],
+        }, ensure_ascii=False).encode()
+
+    def extrair(self, corpo: bytes, tamanho: int) -> (list, ExtratorItens,):
+        extrator = ExtratorItens()
+        itens    = []
+        for i in range(0, len(corpo), tamanho):
+            itens += extrator.alimentar(corpo[i:i + tamanho])
+        return [json.loads(item) for item in itens], extrator
+
+    def test_qualquer_tamanho_de_bloco(self):
+        corpo = self.corpo()
+
+        for tamanho in (1, 2, 3, 7, 64, 4096, len(corpo)):
+            with self.subTest(tamanho=tamanho):
+                itens, extrator = self.extrair(corpo, tamanho)
+                self.assertEqual(itens, self.ITENS)
+                self.assertEqual(len(extrator._buffer), 0)
+
+    def test_memoria_limitada_ao_item(self):
+        extrator = ExtratorItens()
+        extrator.alimentar(b'{"dados": {"itens": [')
+
+        for i in range(1000):
+            itens = extrator.alimentar(json.dumps({'id': i, 'nome': 'x' * 100}).encode() + b', {"id": ')
+            self.assertEqual(len(itens), 1)
+            self.assertLess(len(extrator._buffer), 20)
+            extrator.alimentar(b'0}, ')
+
+    def test_valores(self):
+        corpo = b'{"dados": {"total": 1234, "itens_por_pagina": "50", "itens": [{"total": 9}], "pagina_atual": -2, "x": {"y": 3}}}'
+
+        for tamanho in (1, 2, 5, len(corpo)):
+            with self.subTest(tamanho=tamanho):
+                itens, extrator = self.extrair(corpo, tamanho)
+                self.assertEqual(itens, [{'total': 9}])
+                self.assertEqual(extrator.valores, {'total': 1234, 'itens_por_pagina': '50', 'pagina_atual': -2})
+
+    def test_caminho(self):
+        itens, _ = self.extrair(b'{"resultado": [{"a": 1}, {"a": 2}]}', 5)
+        self.assertEqual(itens, [])
+
+        extrator = ExtratorItens(['resultado'])
+        self.assertEqual(extrator.alimentar(b'{"resultado": [{"a": 1}, {"a": 2}]}'), [b'{"a": 1}', b'{"a": 2}'])
+
+class ListagemFluxoTestCase(unittest.IsolatedAsyncioTestCase):
+    TOTAL = 50
+
+    def setUp(self) -> None:
+        self.eventos = []
+
+        async def corpo():
+            yield b'{"status": "Sucesso", "dados": {"total": %d, "itens": [' % self.TOTAL
+            for i in range(self.TOTAL):
+                self.eventos.append(f'enviado {i}')
+                item = json.dumps({'id': i, 'uuid': f'nfse-{i}', 'status': 'aprovado', 'xml': '<xml/>'}).encode()
+                yield (b', ' if i else b'') + item[:10]
+                yield item[10:]
+            yield b']}}'
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, content=corpo())))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_nfe(self):
+        notas = []
+        async for nota in nfe.listar_fluxo(self.credenciais, qtd='50', client=self.client):
+            self.eventos.append(f'recebido {nota.id}')
+            notas.append(nota)
+
+        self.assertEqual([n.id for n in notas], list(range(self.TOTAL)))
+        self.assertIsInstance(notas[0], NotaFiscal)
+
+        # A primeira nota é produzida antes de a resposta terminar de chegar:
+        self.assertLess(self.eventos.index('recebido 0'), self.eventos.index(f'enviado {self.TOTAL - 1}'))
+
+    async def test_contadores(self):
+        contadores = {}
+        notas      = [n async for n in nfe.listar_fluxo(self.credenciais, qtd='50', contadores=contadores, client=self.client)]
+
+        self.assertEqual(len(notas), self.TOTAL)
+        self.assertEqual(contadores, {'total': self.TOTAL})
+
+    async def test_nfse_leve(self):
+        notas = [n async for n in nfse.buscar_notas_fluxo(self.credenciais, qtd_por_pagina=50, leve=True, client=self.client)]
+
+        self.assertEqual([n.uuid for n in notas], [f'nfse-{i}' for i in range(self.TOTAL)])
+        self.assertIsInstance(notas[0], nfse.NotaFiscalServicoLeve)
+        self.assertIsNone(notas[0].xml)
+
+    async def test_erro(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(500, text='Erro')))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            [n async for n in nfse.buscar_notas_fluxo(self.credenciais, client=client)]
+
+        await client.aclose()
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
@@ -0,0 +1,361 @@
+# =================================================================
+import asyncio
+import csv
+import httpx
+import io
+import json
+import time
+import unittest
+import unittest.mock
+
+from decimal import Decimal
+
+from pysisnoapi            import importacao, nfe, nfse, Credenciais, Municipio, SisnoClient
+from pysisnoapi.catalogos  import CatalogoMunicipios
+from pysisnoapi.importacao import ImportadorNFe, ImportadorNFSe
+
+from tests import test_nfe, test_nfse
+
+# =================================================================
+class ArquivoLento:
+    '''Arquivo cujas linhas demoram a ser lidas, para cancelar uma leitura em andamento.'''
+    def __init__(self, arquivo: io.StringIO):
+        self.arquivo = arquivo
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.arquivo.close()
+
+    def readline(self):
+        return self.arquivo.readline()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        time.sleep(0.005)
+        return next(self.arquivo)
+
+def gerar_csv(linhas, cabecalhos=nfe.CSV_HEADERS, delimitador=';') -> io.StringIO:
+    arquivo = io.StringIO()
+    escritor = csv.writer(arquivo, delimiter=delimitador)
+    escritor.writerow(cabecalhos)
+    for linha in linhas:
+        escritor.writerow([linha.get(cabecalho, '') for cabecalho in cabecalhos])
+    arquivo.seek(0)
+    return arquivo
+
+LINHA = {
+    'CNPJ EMITENTE'                 : '05.397.048/0001-07',
+    'MODELO'                        : '55',
+    'CPF/CNPJ DESTINATÁRIO'         : '443.013.371-99',
+    'NOME/RAZAO SOCIAL DESTINATÁRIO': 'Vicente Marcos Samuel Nunes',
+    'INDICADOR IE'                  : '9',
+    'CONSUMIDOR FINAL'              : 'Sim',
+    'FAZ RETENÇÃO DE IMPOSTOS'      : 'Não',
+    'CEP'                           : '70634-300',
+    'BAIRRO'                        : 'Zona Industrial',
+    'LOGRADOURO'                    : 'Quadra SOFN Quadra 3',
+    'NUMERO'                        : '484',
+    'EMAIL DESTINATÁRIO'            : 'vicente@teste.com',
+    'OPERAÇÃO'                      : 'Saída',
+    'FINALIDADE'                    : '1',
+    'PRODUTOS'                      : '123456:2|123456:1,5:10,00',
+    'MEIO PAGAMENTO'                : '1',
+    'INFORMAÇÕES COMPLEMENTARES'    : 'Importado',
+    'SIGLA UF'                      : 'df',
+    'IBGE MUNICÍPIO'                : '5300108',
+    'COMPLEMENTO ENDEREÇO'          : '',
+}
+
+LINHA_NFSE = {
+    'CNPJ'                      : '',
+    'CPF'                       : '443.013.371-99',
+    'Nome'                      : 'Vicente Marcos Samuel Nunes',
+    'Indicador IE'              : 'Não contribuinte',
+    'Consumidor Final'          : 'S',
+    'Faz Retenção'              : 'S',
+    'CEP'                       : '70634-300',
+    'UF'                        : '',
+    'IBGE'                      : '5300108',
+    'Bairro'                    : 'Zona Industrial',
+    'Endereço'                  : 'Quadra SOFN Quadra 3',
+    'Número'                    : '484',
+    'Complemento'               : '',
+    'E-mail'                    : 'vicente@teste.com',
+    'Serviço'                   : 'Consultoria:1.500,00',
+    'Informações Complementares': '',
+}
+
+class ImportadorNFeTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        test_nfe.NfeTestCase.setUp(self)
+
+        self.produto    = self.objeto.produtos[0]
+        self.importador = ImportadorNFe(
+            produtos          = {self.produto.codigo: self.produto},
+            serie             = '1',
+            natureza_operacao = 'VENDA',
+            ambiente          = '2',
+            numero_inicial    = 100,
+            cnpj_emitente     = '05397048000107',
+        )
+
+    def test_montar(self):
+        linhas = list(self.importador.ler(gerar_csv([LINHA])))
+
+        self.assertEqual(len(linhas), 1)
+        self.assertIsNone(linhas[0].erro)
+        self.assertEqual(linhas[0].linha, 2)
+
+        objeto = linhas[0].objeto
+        self.assertIsInstance(objeto, nfe.ObjetoEmissaoNFe)
+        self.assertEqual(objeto.numero_nota_sequencial, '100')
+        self.assertEqual(objeto.operacao, '1')
+        self.assertEqual(objeto.cliente.consumidor_final, '1')
+        self.assertEqual(objeto.cliente.pessoa_fisica.cpf, '44301337199')
+        self.assertFalse(objeto.cliente.faz_retencao)
+        self.assertEqual(objeto.cliente.endereco.uf, 'DF')
+        self.assertEqual(objeto.cliente.endereco.cep, '70634300')
+
+        self.assertEqual([p.item for p in objeto.produtos], ['1', '2'])
+        self.assertEqual([p.total for p in objeto.produtos], ['10.00', '15.00'])
+        self.assertEqual(objeto.produtos[1].impostos, self.produto.impostos)
+        self.assertEqual(objeto.pedido.total, '25.00')
+        self.assertEqual(objeto.pedido.pagamento.formas_pagamento[0].meio_pagamento, '01')
+        self.assertEqual(objeto.pedido.pagamento.formas_pagamento[0].decimal('valor_pagamento'), Decimal('25'))
+        self.assertTrue(nfe.conferir_totais(objeto.produtos, objeto.pedido).ok)
+
+    def test_pessoa_juridica_e_varios_pagamentos(self):
+        linha  = {**LINHA, 'CPF/CNPJ DESTINATÁRIO': '05397048000107', 'MEIO PAGAMENTO': '17:5,00|03'}
+        objeto = next(self.importador.ler(gerar_csv([linha], delimitador=','))).objeto
+
+        self.assertEqual(objeto.cliente.pessoa_juridica.razao_social, LINHA['NOME/RAZAO SOCIAL DESTINATÁRIO'])
+        self.assertEqual([(f.meio_pagamento, f.valor_pagamento, f.tipo_integracao) for f in objeto.pedido.pagamento.formas_pagamento], [
+            ('17', '5.00' , None),
+            ('03', '20.00', '2'),
+        ])
+
+    def test_linhas_invalidas_nao_interrompem(self):
+        linhas = [
+            LINHA,
+            {**LINHA, 'PRODUTOS': '999:1'},
+            {**LINHA, 'CNPJ EMITENTE': '11111111000111'},
+            {},
+            {**LINHA, 'OPERAÇÃO': 'Transferência'},
+            {**LINHA, 'PRODUTOS': '123456:abc'},
+            LINHA,
+        ]
+        resultado = list(self.importador.ler(gerar_csv(linhas)))
+
+        self.assertEqual([r.linha for r in resultado if r.erro], [3, 4, 6, 7])
+        self.assertEqual([r.objeto.numero_nota_sequencial for r in resultado if not r.erro], ['100', '101'])
+        self.assertIn('999', str(resultado[1].erro))
+        self.assertIsInstance(resultado[2].erro, ValueError)
+
+        self.assertEqual(self.importador.estatisticas.lidas, 6)
+        self.assertEqual(self.importador.estatisticas.invalidas, 4)
+        self.assertGreater(self.importador.estatisticas.linhas_por_segundo, 0)
+
+    def test_cabecalho(self):
+        # Ordem, acentos e maiúsculas não importam:
+        cabecalhos = [c.lower().replace('Ç', 'c').replace('ç', 'c') for c in reversed(nfe.CSV_HEADERS)]
+        arquivo    = gerar_csv([{c.lower().replace('Ç', 'c').replace('ç', 'c'): v for c, v in LINHA.items()}], cabecalhos=cabecalhos)
+        self.assertIsNone(next(self.importador.ler(arquivo)).erro)
+
+        with self.assertRaises(ValueError) as contexto:
+            list(self.importador.ler(gerar_csv([LINHA], cabecalhos=nfe.CSV_HEADERS[:-1])))
+        self.assertIn('COMPLEMENTO ENDEREÇO', str(contexto.exception))
+
+        with self.assertRaises(ValueError):
+            list(self.importador.ler(io.StringIO('')))
+
+    def test_leitura_sob_demanda(self):
+        linhas = self.importador.ler(gerar_csv(LINHA for _ in range(1_000)))
+
+        next(linhas)
+        self.assertEqual(self.importador.estatisticas.lidas, 1)
+
+    def test_municipios(self):
+        self.importador.municipios = CatalogoMunicipios({'DF': [Municipio(codigo_ibge=5300108, descricao='Brasília')]})
+
+        objeto = next(self.importador.ler(gerar_csv([{**LINHA, 'SIGLA UF': ''}]))).objeto
+        self.assertEqual(objeto.cliente.endereco.descricao_municipio, 'Brasília')
+        self.assertEqual(objeto.cliente.endereco.uf, 'DF')
+
+        linha = next(self.importador.ler(gerar_csv([{**LINHA, 'IBGE MUNICÍPIO': '1234567'}])))
+        self.assertIn('1234567', str(linha.erro))
+
+    async def test_emitir(self):
+        requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            corpo = json.loads(request.content)
+            requisicoes.append(corpo)
+            return httpx.Response(200, json={'status': 'Sucesso', 'numero': corpo['numero_nota_sequencial']})
+
+        client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+        linhas     = [LINHA, {**LINHA, 'PRODUTOS': '999:1'}, LINHA, LINHA]
+        resultados = [r async for r in self.importador.emitir(credenciais, gerar_csv(linhas), max_concorrencia=2, client=client)]
+
+        self.assertEqual(sorted(r.linha for r in resultados), [2, 3, 4, 5])
+        self.assertEqual(len(requisicoes), 3)
+
+        por_linha = {r.linha: r for r in resultados}
+        self.assertIsNotNone(por_linha[3].erro)
+        self.assertEqual(por_linha[2].resultado['numero'], '100')
+        self.assertEqual(por_linha[5].resultado['numero'], '102')
+
+        self.assertEqual(self.importador.estatisticas.enviadas, 3)
+        self.assertEqual(self.importador.estatisticas.invalidas, 1)
+
+        await client.aclose()
+
+    async def test_ler_async(self):
+        linhas = [LINHA if i % 3 else {**LINHA, 'PRODUTOS': '999:1'} for i in range(10)]
+
+        assincrono = [(r.linha, r.erro is None) async for r in self.importador.ler_async(gerar_csv(linhas), tamanho_bloco=4)]
+        self.importador.numero = 100
+        sequencial = [(r.linha, r.erro is None) for r in self.importador.ler(gerar_csv(linhas))]
+
+        self.assertEqual(assincrono, sequencial)
+
+    async def test_linhas_invalidas_nao_acumulam(self):
+        client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+        linhas      = [{**LINHA, 'PRODUTOS': '999:1'} for _ in range(5_000)]
+
+        with unittest.mock.patch.object(importacao, 'TAMANHO_FILA_RESULTADOS', 10):
+            resultados = self.importador.emitir(credenciais, gerar_csv(linhas), client=client)
+            primeiro   = await anext(resultados)
+            await asyncio.sleep(0.1)
+
+            # Enquanto os resultados não são consumidos, a leitura aguarda (no máximo um bloco além da fila):
+            self.assertEqual(primeiro.linha, 2)
+            self.assertLess(self.importador.estatisticas.lidas, 1_000)
+
+            restantes = [r async for r in resultados]
+            self.assertEqual(len(restantes), 4_999)
+
+        await client.aclose()
+
+    async def test_emitir_arquivo_invalido(self):
+        with self.assertRaises(ValueError):
+            [r async for r in self.importador.emitir(Credenciais(token_emissor='token', token_secret_emissor='token-secret'), gerar_csv([], cabecalhos=['CNPJ EMITENTE']))]
+
+    def test_processos(self):
+        linhas = [LINHA if i % 7 else {**LINHA, 'PRODUTOS': '999:1'} for i in range(50)]
+
+        sequencial = list(self.importador.ler(gerar_csv(linhas)))
+        self.importador.numero = 100
+        paralelo   = list(self.importador.ler(gerar_csv(linhas), processos=2, tamanho_bloco=4))
+
+        self.assertEqual([(r.linha, r.erro is None) for r in paralelo], [(r.linha, r.erro is None) for r in sequencial])
+        self.assertEqual([r.objeto.numero_nota_sequencial for r in paralelo if r.objeto], [str(n) for n in range(100, 142)])
+        self.assertIn('999', str(paralelo[0].erro))
+        self.assertEqual(self.importador.estatisticas.invalidas, 8)
+
+    async def test_processos_async(self):
+        linhas = [LINHA if i % 7 else {**LINHA, 'PRODUTOS': '999:1'} for i in range(50)]
+
+        sequencial = list(self.importador.ler(gerar_csv(linhas)))
+        self.importador.numero = 100
+        paralelo   = [r async for r in self.importador.ler_async(gerar_csv(linhas), processos=2, tamanho_bloco=4)]
+
+        self.assertEqual([(r.linha, r.erro is None) for r in paralelo], [(r.linha, r.erro is None) for r in sequencial])
+        self.assertEqual([r.objeto.numero_nota_sequencial for r in paralelo if r.objeto], [str(n) for n in range(100, 142)])
+        self.assertEqual(self.importador.estatisticas.invalidas, 8)
+
+    async def test_cancelar_durante_a_leitura(self):
+        for processos in (None, 2):
+            with self.subTest(processos=processos):
+                arquivo = ArquivoLento(gerar_csv([LINHA] * 200))
+
+                async def consumir():
+                    return [r async for r in self.importador.ler_async(arquivo, processos=processos, tamanho_bloco=100)]
+
+                with unittest.mock.patch.object(ImportadorNFe, '_abrir', lambda self, a: a):
+                    tarefa = asyncio.create_task(consumir())
+                    await asyncio.sleep(0.05)   # O primeiro bloco ainda está sendo lido na outra thread
+                    tarefa.cancel()
+
+                    with self.assertRaises(asyncio.CancelledError):
+                        await tarefa
+
+                self.assertTrue(arquivo.arquivo.closed)
+
+class ImportadorNFSeTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        test_nfse.NfseTestCase.setUp(self)
+
+        self.importador = ImportadorNFSe(
+            servicos   = {'consultoria': self.objeto.servico},
+            municipios = CatalogoMunicipios({'DF': [Municipio(codigo_ibge=5300108, descricao='Brasília')]}),
+        )
+
+    def test_montar(self):
+        linha = next(self.importador.ler(gerar_csv([LINHA_NFSE], cabecalhos=nfse.CSV_HEADERS)))
+        self.assertIsNone(linha.erro)
+
+        objeto = linha.objeto
+        self.assertIsInstance(objeto, nfse.ObjetoEmissaoNFSe)
+        self.assertEqual(objeto.cliente.pessoa_fisica.cpf, '44301337199')
+        self.assertEqual(objeto.cliente.contribuinte, '9')
+        self.assertEqual(objeto.cliente.endereco.uf, 'DF')
+        self.assertEqual(objeto.cliente.endereco.descricao_municipio, 'Brasília')
+        self.assertEqual(objeto.servico.valor_servicos, '1500.00')
+        self.assertEqual(objeto.servico.iss_retido, '1')
+        self.assertEqual(objeto.servico.responsavel_retencao_iss, '1')
+        self.assertEqual(objeto.servico.discriminacao, 'TESTE')
+
+        # Sem valor, vale o do serviço cadastrado:
+        linha = {**LINHA_NFSE, 'Serviço': 'CONSULTORIA', 'Faz Retenção': 'N', 'CPF': '', 'CNPJ': '05397048000107'}
+        objeto = next(self.importador.ler(gerar_csv([linha], cabecalhos=nfse.CSV_HEADERS))).objeto
+        self.assertEqual(objeto.servico.valor_servicos, '1.00')
+        self.assertEqual(objeto.servico.iss_retido, '2')
+        self.assertEqual(objeto.cliente.pessoa_juridica.cnpj, '05397048000107')
+
+    def test_linhas_invalidas(self):
+        linhas = [
+            {**LINHA_NFSE, 'Serviço': 'limpeza'},
+            {**LINHA_NFSE, 'CNPJ': '05397048000107'},
+            {**LINHA_NFSE, 'IBGE': '1234567'},
+            {**LINHA_NFSE, 'Serviço': 'consultoria:0'},
+            {**LINHA_NFSE, 'Faz Retenção': 'talvez'},
+            LINHA_NFSE,
+        ]
+        resultado = list(self.importador.ler(gerar_csv(linhas, cabecalhos=nfse.CSV_HEADERS), processos=2, tamanho_bloco=2))
+
+        self.assertEqual([r.linha for r in resultado if r.erro], [2, 3, 4, 5, 6])
+        self.assertIn('limpeza', str(resultado[0].erro))
+        self.assertIsNotNone(resultado[-1].objeto)
+
+    async def test_emitir(self):
+        def responder(request: httpx.Request) -> httpx.Response:
+            corpo = json.loads(request.content)
+            if corpo['servico']['valor_servicos'] == '2.00':
+                return httpx.Response(400, json={'status': 'Erro', 'motivo': 'Valor inválido'})
+            return httpx.Response(200, json={'id': 1, 'uuid': 'nfse-1', 'status': 'aprovado'})
+
+        client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+        linhas     = [LINHA_NFSE, {**LINHA_NFSE, 'Serviço': 'consultoria:2'}, {**LINHA_NFSE, 'Serviço': 'limpeza'}]
+        resultados = {r.linha: r async for r in self.importador.emitir(credenciais, gerar_csv(linhas, cabecalhos=nfse.CSV_HEADERS), client=client)}
+
+        self.assertEqual(resultados[2].resultado.situacao, 'aprovado')
+        self.assertEqual(resultados[3].resultado.situacao, 'reprovado')
+        self.assertIsNone(resultados[3].erro)
+        self.assertIsNone(resultados[4].resultado)
+        self.assertIsNotNone(resultados[4].erro)
+        self.assertEqual(self.importador.estatisticas.enviadas, 2)
+
+        await client.aclose()
+
+# =================================================================
+if __name__ == '__main__':
+    unittest.main()
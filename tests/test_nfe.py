@@ -1,14 +1,25 @@
 # =================================================================
+import hashlib
+import httpx
+import io
+import json
+import pickle
 import requests
+import tempfile
 import unittest
+import unittest.mock
 
 from unittest.mock  import MagicMock
 from datetime       import datetime
+from decimal        import Decimal
+from pathlib        import Path
 from pydantic       import ValidationError
 
 from pysisnoapi import (
     nfe,
 
+    Credenciais,
+    SisnoClient,
     Endereco,
     Cliente,
     PessoaFisica,
@@ -16,6 +27,8 @@ from pysisnoapi import (
     Cofins,
     Icms,
     Ipi,
+    NotaFiscal,
+    NotaFiscalLeve,
 )
 
 # =================================================================
@@ -562,6 +575,260 @@ class NfeTestCase(unittest.TestCase):
         self.assertEqual(result['status'], 'Erro')
         self.assertEqual(result['descricao'], 'Tentativa de retransmitir uma nota que não foi rejeitada.')
 
+# =================================================================
+class EmitirLoteTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        NfeTestCase.setUp(self)
+
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            numero = json.loads(request.content)['numero_nota_sequencial']
+            if numero == '2':
+                return httpx.Response(412, json={'status': 'Erro', 'numero': numero})
+            return httpx.Response(200, json={'status': 'Sucesso', 'numero': numero})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_emitir_lote(self):
+        objetos = (self.objeto.model_copy(update={'numero_nota_sequencial': str(i)}) for i in range(5))
+
+        resultados = [r async for r in nfe.emitir_lote(self.credenciais, objetos, '1', max_concorrencia=2, client=self.client)]
+
+        self.assertEqual(len(resultados), 5)
+        for resultado in resultados:
+            self.assertIsNone(resultado.erro)
+            self.assertEqual(resultado.resultado['numero'], str(resultado.indice))
+
+        self.assertEqual({r.indice: r.resultado['status'] for r in resultados}[2], 'Erro')
+        self.assertEqual(self.requisicoes[0].headers['tipo-emissao'], '1')
+        self.assertEqual(self.requisicoes[0].headers['token-empresa'], 'empresa')
+
+    async def test_emitir_lote_pela_sessao(self):
+        sessao     = self.client.sessao(self.credenciais)
+        resultados = [r async for r in sessao.nfe.emitir_lote([self.objeto], '1', ordenado=True)]
+
+        self.assertEqual(resultados[0].indice, 0)
+        self.assertEqual(resultados[0].resultado['status'], 'Sucesso')
+
+class IterarNotasTestCase(unittest.IsolatedAsyncioTestCase):
+    TOTAL = 9
+
+    def setUp(self) -> None:
+        self.paginas = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            qtd    = int(request.url.params['qtd'])
+            pagina = int(request.url.params['pagina'])  # A primeira página é a página 0
+            self.paginas.append(pagina)
+
+            ids = range(pagina * qtd, min((pagina + 1) * qtd, self.TOTAL))
+            return httpx.Response(200, json={
+                'status': 'Sucesso',
+                'dados' : {
+                    'total'           : self.TOTAL,
+                    'itens_por_pagina': qtd,
+                    'pagina_atual'    : pagina,
+                    'itens'           : [{'id': i, 'status': 'Autorizada', 'data_emissao': '2023-06-02T17:25:57'} for i in ids],
+                },
+            })
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_iterar_todas_as_paginas(self):
+        notas = [n async for n in nfe.iterar_notas(self.credenciais, qtd_por_pagina=2, prefetch=2, client=self.client)]
+
+        self.assertEqual([n.id for n in notas], list(range(self.TOTAL)))
+        self.assertEqual(sorted(self.paginas), [0, 1, 2, 3, 4])
+
+    async def test_primeira_pagina_diferente(self):
+        # Uma API que numera as páginas a partir de 1 e trata a página 0 como a página 1:
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={
+            'dados': {'total': 4, 'itens_por_pagina': 2, 'pagina_atual': max(int(r.url.params['pagina']), 1), 'itens': [{'id': 1}, {'id': 2}]},
+        })))
+
+        with self.assertRaises(ValueError):
+            [n async for n in nfe.iterar_notas(self.credenciais, qtd_por_pagina=2, client=client)]
+
+        notas = [n async for n in nfe.iterar_notas(self.credenciais, qtd_por_pagina=2, primeira_pagina=1, client=client)]
+        self.assertEqual(len(notas), 4)
+
+        await client.aclose()
+
+    async def test_contadores_como_texto(self):
+        _, pagina = await nfe._listar_pagina(self.credenciais, '3', '1', client=self.client)
+
+        self.assertEqual((pagina.total, pagina.itens_por_pagina, pagina.pagina_atual), (str(self.TOTAL), '3', '1'))
+
+    async def test_erro_em_uma_pagina(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(500, text='Erro')))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            [n async for n in nfe.iterar_notas(self.credenciais, client=client)]
+
+        await client.aclose()
+
+    async def test_pagina_validada_a_partir_dos_bytes(self):
+        response, notas = await nfe._listar(self.credenciais, '3', '1', client=self.client)
+
+        self.assertEqual([n.id for n in notas], [3, 4, 5])
+        self.assertIsInstance(notas[0], nfe.NotaFiscal)
+        self.assertEqual(notas[0].data_emissao, datetime(2023, 6, 2, 17, 25, 57))
+
+    async def test_modo_leve(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={
+            'dados': {'total': 1, 'itens': [{'id': 1, 'status': 'Autorizada', 'xml': '<nfe/>', 'json_objeto_nfe': '{}'}]},
+        })))
+
+        response, notas = await nfe._listar(self.credenciais, leve=True, client=client)
+        self.assertIsInstance(notas[0], NotaFiscalLeve)
+        self.assertEqual(notas[0].status, 'Autorizada')
+        self.assertIsNone(notas[0].xml)
+        self.assertIsNone(notas[0].json_objeto_nfe)
+
+        await client.aclose()
+
+    async def test_projecao_de_campos(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={
+            'dados': {'total': 1, 'itens': [{'id': 1, 'status': 'Autorizada', 'valor_total': 'invalido', 'xml': '<nfe/>'}]},
+        })))
+
+        response, notas = await nfe._listar(self.credenciais, campos=['id', 'status'], client=client)
+        self.assertIsInstance(notas[0], NotaFiscal)
+        self.assertEqual((notas[0].id, notas[0].status), (1, 'Autorizada'))
+        self.assertIsNone(notas[0].valor_total)
+        self.assertIsNone(notas[0].xml)
+
+        self.assertIs(nfe._modelos(campos=['id', 'status']), nfe._modelos(campos=('status', 'id')))
+
+        with self.assertRaises(ValueError):
+            await nfe._listar(self.credenciais, campos=['inexistente'], client=client)
+
+        await client.aclose()
+
+    async def test_pagina_sem_itens(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={'dados': {'total': 0}})))
+
+        response, notas = await nfe._listar(self.credenciais, client=client)
+        self.assertEqual(notas, [])
+
+        await client.aclose()
+
+class DanfeTestCase(unittest.IsolatedAsyncioTestCase):
+    ROTA = 'teste/{chave_acesso}/pdf'
+
+    def setUp(self) -> None:
+        self.pasta       = tempfile.TemporaryDirectory()
+        self.pdfs        = {chave: b'%PDF-1.4 ' + chave.encode() * 1000 for chave in ('111', '222', '333')}
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            chave = request.url.path.split('/')[-2]
+            if chave not in self.pdfs:
+                return httpx.Response(404, json={'status': 'Erro'})
+            return httpx.Response(200, content=self.pdfs[chave], headers={'content-type': 'application/pdf'})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        self.pasta.cleanup()
+
+    async def test_get_danfe(self):
+        caminho = Path(self.pasta.name) / 'danfe.pdf'
+        danfe   = await nfe.get_danfe('token', 'token-secret', 'empresa', 'empresa-secret', '111', caminho, self.ROTA, tamanho_bloco=512, client=self.client)
+
+        self.assertEqual(caminho.read_bytes(), self.pdfs['111'])
+        self.assertEqual(danfe, nfe.Danfe('111', caminho, hashlib.sha256(self.pdfs['111']).hexdigest(), len(self.pdfs['111'])))
+        self.assertEqual(self.requisicoes[0].url.path, '/nfe-service/teste/111/pdf')
+        self.assertEqual(self.requisicoes[0].headers['token-empresa'], 'empresa')
+
+    async def test_get_danfe_escritas_agrupadas(self):
+        # Com blocos de 512 bytes e escritas a cada 1000 bytes, o PDF é gravado em várias escritas de dois blocos:
+        destino = io.BytesIO()
+        with unittest.mock.patch.object(nfe, 'TAMANHO_ESCRITA', 1000):
+            danfe = await nfe._get_danfe(self.credenciais, '333', destino, self.ROTA, tamanho_bloco=512, client=self.client)
+
+        self.assertEqual(destino.getvalue(), self.pdfs['333'])
+        self.assertEqual(danfe.sha256, hashlib.sha256(self.pdfs['333']).hexdigest())
+
+    async def test_get_danfe_objeto_de_arquivo(self):
+        destino = io.BytesIO()
+        danfe   = await self.client.sessao(self.credenciais).nfe.get_danfe('222', destino, self.ROTA)
+
+        self.assertEqual(destino.getvalue(), self.pdfs['222'])
+        self.assertIsNone(danfe.caminho)
+
+    async def test_get_danfe_erro(self):
+        caminho = Path(self.pasta.name) / 'danfe.pdf'
+        with self.assertRaises(httpx.HTTPStatusError):
+            await nfe._get_danfe(self.credenciais, '999', caminho, self.ROTA, client=self.client)
+
+        self.assertEqual(list(Path(self.pasta.name).iterdir()), [])
+
+    async def test_baixar_danfes(self):
+        pasta      = Path(self.pasta.name) / 'danfes'
+        resultados = [r async for r in nfe.baixar_danfes(self.credenciais, ['111', '222', '999'], pasta, self.ROTA, ordenado=True, client=self.client)]
+
+        self.assertTrue(all(r.resultado.baixado for r in resultados[:2]))
+        self.assertIsInstance(resultados[2].erro, httpx.HTTPStatusError)
+        self.assertEqual((pasta / '222.pdf').read_bytes(), self.pdfs['222'])
+        self.assertEqual(len((pasta / nfe.MANIFESTO_DANFES).read_text().splitlines()), 2)
+
+        # Na segunda execução apenas os arquivos ausentes ou alterados são baixados:
+        (pasta / '222.pdf').write_bytes(b'%PDF incompleto')
+        self.requisicoes.clear()
+
+        resultados = [r async for r in nfe.baixar_danfes(self.credenciais, ['111', '222', '333'], pasta, self.ROTA, ordenado=True, client=self.client)]
+
+        self.assertEqual([r.resultado.baixado for r in resultados], [False, True, True])
+        self.assertEqual(sorted(r.url.path.split('/')[-2] for r in self.requisicoes), ['222', '333'])
+        self.assertEqual((pasta / '222.pdf').read_bytes(), self.pdfs['222'])
+
+    async def test_resposta_nao_pdf(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={'status': 'Erro'})))
+
+        with self.assertRaises(ValueError):
+            await nfe._get_danfe(self.credenciais, '111', io.BytesIO(), self.ROTA, client=client)
+
+        await client.aclose()
+
+    async def test_rota_sem_chave(self):
+        with self.assertRaises(ValueError):
+            await nfe._get_danfe(self.credenciais, '111', io.BytesIO(), 'nfe/danfe', client=self.client)
+
+        self.assertEqual(self.requisicoes, [])
+
+    async def test_manifesto_gravado_a_cada_download(self):
+        pasta = Path(self.pasta.name) / 'danfes'
+        lote  = nfe.baixar_danfes(self.credenciais, ['111', '222'], pasta, self.ROTA, max_concorrencia=1, ordenado=True, client=self.client)
+
+        # Antes de o lote terminar, o hash do primeiro PDF já está no manifesto:
+        await anext(lote)
+        self.assertEqual((pasta / nfe.MANIFESTO_DANFES).read_text(), f'{hashlib.sha256(self.pdfs["111"]).hexdigest()}  111.pdf\n')
+
+        await lote.aclose()
+
+    async def test_chaves_repetidas(self):
+        pasta      = Path(self.pasta.name) / 'danfes'
+        resultados = [r async for r in nfe.baixar_danfes(self.credenciais, ['111', '111', '222', '111'], pasta, self.ROTA, client=self.client)]
+
+        self.assertTrue(all(r.erro is None for r in resultados))
+        self.assertEqual(sorted(p.name for p in pasta.iterdir()), ['111.pdf', '222.pdf', nfe.MANIFESTO_DANFES])
+        self.assertEqual((pasta / '111.pdf').read_bytes(), self.pdfs['111'])
+        self.assertEqual(len((pasta / nfe.MANIFESTO_DANFES).read_text().splitlines()), 2)
+
 # =================================================================
 # Models:
 class ObjetoEmissaoNFeTestCase(unittest.TestCase):
@@ -681,6 +948,27 @@ class ObjetoEmissaoNFeTestCase(unittest.TestCase):
         assert objeto.indicador_intermediador  is None
         assert objeto.informacao_intermediador is None
 
+    def test_pickle(self):
+        # Necessário para montar as notas em outros processos (ver `importacao.Importador.ler`):
+        objeto = nfe.ObjetoEmissaoNFe (
+            numero_nota_sequencial = '123456',
+            serie                  = '1',
+            operacao               = '1',
+            natureza_operacao      = 'NATUREZA',
+            modelo                 = '55',
+            finalidade             = '1',
+            ambiente               = '2',
+            cliente                = self.cliente,
+            produtos               = self.produtos,
+            pedido                 = self.pedido,
+            data_entrada_saida     = self.data,
+            data_emissao           = self.data,
+        )
+
+        copia = pickle.loads(pickle.dumps(objeto))
+        assert copia == objeto
+        assert copia.operacao is nfe.OperacoesEnum('1')
+
     def test_campo_obrigatorio_numero_sequencial(self):
         with self.assertRaises(ValidationError):
             nfe.ObjetoEmissaoNFe (
@@ -1267,6 +1555,53 @@ class ProdutoUnitTest(unittest.TestCase):
 
             )
 
+    def test_total_arredondado_sem_erro_de_ponto_flutuante(self):
+        # Em float, 3 * 0.335 = 1.00499999..., que seria formatado como "1.00":
+        produto = nfe.Produto(item="1", cfop='5102', nome="UNIFORMES", codigo="123456", ncm="62069000", quantidade="3", unidade="UNID", subtotal="0.335", total="1.01", impostos=self.impostos)
+        self.assertEqual(produto.decimal('total'), Decimal('1.01'))
+
+        with self.assertRaises(ValidationError):
+            nfe.Produto(item="1", cfop='5102', nome="UNIFORMES", codigo="123456", ncm="62069000", quantidade="3", unidade="UNID", subtotal="0.335", total="1.00", impostos=self.impostos)
+
+    def test_total_nao_numerico(self):
+        with self.assertRaises(ValidationError):
+            nfe.Produto(item="1", cfop='5102', nome="UNIFORMES", codigo="123456", ncm="62069000", quantidade="2", unidade="UNID", subtotal="5.0", total="dez", impostos=self.impostos)
+
+class ConferirTotaisTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        NfeTestCase.setUp(self)
+
+        produto       = self.objeto.produtos[0]
+        self.produtos = [produto.model_copy(update={'item': str(i + 1)}) for i in range(900)]
+
+    def test_totais_corretos(self):
+        conferencia = nfe.conferir_totais(self.produtos)
+
+        self.assertTrue(conferencia.ok)
+        self.assertEqual(conferencia.total_produtos, Decimal('9000.00'))
+        self.assertEqual(conferencia.total_nota    , Decimal('9000.00'))
+
+    def test_produtos_divergentes_e_invalidos(self):
+        self.produtos[10]  = self.produtos[10].model_copy(update={'total': '9.99'})
+        self.produtos[20]  = self.produtos[20].model_copy(update={'quantidade': 'dois'})
+
+        conferencia = nfe.conferir_totais(self.produtos)
+
+        self.assertFalse(conferencia.ok)
+        self.assertEqual(conferencia.divergentes, [(10, Decimal('9.99'), Decimal('10.00'))])
+        self.assertEqual(conferencia.invalidos  , [20])
+
+    def test_total_da_nota(self):
+        pedido = self.objeto.pedido.model_copy(update={'frete': '15.50', 'despesas_acessorias': '4.50', 'desconto': '20', 'total': '9000.00'})
+
+        conferencia = nfe.conferir_totais(self.produtos, pedido)
+        self.assertEqual(conferencia.total_nota, Decimal('9000.00'))
+        self.assertTrue(conferencia.ok)
+
+        conferencia = nfe.conferir_totais(self.produtos, pedido.model_copy(update={'total': '9020.00'}))
+        self.assertTrue(conferencia.total_divergente)
+        self.assertFalse(conferencia.ok)
+
 # =================================================================
 if __name__ == "__main__":
     unittest.main()
@@ -1,13 +1,19 @@
 # =================================================================
+import httpx
+import json
 import unittest
 import requests
 
+from datetime import datetime, timedelta
+
 from unittest.mock import MagicMock
 from pydantic import ValidationError
 
 from pysisnoapi import (
     nfse,
 
+    Credenciais,
+    SisnoClient,
     Cliente,
     Empresa,
     Endereco,
@@ -252,6 +258,225 @@ class NfseTestCase(unittest.TestCase):
 
         self.assertEqual(resultado['status'], 'processando')
 
+# =================================================================
+class EmitirLoteTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        NfseTestCase.setUp(self)
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            discriminacao = json.loads(request.content)['servico']['discriminacao']
+            match discriminacao:
+                case 'APROVADA':
+                    return httpx.Response(200, json={'id': 1, 'uuid': 'a', 'status': 'aprovado', 'motivo': 'Nota aprovada'})
+                case 'PROCESSANDO':
+                    return httpx.Response(200, json={'id': 2, 'uuid': 'b', 'status': 'processando', 'motivo': 'Lote enviado para processamento'})
+                case 'REPROVADA':
+                    return httpx.Response(412, json={'status': 'Erro', 'descricao': 'Código de tributação inválido'})
+                case 'INVALIDA':
+                    return httpx.Response(200, json={'id': 'abc', 'status': 'aprovado'})
+                case 'ENVELOPE':
+                    return httpx.Response(200, json={'status': 'Sucesso', 'dados': {'id': 3, 'uuid': 'c', 'status': 'aprovado'}})
+                case 'SEM TOKEN':
+                    return httpx.Response(401, json={'status': 'Erro', 'descricao': 'Token inválido'})
+                case 'LIMITE':
+                    return httpx.Response(429, text='Too Many Requests')
+                case _:
+                    raise httpx.ConnectError('Falha de conexão')
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_emitir_lote(self):
+        discriminacoes = ['APROVADA', 'PROCESSANDO', 'REPROVADA', 'SEM CONEXAO']
+        objetos        = [self.objeto.model_copy(update={'servico': self.objeto.servico.model_copy(update={'discriminacao': d})}) for d in discriminacoes]
+
+        resultados = [r async for r in nfse.emitir_lote(self.credenciais, objetos, max_concorrencia=2, ordenado=True, client=self.client)]
+
+        self.assertEqual([r.indice for r in resultados], [0, 1, 2, 3])
+        self.assertEqual([r.situacao for r in resultados], ['aprovado', 'processando', 'reprovado', 'erro'])
+        self.assertEqual(resultados[0].nota.uuid, 'a')
+        self.assertEqual(resultados[1].motivo, 'Lote enviado para processamento')
+        self.assertEqual(resultados[2].motivo, 'Código de tributação inválido')
+        self.assertEqual(resultados[2].status_code, 412)
+        self.assertIsNone(resultados[3].nota)
+
+    async def test_respostas_inesperadas(self):
+        discriminacoes = ['INVALIDA', 'ENVELOPE', 'SEM TOKEN', 'LIMITE', 'APROVADA']
+        objetos        = [self.objeto.model_copy(update={'servico': self.objeto.servico.model_copy(update={'discriminacao': d})}) for d in discriminacoes]
+
+        resultados = [r async for r in nfse.emitir_lote(self.credenciais, objetos, max_concorrencia=2, ordenado=True, client=self.client)]
+
+        # Uma resposta inválida não interrompe o lote:
+        self.assertEqual([r.situacao for r in resultados], ['erro', 'aprovado', 'erro', 'erro', 'aprovado'])
+        self.assertEqual(resultados[0].status_code, 200)
+        self.assertEqual(resultados[1].nota.uuid, 'c')
+        self.assertEqual(resultados[2].status_code, 401)
+        self.assertIn('Token inválido', resultados[2].motivo)
+        self.assertEqual(resultados[3].status_code, 429)
+
+class IterarNotasTestCase(unittest.IsolatedAsyncioTestCase):
+    TOTAL = 7
+
+    def setUp(self) -> None:
+        self.paginas = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            qtd    = int(request.url.params['qtdPorPagina'])
+            pagina = int(request.url.params['pagina'])  # A primeira página é a página 1
+            self.paginas.append(pagina)
+
+            ids = range((pagina - 1) * qtd, min(pagina * qtd, self.TOTAL))
+            return httpx.Response(200, json={
+                'status': 'Sucesso',
+                'dados' : {
+                    'total'           : self.TOTAL,
+                    'itens_por_pagina': qtd,
+                    'pagina_atual'    : pagina,
+                    'itens'           : [{'id': i, 'uuid': f'nfse-{i}', 'status': 'aprovado'} for i in ids],
+                },
+            })
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_ordenado(self):
+        notas = [n async for n in nfse.iterar_notas(self.credenciais, qtd_por_pagina=2, max_concorrencia=3, client=self.client)]
+
+        self.assertEqual([n.id for n in notas], list(range(self.TOTAL)))
+        self.assertEqual(sorted(self.paginas), [1, 2, 3, 4])
+
+    async def test_ordem_de_chegada(self):
+        notas = [n async for n in nfse.iterar_notas(self.credenciais, qtd_por_pagina=3, ordenado=False, client=self.client)]
+
+        self.assertEqual(sorted(n.id for n in notas), list(range(self.TOTAL)))
+        self.assertEqual(sorted(self.paginas), [1, 2, 3])
+
+    def test_pagina_zero(self):
+        self.assertEqual(nfse._parametros_busca(pagina=0, qtd_por_pagina=3, texto=None), {'pagina': 0, 'qtdPorPagina': 3})
+
+        # Os demais filtros vazios continuam sem ser enviados:
+        self.assertEqual(nfse._parametros_busca(pagina=0, texto='', status='', qtd_por_pagina=0), {'pagina': 0})
+
+    async def test_contadores_como_texto(self):
+        _, pagina = await nfse._buscar_pagina(self.credenciais, pagina=1, qtd_por_pagina=3, client=self.client)
+
+        self.assertEqual((pagina.total, pagina.itens_por_pagina, pagina.pagina_atual), (str(self.TOTAL), '3', '1'))
+
+    async def test_buscar_notas_continua_retornando_lista(self):
+        response, notas = await nfse._buscar_notas(self.credenciais, pagina=2, qtd_por_pagina=3, client=self.client)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([n.uuid for n in notas], ['nfse-3', 'nfse-4', 'nfse-5'])
+
+class ModoLeveTestCase(unittest.IsolatedAsyncioTestCase):
+    XML = '<nfse>' + 'x' * 50_000 + '</nfse>'
+
+    def setUp(self) -> None:
+        def responder(request: httpx.Request) -> httpx.Response:
+            if request.url.path.endswith('/nfse/7'):
+                return httpx.Response(200, json={'id': 7, 'uuid': 'nfse-7', 'xml': self.XML, 'json_objeto_nfse': '{}'})
+
+            itens = [{'id': i, 'uuid': f'nfse-{i}', 'status': 'aprovado', 'xml': self.XML, 'json_objeto_nfse': '{}'} for i in range(5, 8)]
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': {'total': 3, 'itens_por_pagina': 3, 'pagina_atual': 1, 'itens': itens}})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_campos_pesados_nao_lidos(self):
+        response, notas = await nfse._buscar_notas(self.credenciais, leve=True, client=self.client)
+
+        self.assertEqual([n.uuid for n in notas], ['nfse-5', 'nfse-6', 'nfse-7'])
+        self.assertIsInstance(notas[0], nfse.NotaFiscalServico)
+        self.assertIsInstance(notas[0], nfse.NotaFiscalServicoLeve)
+        self.assertIsNone(notas[0].xml)
+        self.assertIsNone(notas[0].json_objeto_nfse)
+
+        response, notas = await nfse._buscar_notas(self.credenciais, client=self.client)
+        self.assertEqual(notas[0].xml, self.XML)
+
+    async def test_completar(self):
+        notas = [n async for n in nfse.iterar_notas(self.credenciais, qtd_por_pagina=3, leve=True, client=self.client)]
+
+        completa = await nfse.completar(self.credenciais, notas[-1], client=self.client)
+        self.assertNotIsInstance(completa, nfse.NotaFiscalServicoLeve)
+        self.assertEqual(completa.xml, self.XML)
+
+        self.assertIs(await nfse.completar(self.credenciais, completa, client=self.client), completa)
+
+    async def test_projecao_de_campos(self):
+        response, notas = await nfse._buscar_notas(self.credenciais, campos=['uuid', 'status'], client=self.client)
+
+        self.assertIsInstance(notas[0], nfse.NotaFiscalServico)
+        self.assertEqual([(n.uuid, n.status) for n in notas], [('nfse-5', 'aprovado'), ('nfse-6', 'aprovado'), ('nfse-7', 'aprovado')])
+        self.assertIsNone(notas[0].id)
+        self.assertIsNone(notas[0].xml)
+
+        notas = [n async for n in nfse.buscar_notas_fluxo(self.credenciais, campos=['uuid', 'status'], client=self.client)]
+        self.assertEqual([n.uuid for n in notas], ['nfse-5', 'nfse-6', 'nfse-7'])
+        self.assertIsNone(notas[0].xml)
+
+        with self.assertRaises(ValueError):
+            await nfse._buscar_notas(self.credenciais, campos=['inexistente'], client=self.client)
+
+class IterarPeriodoTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        inicio       = datetime(2023, 1, 1)
+        self.notas   = [{'id': i, 'uuid': f'nfse-{i}', 'data_emissao': inicio + timedelta(hours=i)} for i in range(40)]
+        self.janelas = []
+        self.paginas = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            formato = '%d/%m/%Y %H:%M:%S'
+            inicio  = datetime.strptime(request.url.params['dataInicio'], formato)
+            fim     = datetime.strptime(request.url.params['dataFim'], formato)
+            qtd     = int(request.url.params['qtdPorPagina'])
+            pagina  = int(request.url.params['pagina'])
+            self.janelas.append((inicio, fim))
+            self.paginas.append(pagina)
+
+            notas = [n for n in self.notas if inicio <= n['data_emissao'] <= fim]
+            itens = [{**n, 'data_emissao': str(n['data_emissao'])} for n in notas[(pagina - 1) * qtd:pagina * qtd]]
+            return httpx.Response(200, json={
+                'status': 'Sucesso',
+                'dados' : {'total': len(notas), 'itens_por_pagina': qtd, 'pagina_atual': pagina, 'itens': itens},
+            })
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_divide_periodos_com_notas_demais(self):
+        notas = [n async for n in nfse.iterar_periodo(self.credenciais, datetime(2023, 1, 1), datetime(2023, 1, 2, 23, 59, 59), limite=8, client=self.client)]
+
+        self.assertEqual(sorted(n.id for n in notas), list(range(40)))
+        self.assertGreater(len(self.janelas), 1)
+
+    async def test_periodo_minimo(self):
+        # Com a divisão desabilitada, o período é percorrido página a página e as repetições são descartadas:
+        self.notas.append(dict(self.notas[0]))
+        notas = [n async for n in nfse.iterar_periodo(self.credenciais, datetime(2023, 1, 1), datetime(2023, 1, 2), limite=8, duracao_minima=timedelta(days=30), client=self.client)]
+
+        self.assertEqual(len(notas), len({n.uuid for n in notas}))
+        self.assertEqual(len(notas), 25)
+
+        # A primeira página, usada para decidir a divisão, não é buscada novamente:
+        self.assertEqual(sorted(self.paginas), [1, 2, 3, 4])
+
+    async def test_periodo_invalido(self):
+        with self.assertRaises(ValueError):
+            [n async for n in nfse.iterar_periodo(self.credenciais, datetime(2023, 1, 2), datetime(2023, 1, 1), client=self.client)]
+
 # =================================================================
 class ConstrucaoCivilTestCase(unittest.TestCase):
     def test_valid_construcao_civil(self):
@@ -1,4 +1,5 @@
 import unittest
+from pydantic import ValidationError
 from pysisnoapi import *
 
 class CfopTestCase(unittest.TestCase):
@@ -235,6 +236,38 @@ class CofinsTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             Cofins(situacao_tributaria='123')
 
+class CredenciaisTestCase(unittest.TestCase):
+    def test_credenciais_emissor(self):
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+        self.assertEqual(credenciais.headers_emissor['token-emissor'], 'token')
+        self.assertEqual(credenciais.headers_emissor['token-secret-emissor'], 'token-secret')
+        self.assertNotIn('token-empresa', credenciais.headers_emissor)
+
+        with self.assertRaises(Exception):
+            credenciais.headers_empresa
+
+    def test_credenciais_empresa(self):
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+        self.assertEqual(credenciais.headers_empresa['token-empresa'], 'empresa')
+        self.assertEqual(credenciais.headers_empresa['token-secret-empresa'], 'empresa-secret')
+        self.assertEqual(credenciais.headers_emissao('1')['tipo-emissao'], '1')
+        self.assertIs(credenciais.headers_emissao('1'), credenciais.headers_emissao('1'))
+        self.assertNotIn('tipo-emissao', credenciais.headers_empresa)
+
+    def test_tokens_invalidos(self):
+        with self.assertRaises(Exception):
+            Credenciais(token_emissor='', token_secret_emissor='token-secret')
+        with self.assertRaises(Exception):
+            Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa')
+
+    def test_imutavel(self):
+        credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+        with self.assertRaises(ValidationError):
+            credenciais.token_emissor = 'outro'
+
 class DeclaracaoImportacaoAdicaoTestCase(unittest.TestCase):
     def test_criar_adicao_com_dados_obrigatorios(self):
         adicao = DeclaracaoImportacaoAdicao()
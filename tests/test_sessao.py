@@ -0,0 +1,206 @@
+# =================================================================
+import asyncio
+import httpx
+import unittest
+
+from pysisnoapi import misc, Credenciais, SessaoEmpresa, SisnoClient, Cfop
+from pysisnoapi.sessao import get_client
+
+# =================================================================
+class SisnoClientTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            return httpx.Response(200, json={
+                'status': 'Sucesso',
+                'dados' : [{'codigo': '5102', 'descricao': 'Venda de mercadoria', 'aplicacao': ''}],
+            })
+
+        self.client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_reutiliza_o_mesmo_pool(self):
+        http = self.client.http
+
+        await misc.get_cfops(token_emissor='token', token_secret_emissor='token-secret', client=self.client)
+        await misc.get_cfops(token_emissor='token', token_secret_emissor='token-secret', client=self.client)
+
+        self.assertIs(self.client.http, http)
+        self.assertEqual(len(self.requisicoes), 2)
+
+    async def test_operacoes_vinculadas(self):
+        cfops = await self.client.misc.get_cfops(token_emissor='token', token_secret_emissor='token-secret')
+
+        self.assertEqual(len(cfops), 1)
+        self.assertIsInstance(cfops[0], Cfop)
+
+        request = self.requisicoes[0]
+        self.assertEqual(str(request.url), 'https://sisno.teste/nfe-service/cfops')
+        self.assertEqual(request.headers['token-emissor'], 'token')
+        self.assertEqual(request.headers['accept'], 'application/json')
+
+    async def test_operacao_inexistente(self):
+        with self.assertRaises(AttributeError):
+            self.client.nfse.ObjetoEmissaoNFSe
+
+        self.assertIn('buscar_notas', dir(self.client.nfse))
+
+    async def test_fechar_sessao(self):
+        http = self.client.http
+        await self.client.aclose()
+
+        self.assertTrue(http.is_closed)
+        self.assertIsNot(self.client.http, http)
+
+    def test_sessao_padrao(self):
+        self.assertIs(get_client(), get_client())
+        self.assertIs(get_client(self.client), self.client)
+
+class EventLoopTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(200, json={})))
+
+    async def usar(self) -> httpx.AsyncClient:
+        await self.client.get(self.client.url('cfops'))
+        return self.client.http
+
+    def test_fecha_o_cliente_ao_encerrar_o_loop(self):
+        primeiro = asyncio.run(self.usar())
+        self.assertTrue(primeiro.is_closed)
+
+        segundo = asyncio.run(self.usar())
+        self.assertIsNot(segundo, primeiro)
+        self.assertTrue(segundo.is_closed)
+
+    def test_fecha_o_cliente_de_outro_loop(self):
+        loop = asyncio.new_event_loop()
+        try:
+            primeiro = loop.run_until_complete(self.usar())
+            asyncio.run(self.usar())
+
+            # O cliente antigo é fechado no seu próprio loop, assim que ele volta a rodar:
+            self.assertFalse(primeiro.is_closed)
+            loop.run_until_complete(asyncio.sleep(0))
+            self.assertTrue(primeiro.is_closed)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+class SessaoEmpresaTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': [{'codigo_ibge': 5300108, 'descricao': 'Brasilia'}]})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_operacao_sem_tokens(self):
+        sessao     = self.client.sessao(self.credenciais)
+        municipios = await sessao.misc.get_municipios('DF')
+
+        self.assertIsInstance(sessao, SessaoEmpresa)
+        self.assertEqual(municipios[0].descricao, 'Brasilia')
+        self.assertEqual(self.requisicoes[0].headers['token-emissor'], 'token')
+        self.assertEqual(str(self.requisicoes[0].url), 'https://sisno.teste/nfe-service/unidades-federativas/DF/municipios')
+
+    async def test_recuperar_dados_envia_tokens_empresa(self):
+        sessao = SessaoEmpresa(self.credenciais, client=self.client)
+        await sessao.nfse.recuperar_dados(5)
+
+        self.assertEqual(self.requisicoes[0].headers['token-empresa'], 'empresa')
+        self.assertEqual(self.requisicoes[0].headers['token-secret-empresa'], 'empresa-secret')
+
+    def test_cache_por_sessao(self):
+        sessao = SessaoEmpresa(self.credenciais, client=self.client)
+        outra  = SessaoEmpresa(self.credenciais, client=self.client)
+
+        self.assertIs(sessao.nfse, sessao.nfse)
+        self.assertIsNot(sessao.nfse._cache, outra.nfse._cache)
+
+    def test_operacao_inexistente(self):
+        sessao = SessaoEmpresa(self.credenciais, client=self.client)
+
+        with self.assertRaises(AttributeError):
+            sessao.nfe.cancelar
+
+        self.assertIn('emitir', dir(sessao.nfe))
+
+class CoalescerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.requisicoes = []
+
+        async def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            await asyncio.sleep(0.01)
+            if request.url.path.endswith('/XX/municipios'):
+                raise httpx.ConnectError('Falha de conexão')
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': [{'codigo_ibge': 5300108, 'descricao': 'Brasilia'}]})
+
+        self.transport   = httpx.MockTransport(responder)
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=self.transport)
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_gets_identicos_compartilham_a_requisicao(self):
+        sessao     = self.client.sessao(self.credenciais)
+        resultados = await asyncio.gather(*[sessao.misc.get_municipios('DF') for _ in range(10)])
+
+        self.assertEqual(len(self.requisicoes), 1)
+        self.assertTrue(all(r[0].codigo_ibge == 5300108 for r in resultados))
+
+        # Após a resposta nada fica guardado:
+        await sessao.misc.get_municipios('DF')
+        self.assertEqual(len(self.requisicoes), 2)
+
+    async def test_gets_diferentes(self):
+        outra = Credenciais(token_emissor='outro', token_secret_emissor='outro-secret')
+
+        await asyncio.gather(
+            self.client.sessao(self.credenciais).misc.get_municipios('DF'),
+            self.client.sessao(self.credenciais).misc.get_municipios('GO'),
+            self.client.sessao(outra).misc.get_municipios('DF'),
+        )
+
+        self.assertEqual(len(self.requisicoes), 3)
+
+    async def test_erro_propagado_a_todos(self):
+        sessao     = self.client.sessao(self.credenciais)
+        resultados = await asyncio.gather(*[sessao.misc.get_municipios('XX') for _ in range(3)], return_exceptions=True)
+
+        self.assertEqual(len(self.requisicoes), 1)
+        self.assertTrue(all(isinstance(r, httpx.ConnectError) for r in resultados))
+
+    async def test_cancelamento_de_um_chamador(self):
+        sessao  = self.client.sessao(self.credenciais)
+        tarefas = [asyncio.create_task(sessao.misc.get_municipios('DF')) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        tarefas[0].cancel()
+        municipios = await tarefas[1]
+
+        self.assertEqual(municipios[0].descricao, 'Brasilia')
+
+    async def test_desabilitado(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', coalescer=False, transport=self.transport)
+        await asyncio.gather(*[client.sessao(self.credenciais).misc.get_municipios('DF') for _ in range(3)])
+
+        self.assertEqual(len(self.requisicoes), 3)
+        await client.aclose()
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
@@ -0,0 +1,156 @@
+# =================================================================
+import httpx
+import tempfile
+import unittest
+
+from datetime import datetime, timedelta
+from pathlib  import Path
+
+from pysisnoapi import sincronizacao, Credenciais, SisnoClient
+from pysisnoapi.sincronizacao import Checkpoint
+
+# =================================================================
+class CheckpointTestCase(unittest.TestCase):
+    def test_salvar_e_carregar(self):
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho    = Path(pasta) / 'checkpoint.json'
+            checkpoint = Checkpoint(data_emissao=datetime(2023, 6, 2, 17, 25), ids=['1', '2'])
+
+            self.assertIsNone(Checkpoint.carregar(caminho).data_emissao)
+
+            checkpoint.salvar(caminho)
+            self.assertEqual(Checkpoint.carregar(caminho), checkpoint)
+
+    def test_ja_sincronizada(self):
+        checkpoint = Checkpoint(data_emissao=datetime(2023, 6, 2), ids=['1'])
+
+        self.assertTrue(checkpoint.ja_sincronizada(datetime(2023, 6, 1), 5))
+        self.assertTrue(checkpoint.ja_sincronizada(datetime(2023, 6, 2), 1))
+        self.assertFalse(checkpoint.ja_sincronizada(datetime(2023, 6, 2), 2))
+        self.assertFalse(checkpoint.ja_sincronizada(datetime(2023, 6, 3), 1))
+
+class SincronizacaoTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.pasta       = tempfile.TemporaryDirectory()
+        self.caminho     = Path(self.pasta.name) / 'checkpoint.json'
+        self.notas       = [{'id': i, 'data_emissao': datetime(2023, 6, 1) + timedelta(hours=i // 2)} for i in range(10)]
+        self.requisicoes = []
+        self.nova_nota   = None  # Nota emitida logo após a primeira página ser respondida
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            params = request.url.params
+
+            if request.url.path.endswith('/nfse'):
+                # Sem ordenação explícita as notas mais recentes vêm primeiro; as páginas começam em 1:
+                qtd    = int(params.get('qtdPorPagina', 100))
+                pagina = int(params['pagina'])
+                inicio = datetime.strptime(params['dataInicio'], '%d/%m/%Y %H:%M:%S') if 'dataInicio' in params else datetime.min
+                fim    = datetime.strptime(params['dataFim'], '%d/%m/%Y %H:%M:%S') if 'dataFim' in params else datetime.max
+                notas  = [n for n in self.notas if inicio <= n['data_emissao'] <= fim]
+                notas  = sorted(notas, key=lambda n: n['data_emissao'], reverse=params.get('tipoOrdenacao') != 'asc')
+                itens  = [{'id': n['id'], 'uuid': f'nfse-{n["id"]}', 'data_emissao': n['data_emissao'].strftime('%d/%m/%Y %H:%M:%S')} for n in notas[(pagina - 1) * qtd:pagina * qtd]]
+                total  = len(notas)
+            else:
+                # A listagem de NFe retorna as notas mais recentes primeiro:
+                qtd    = int(params.get('qtd', 3))
+                pagina = int(params['pagina'])
+                notas  = sorted(self.notas, key=lambda n: n['data_emissao'], reverse=True)[pagina * qtd:(pagina + 1) * qtd]
+                itens  = [{'id': n['id'], 'data_emissao': n['data_emissao'].isoformat()} for n in notas]
+                total  = len(self.notas)
+
+            if self.nova_nota is not None:
+                self.notas.append(self.nova_nota)
+                self.nova_nota = None
+
+            return httpx.Response(200, json={'status': 'Sucesso', 'dados': {'total': total, 'itens_por_pagina': qtd, 'pagina_atual': pagina, 'itens': itens}})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+        self.pasta.cleanup()
+
+    async def test_sincronizar_nfe(self):
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual(sorted(n.id for n in notas), list(range(10)))
+
+        checkpoint = Checkpoint.carregar(self.caminho)
+        self.assertEqual(checkpoint.data_emissao, datetime(2023, 6, 1, 4))
+        self.assertEqual(checkpoint.ids, ['8', '9'])
+
+        # Na segunda execução apenas as notas novas são produzidas e somente a primeira página é buscada:
+        self.notas.append({'id': 10, 'data_emissao': datetime(2023, 6, 1, 4)})
+        self.requisicoes.clear()
+
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual([n.id for n in notas], [10])
+        self.assertEqual(len(self.requisicoes), 2)
+        self.assertEqual(Checkpoint.carregar(self.caminho).ids, ['10', '8', '9'])
+
+    async def test_janela_revisao_nfe(self):
+        [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+
+        # Sem janela nenhuma nota é produzida novamente, com janela as notas da última hora são revisadas:
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual(notas, [])
+
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, janela_revisao=timedelta(hours=1), client=self.client)]
+        self.assertEqual(sorted(n.id for n in notas), [6, 7, 8, 9])
+        self.assertEqual(Checkpoint.carregar(self.caminho).ids, ['8', '9'])
+
+    async def test_nota_emitida_durante_a_leitura_nfe(self):
+        # A nova nota entra no início da listagem e empurra uma nota da primeira página para a segunda:
+        self.nova_nota = {'id': 10, 'data_emissao': datetime(2023, 6, 1, 5)}
+
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual(sorted(n.id for n in notas), list(range(10)))
+
+        notas = [n async for n in sincronizacao.sincronizar_nfe(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual([n.id for n in notas], [10])
+
+    async def test_nota_emitida_durante_a_leitura_nfse(self):
+        self.nova_nota = {'id': 10, 'data_emissao': datetime.now() + timedelta(minutes=1)}
+
+        notas = [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, qtd_por_pagina=3, client=self.client)]
+        self.assertEqual(sorted(n.id for n in notas), list(range(10)))
+
+        params = self.requisicoes[0].url.params
+        self.assertIn('dataFim', params)
+        self.assertEqual((params['ordenacao'], params['tipoOrdenacao']), ('data_emissao', 'asc'))
+
+        # Nenhuma nota ficou para trás da marca d'água:
+        self.assertEqual(Checkpoint.carregar(self.caminho).data_emissao, datetime(2023, 6, 1, 4))
+
+    async def test_sincronizar_nfse(self):
+        notas = [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, client=self.client)]
+        self.assertEqual(len(notas), 10)
+
+        self.notas.append({'id': 10, 'data_emissao': datetime(2023, 6, 1, 5)})
+        notas = [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, client=self.client)]
+
+        self.assertEqual([n.uuid for n in notas], ['nfse-10'])
+        self.assertEqual(self.requisicoes[-1].url.params['dataInicio'], '01/06/2023 04:00:00')
+        self.assertEqual(Checkpoint.carregar(self.caminho).ids, ['nfse-10'])
+
+    async def test_janela_revisao(self):
+        [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, client=self.client)]
+        notas = [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, janela_revisao=timedelta(hours=1), client=self.client)]
+
+        self.assertEqual(sorted(n.id for n in notas), [6, 7, 8, 9])
+
+    async def test_erro_nao_grava_checkpoint(self):
+        client = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(lambda r: httpx.Response(500, text='Erro')))
+
+        with self.assertRaises(httpx.HTTPStatusError):
+            [n async for n in sincronizacao.sincronizar_nfse(self.credenciais, self.caminho, client=client)]
+
+        self.assertFalse(self.caminho.exists())
+        await client.aclose()
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================
@@ -0,0 +1,130 @@
+# =================================================================
+import httpx
+import json
+import unittest
+
+from pysisnoapi import nfe, validacao, Credenciais, PessoaJuridica, SisnoClient
+from pysisnoapi.validacao import NotaInvalida
+
+from tests import test_nfe
+
+# =================================================================
+class DocumentosTestCase(unittest.TestCase):
+    def test_validar_cpf(self):
+        self.assertTrue(validacao.validar_cpf('529.982.247-25'))
+        self.assertTrue(validacao.validar_cpf('44301337199'))
+        self.assertFalse(validacao.validar_cpf('52998224724'))
+        self.assertFalse(validacao.validar_cpf('11111111111'))
+        self.assertFalse(validacao.validar_cpf('123'))
+        self.assertFalse(validacao.validar_cpf(None))
+
+    def test_validar_cnpj(self):
+        self.assertTrue(validacao.validar_cnpj('11.222.333/0001-81'))
+        self.assertFalse(validacao.validar_cnpj('11222333000182'))
+        self.assertFalse(validacao.validar_cnpj('00000000000000'))
+
+class ValidarNfeTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        test_nfe.NfeTestCase.setUp(self)
+
+        forma       = self.objeto.pedido.pagamento.formas_pagamento[0].model_copy(update={'valor_pagamento': '10.00'})
+        pedido      = self.objeto.pedido.model_copy(update={'pagamento': nfe.Pagamento(formas_pagamento=[forma])})
+        self.objeto = self.objeto.model_copy(update={'pedido': pedido})
+
+    def alterar_produto(self, **campos) -> nfe.ObjetoEmissaoNFe:
+        return self.objeto.model_copy(update={'produtos': [self.objeto.produtos[0].model_copy(update=campos)]})
+
+    def regras(self, objeto: nfe.ObjetoEmissaoNFe) -> list:
+        return [e.regra for e in validacao.validar_nfe(objeto)]
+
+    def test_nota_valida(self):
+        self.assertEqual(validacao.validar_nfe(self.objeto), [])
+
+    def test_total_produto(self):
+        erros = validacao.validar_nfe(self.alterar_produto(total='9.00', item='2'))
+
+        self.assertEqual([e.regra for e in erros], ['sequencia_item', 'total_produto'])
+        self.assertEqual(erros[1].campo, 'produtos[0].total')
+
+    def test_pagamento_menor_que_total(self):
+        self.objeto.pedido.total = '15.00'
+        self.assertEqual(self.regras(self.objeto), ['pagamento_total'])
+
+        self.objeto.pedido.total = None
+        self.objeto.pedido.pagamento.formas_pagamento[0].valor_pagamento = '9.99'
+        self.assertEqual(self.regras(self.objeto), ['pagamento_total'])
+
+        self.objeto.pedido.pagamento.formas_pagamento[0].meio_pagamento = '90'
+        self.assertEqual(self.regras(self.objeto), [])
+
+    def test_cfop(self):
+        self.assertEqual(self.regras(self.alterar_produto(cfop='1102')), ['cfop_operacao'])
+        self.assertEqual(self.regras(self.alterar_produto(cfop='51020')), ['cfop_formato'])
+
+        self.objeto.cliente.endereco.codigo_pais = '0132'
+        self.assertEqual(self.regras(self.objeto), ['cfop_destino'])
+        self.assertEqual(self.regras(self.alterar_produto(cfop='7102')), [])
+
+    def test_situacoes_tributarias(self):
+        impostos = self.objeto.produtos[0].impostos
+
+        impostos.icms.situacao_tributaria = '00'
+        self.assertEqual(self.regras(self.objeto), ['aliquota_obrigatoria'])
+
+        impostos.icms.aliquota_icms       = '18.00'
+        impostos.icms.situacao_tributaria = '40'
+        self.assertEqual(self.regras(self.objeto), ['aliquota_indevida'])
+
+        impostos.icms.situacao_tributaria = '101'
+        impostos.pis.situacao_tributaria  = '01'
+        self.assertEqual(self.regras(self.objeto), ['aliquota_obrigatoria'])
+
+    def test_documentos(self):
+        self.objeto.cliente.pessoa_fisica.cpf = '44301337198'
+        erros = validacao.validar_nfe(self.objeto)
+
+        self.assertEqual([e.regra for e in erros], ['cpf_invalido'])
+        self.assertEqual(erros[0].campo, 'cliente.pessoa_fisica.cpf')
+
+        self.objeto.cliente.pessoa_fisica   = None
+        self.objeto.cliente.pessoa_juridica = PessoaJuridica(cnpj='11222333000182', razao_social='Empresa')
+        self.assertEqual(self.regras(self.objeto), ['cnpj_invalido'])
+
+class EmitirLoteValidandoTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        ValidarNfeTestCase.setUp(self)
+
+        self.requisicoes = []
+
+        def responder(request: httpx.Request) -> httpx.Response:
+            self.requisicoes.append(request)
+            return httpx.Response(200, json={'status': 'Sucesso'})
+
+        self.client      = SisnoClient(base_url='https://sisno.teste/nfe-service', transport=httpx.MockTransport(responder))
+        self.credenciais = Credenciais(token_emissor='token', token_secret_emissor='token-secret', token_empresa='empresa', token_secret_empresa='empresa-secret')
+
+    async def asyncTearDown(self) -> None:
+        await self.client.aclose()
+
+    async def test_notas_invalidas_nao_sao_enviadas(self):
+        invalida   = ValidarNfeTestCase.alterar_produto(self, cfop='1102')
+        resultados = [r async for r in nfe.emitir_lote(self.credenciais, [self.objeto, invalida], '1', ordenado=True, validar_localmente=True, client=self.client)]
+
+        self.assertIsNone(resultados[0].erro)
+        self.assertIsInstance(resultados[1].erro, NotaInvalida)
+        self.assertEqual(resultados[1].erro.erros[0].regra, 'cfop_operacao')
+        self.assertEqual(len(self.requisicoes), 1)
+
+    async def test_validar_envia_objeto_json(self):
+        sessao = self.client.sessao(self.credenciais)
+        await sessao.nfe.validar(self.objeto, '1')
+
+        corpo = json.loads(self.requisicoes[0].content)
+        self.assertIsInstance(corpo, dict)
+        self.assertEqual(corpo['numero_nota_sequencial'], '123456')
+
+# =================================================================
+if __name__ == "__main__":
+    unittest.main()
+
+# =================================================================